@@ -7,4 +7,5 @@ from .tableau_exceptions import *
 # from .tableau_rest_api_connection import TableauRestApiConnection
 #from .tableau._server_rest import TableauServerRest, TableauServerRest33
 from .tableau_server_rest import *
+from .tableau_server_rest_async import *
 from .rest_tokens_manager import *
@@ -7,64 +7,27 @@ password = ''
 server = 'http://localhost'
 
 logger = Logger('permissions.log')
-default = TableauRestApiConnection28(server=server, username=username, password=password)
+default = TableauServerRest33(server=server, username=username, password=password)
 default.enable_logging(logger)
 default.signin()
 
-with open('permissions_audit.txt', 'w', newline='') as output_file:
+# Get all sites content urls for logging in
+site_content_urls = default.sites.query_all_site_content_urls()
+default.signout()
 
-    # Get all sites content urls for logging in
-    site_content_urls = default.query_all_site_content_urls()
-
-    # Create CSV writer
-    output_writer = csv.writer(output_file)
-
-    # Headers
-    headers = ['Site Content URL', 'Project Name', 'Project LUID', 'Are Permissions Locked?',
-               'Principal Type', 'Principal Name', 'Principal LUID']
-
-    project_caps = Permissions.available_capabilities[default.api_version]['project']
-    for cap in project_caps:
-        headers.append(cap)
-    workbook_caps = Permissions.available_capabilities[default.api_version]['workbook']
-    for cap in workbook_caps:
-        headers.append(cap)
-    datasource_caps = Permissions.available_capabilities[default.api_version]['datasource']
-    for cap in datasource_caps:
-        headers.append(cap)
-    output_writer.writerow(headers)
+with open('permissions_audit.csv', 'w', newline='', encoding='utf-8') as output_file:
+    # One row for each capability set on each project, project default, workbook, datasource, flow and view,
+    # with the site, content, grantee and capability as columns
+    output_writer = csv.DictWriter(output_file, fieldnames=TableauServerRest33.permissions_snapshot_columns)
+    output_writer.writeheader()
 
     for site_content_url in site_content_urls:
-        t = TableauRestApiConnection28(server=server, username=username, password=password,
-                                       site_content_url=site_content_url)
+        t = TableauServerRest33(server=server, username=username, password=password,
+                                site_content_url=site_content_url)
         t.enable_logging(logger)
         t.signin()
-        projects = t.query_projects()
-        projects_dict = t.xml_list_to_dict(projects)
-        print(projects_dict)
-        for project in projects_dict:
-            # combined_permissions = luid : {type, name, proj, def_wb, def_ds}
-            proj_obj = t.query_project(projects_dict[project])
-
-            all_perms = proj_obj.query_all_permissions()
-
-            for luid in all_perms:
-                output_row = []
-                all_perms_list = proj_obj.convert_all_permissions_to_list(all_perms[luid])
-                if site_content_url is None:
-                    site_content_url = ''
-                output_row.append(site_content_url)
-                output_row.append(project)
-                output_row.append(projects_dict[project])
-                output_row.append(str(proj_obj.are_permissions_locked()))
-                output_row.append(all_perms[luid]["type"])
-                output_row.append(all_perms[luid]["name"])
-                output_row.append(luid)
-                output_row.extend(all_perms_list)
-                output_writer.writerow(output_row)
-
-
-
-
-
-
+        # The users, groups and content are listed once per site, then the permissions are read 8 at a time
+        snapshot = t.query_permissions_snapshot(max_concurrent_requests=8)
+        output_writer.writerows(snapshot)
+        print('{}: {} permissions'.format(site_content_url, len(snapshot)))
+        t.signout()
@@ -2,7 +2,6 @@
 
 from tableau_tools import *
 from tableau_tools.tableau_documents import *
-import time
 import os
 
 o_server = 'http://127.0.0.1'
@@ -17,6 +16,10 @@ new_site_name = 'Test Site Replica'
 new_site_content_url = 'test_site_replica'
 
 
+# All of the connections share one RateLimiter, so the replication runs as fast as the servers can safely take
+# rather than pausing between each stage
+rate_limiter = RateLimiter(requests_per_second=10, max_concurrent_requests=4)
+
 # Sign in to the original site with an administrator level user
 o = TableauServerRest(server=o_server, username=o_username,
                                password=o_password, site_content_url=original_content_url)
@@ -25,12 +28,14 @@ logger = Logger('replicate_site_sample.log')
 logger.enable_debug_level()
 # Enable logging after sign-in to hide credentials
 o.enable_logging(logger)
+o.set_rate_limiter(rate_limiter)
 
 # Sign in to the new Server on default as a Server Admin
 n_default = TableauServerRest(server=n_server, username=n_username,
                                        password=n_password, site_content_url="default")
 n_default.signin()
 n_default.enable_logging(logger)
+n_default.set_rate_limiter(rate_limiter)
 
 # Die if the new site already exists
 try:
@@ -47,6 +52,7 @@ except AlreadyExistsException as e:
                                                        password=n_password, site_content_url=new_site_content_url)
     n_existing_to_replace.signin()
     n_existing_to_replace.enable_logging(logger)
+    n_existing_to_replace.set_rate_limiter(rate_limiter)
     n_existing_to_replace.sites.delete_current_site()
     # Now Create the new site
     n_default.sites.create_site(new_site_name=new_site_name, new_content_url=new_site_content_url)
@@ -59,6 +65,7 @@ n = TableauServerRest(server=n_server, username=n_username,
                                password=n_password, site_content_url=new_site_content_url)
 n.signin()
 n.enable_logging(logger)
+n.set_rate_limiter(rate_limiter)
 print("Signed in to new site, beginning replication")
 
 # Now we start replicating from one site to the other
@@ -110,9 +117,7 @@ for user in users:
     # Similar to above if you need to tr
     # new_username = u'{}@{}'.format(user.get(u'name'), u'mydomain.net')
     # n.add_user(username=new_username, site_role=user.get(u'siteRole'), auth_setting=u'SAML')  # or u'ServerDefault'
-# Sleep a bit to let them all get added in
-print("Finished users, sleeping for a few moments")
-time.sleep(4)
+print("Finished users")
 
 # Put users in groups
 print("Starting users in groups")
@@ -168,9 +173,7 @@ for proj in projects:
 
     n.projects.create_project(direct_xml_request=proj_request, no_return=True)
 
-# Let the projects get all settled in
-print("Finished groups, sleeping for a few moments")
-time.sleep(4)
+print("Finished groups")
 
 print("Starting parent project assignment")
 # Now Assign projects to their parents if they have one
@@ -186,24 +189,30 @@ for proj in child_projects:
                          parent_project_name_or_luid=new_parent_project_name)
 
 
-# Let the project updates get all settled in
-print('Finished parent project assignment, sleeping for a few moments')
-time.sleep(4)
+print('Finished parent project assignment')
 
 # Set Permissions for all the Projects to Match when usernames and group names perfectly match between the systems
 print('Starting project permissions')
+# If you are transferring where the usernames may vary (say to Online where all usernames are e-mail addresses
+# must come up with a mechanism for mapping the username.
+users_mapping = None
+# Create a username_map dict to pass like {'original_username', : 'new_username'}.
+# Uncomment the following if necessary:
+# users_mapping = { 'username' : 'username@domain.net', 'admin' : 'admin@domain.net' }
+
+orig_projs = {}
 for proj_name in proj_dict:
-    orig_proj = o.projects.query_project(proj_name)
-    new_proj = n.projects.query_project(proj_name)
+    orig_projs[proj_name] = o.projects.query_project(proj_name)
 
-    # If you are transferring where the usernames may vary (say to Online where all usernames are e-mail addresses
-    # must come up with a mechanism for mapping the username.
-    users_mapping = None
-    # Create a username_map dict to pass like {'original_username', : 'new_username'}.
-    # Uncomment the following if necessary:
-    # users_mapping = { 'username' : 'username@domain.net', 'admin' : 'admin@domain.net' }
+# Match up all the users and groups once, from one listing on each site, rather than looking up each one on every
+# project. Anyone without a match on the new site is left out of the permissions
+plan = n.plan_permissions_replication(o, list(orig_projs.values()), username_map=users_mapping)
+for grantee_type, luid in plan['unmatched']:
+    print('No match on the new site for {} {}, their permissions will not be replicated'.format(grantee_type, luid))
 
-    new_proj.replicate_permissions_direct_xml(orig_proj, username_map=users_mapping)
+for proj_name in orig_projs:
+    new_proj = n.projects.query_project(proj_name)
+    new_proj.replicate_permissions_direct_xml(orig_projs[proj_name], translation_table=plan['translation_table'])
 
 print('Finished project permissions')
 
@@ -255,9 +264,7 @@ print('WB Refresh tasks found:')
 print(wb_extract_tasks)
 print('DS Refresh Tasks found:')
 print(ds_extract_tasks)
-print('Finished schedules, sleeping for a few moments')
-
-time.sleep(4)
+print('Finished schedules')
 
 # Workbooks
 # This is all based on the replicate_workbooks_with_published_dses method in the template_publish_sample.py example
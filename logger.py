@@ -30,6 +30,13 @@ class Logger(object):
     def enable_response_logging(self):
         self._log_modes['response'] = True
 
+    # Lets callers skip building log text that would not be written anyway
+    def is_debug_enabled(self) -> bool:
+        return self._log_modes['debug']
+
+    def is_response_logging_enabled(self) -> bool:
+        return self._log_modes['response']
+
     def log(self, l: str):
         cur_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
         if self.log_depth == 0:
@@ -4,6 +4,9 @@ import xml.etree.ElementTree as ET
 from .logger import Logger
 
 class LoggingMethods:
+    # No attributes of its own, so classes that use __slots__ can inherit from it
+    __slots__ = ()
+
     # Logging Methods
     def enable_logging(self, logger_obj: Logger):
         self.logger = logger_obj
@@ -16,6 +19,13 @@ class LoggingMethods:
         if self.logger is not None:
             self.logger.log_debug(l)
 
+    # Check these before serializing XML or decoding a response just to log it
+    def _debug_logging_enabled(self) -> bool:
+        return self.logger is not None and self.logger.is_debug_enabled()
+
+    def _response_logging_enabled(self) -> bool:
+        return self.logger is not None and self.logger.is_response_logging_enabled()
+
     def start_log_block(self):
         if self.logger is not None:
             self.logger.start_log_block()
@@ -32,6 +32,7 @@ class RecoverableHTTPException(TableauException):
         self.http_code = http_code
         self.tableau_error_code = tableau_error_code
         self.luid = luid
+        self.msg = 'HTTP {} error, Tableau error code {}'.format(http_code, tableau_error_code)
 
 class PossibleInvalidPublishException(TableauException):
     def __init__(self, http_code, tableau_error_code, msg):
@@ -47,3 +48,10 @@ class MultipleMatchesFoundException(TableauException):
 class NoResultsException(TableauException):
     def __init__(self, msg):
         self.msg = msg
+
+# Some of the requests to change permissions failed. failures is a list of (capability, exception) for each one,
+# where capability is (group_or_user, luid, capability_name, mode)
+class PermissionsChangeFailedException(TableauException):
+    def __init__(self, msg, failures):
+        self.msg = msg
+        self.failures = failures
@@ -0,0 +1,214 @@
+import time
+import zlib
+import socket
+import threading
+from collections import deque
+from typing import Optional, Dict, Tuple, List
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from ..tableau_exceptions import *
+
+
+# The HTTP settings for a connection to Tableau Server, and the one requests Session (with its pool of open
+# connections) that every RestXmlRequest and RestJsonRequest of that connection sends through. Give several
+# TableauServerRest connections the same HttpTransport (with set_transport()) and they share one pool.
+#
+# pool_connections is how many hosts have a pool kept, pool_maxsize how many open connections are kept per host.
+# pool_maxsize should be at least the most requests sent at once (concurrent paging, bulk downloads, threads).
+# With pool_block=True a request waits for a free connection rather than opening an extra one that isn't kept.
+#
+# connect_timeout and read_timeout are in seconds. read_timeout is how long to wait for the server to send anything,
+# not for the whole response, so a large download doesn't time out while data is still arriving. It does need to
+# be longer than the server takes to answer a publish. None waits forever.
+#
+# keep_alive=False closes the connection after every request. tcp_keepalive turns on TCP keep-alive probes, which
+# stops firewalls and load balancers from silently dropping connections that sit idle in the pool.
+# proxies is the requests proxies dict, e.g. {'https': 'http://proxy.example.com:8080'}. With trust_env=True
+# (the default) the HTTP_PROXY / HTTPS_PROXY / NO_PROXY environment variables are used as well
+#
+# compression asks the server for gzip or deflate compressed responses; False asks for them uncompressed.
+# With collect_metrics=True every response that isn't streamed is measured (see get_metrics()), so you can check
+# that compression is actually happening, e.g. through a proxy that strips it, and how much it saves
+class HttpTransport:
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 connect_timeout: Optional[float] = 30.0, read_timeout: Optional[float] = 600.0,
+                 keep_alive: bool = True, tcp_keepalive: bool = False, proxies: Optional[Dict[str, str]] = None,
+                 trust_env: bool = True, compression: bool = True, collect_metrics: bool = False,
+                 max_metrics_kept: int = 1000):
+        if pool_connections < 1 or pool_maxsize < 1:
+            raise InvalidOptionException('pool_connections and pool_maxsize must be 1 or greater')
+        for timeout in (connect_timeout, read_timeout):
+            if timeout is not None and timeout <= 0:
+                raise InvalidOptionException('Timeouts must be greater than 0, or None to wait forever')
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keep_alive = keep_alive
+        self.tcp_keepalive = tcp_keepalive
+        self.proxies = proxies
+        self.trust_env = trust_env
+        self.compression = compression
+        self.collect_metrics = collect_metrics
+
+        # The most recent max_metrics_kept responses, plus running totals of all of them
+        self._metrics: deque = deque(maxlen=max_metrics_kept)
+        self._metrics_lock = threading.Lock()
+        self._metrics_totals = self._empty_totals()
+
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+
+    # The timeout argument for requests
+    @property
+    def timeout(self) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return self.connect_timeout, self.read_timeout
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        session.trust_env = self.trust_env
+        if self.proxies is not None:
+            session.proxies.update(self.proxies)
+        if self.keep_alive is False:
+            session.headers['Connection'] = 'close'
+        # Only the encodings that can be measured are asked for, rather than whatever requests happens to support
+        session.headers['Accept-Encoding'] = 'gzip, deflate' if self.compression is True else 'identity'
+        if self.collect_metrics is True:
+            session.hooks['response'].append(self._measure_response)
+        self._mount_adapter(session)
+        return session
+
+    def _mount_adapter(self, session: requests.Session):
+        # RetryPolicy decides what is retried, so the adapter itself never retries
+        adapter = _TransportAdapter(tcp_keepalive=self.tcp_keepalive, pool_connections=self.pool_connections,
+                                    pool_maxsize=self.pool_maxsize, pool_block=self.pool_block, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+    # Makes sure the pool keeps at least pool_maxsize connections per host, for code that is about to send that many
+    # requests at once. The pool only ever grows. If the session already exists it gets a new, larger pool; requests
+    # already in flight finish on the old one, whose connections are then dropped
+    def ensure_pool_maxsize(self, pool_maxsize: int):
+        with self._session_lock:
+            if pool_maxsize <= self.pool_maxsize:
+                return
+            self.pool_maxsize = pool_maxsize
+            if self._session is not None:
+                self._mount_adapter(self._session)
+
+    # Created the first time it is needed, and then used for every request
+    @property
+    def session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    @staticmethod
+    def _empty_totals() -> Dict:
+        return {'requests': 0, 'compressed_responses': 0, 'compressed_bytes': 0, 'decompressed_bytes': 0,
+                'read_seconds': 0.0, 'decode_seconds': 0.0}
+
+    # Response hook, called by requests before it reads the body. Reads the body as it came over the wire, then
+    # decompresses it here so both sizes and the time it took are known. requests then uses the decoded content
+    # as if it had read it itself. Streamed responses (downloads) are left alone
+    def _measure_response(self, response: requests.Response, *args, **kwargs) -> requests.Response:
+        if kwargs.get('stream') is True:
+            return response
+        content_encoding = response.headers.get('Content-Encoding', 'identity').strip().lower()
+        if content_encoding not in ('gzip', 'deflate', 'identity', ''):
+            return response
+
+        start_time = time.perf_counter()
+        raw_content = response.raw.read(decode_content=False) or b''
+        read_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        content = raw_content
+        if content_encoding in ('gzip', 'deflate') and len(raw_content) > 0:
+            try:
+                if content_encoding == 'gzip':
+                    content = zlib.decompress(raw_content, 16 + zlib.MAX_WBITS)
+                else:
+                    # deflate is meant to be zlib wrapped, but some servers send it raw
+                    try:
+                        content = zlib.decompress(raw_content)
+                    except zlib.error:
+                        content = zlib.decompress(raw_content, -zlib.MAX_WBITS)
+            except zlib.error as e:
+                raise requests.exceptions.ContentDecodingError('Failed to decode {} response: {}'.format(
+                    content_encoding, e), response=response)
+        decode_seconds = time.perf_counter() - start_time
+        response._content = content
+        response._content_consumed = True
+
+        metrics = {'http_verb': response.request.method, 'url': response.url, 'status_code': response.status_code,
+                   'content_encoding': content_encoding if content_encoding != '' else 'identity',
+                   'compressed_bytes': len(raw_content), 'decompressed_bytes': len(content),
+                   'elapsed_seconds': response.elapsed.total_seconds(), 'read_seconds': read_seconds,
+                   'decode_seconds': decode_seconds}
+        response.metrics = metrics
+        with self._metrics_lock:
+            self._metrics.append(metrics)
+            totals = self._metrics_totals
+            totals['requests'] += 1
+            if content_encoding in ('gzip', 'deflate'):
+                totals['compressed_responses'] += 1
+            totals['compressed_bytes'] += len(raw_content)
+            totals['decompressed_bytes'] += len(content)
+            totals['read_seconds'] += read_seconds
+            totals['decode_seconds'] += decode_seconds
+        return response
+
+    # The metrics of the most recent responses, oldest first. Each is a dict with 'http_verb', 'url',
+    # 'status_code', 'content_encoding', 'compressed_bytes' (as sent over the network), 'decompressed_bytes',
+    # 'elapsed_seconds' (until the headers arrived), 'read_seconds' (reading the body) and 'decode_seconds'
+    def get_metrics(self) -> List[Dict]:
+        with self._metrics_lock:
+            return list(self._metrics)
+
+    # Totals for every response measured since the last clear_metrics(), including the bytes saved by compression
+    def get_metrics_summary(self) -> Dict:
+        with self._metrics_lock:
+            summary = dict(self._metrics_totals)
+        summary['bytes_saved'] = summary['decompressed_bytes'] - summary['compressed_bytes']
+        summary['compression_ratio'] = None
+        if summary['compressed_bytes'] > 0:
+            summary['compression_ratio'] = summary['decompressed_bytes'] / summary['compressed_bytes']
+        return summary
+
+    def clear_metrics(self):
+        with self._metrics_lock:
+            self._metrics.clear()
+            self._metrics_totals = self._empty_totals()
+
+    # Closes all of the pooled connections. The next request starts a new Session
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+
+
+class _TransportAdapter(HTTPAdapter):
+    def __init__(self, tcp_keepalive: bool = False, **kwargs):
+        self.tcp_keepalive = tcp_keepalive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.tcp_keepalive is True:
+            kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        if self.tcp_keepalive is True:
+            proxy_kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
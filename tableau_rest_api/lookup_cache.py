@@ -0,0 +1,271 @@
+import time
+import threading
+import sqlite3
+from collections import OrderedDict
+from typing import Optional, List, Dict, Tuple
+
+from ..tableau_exceptions import *
+
+
+# Holds the name -> LUID lookups for every content type, so the same names are not resolved against the Tableau
+# Server over and over. LUID -> name lookups use a reverse index, so both directions are constant time.
+# Entries are keyed by (site_luid, content_type, scope, name). The scope is for names that are only unique within
+# something else, like a workbook within a project. Server level content (schedules) uses an empty site_luid.
+# Entries expire after ttl_seconds (None for never), and the least recently used entries are dropped once there
+# are more than max_entries. A single LuidCache can be shared between connections, since the site is in the key
+class LuidCache:
+    def __init__(self, ttl_seconds: Optional[float] = 900, max_entries: Optional[int] = 50000):
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise InvalidOptionException('ttl_seconds must be greater than 0, or None for no expiration')
+        if max_entries is not None and max_entries < 1:
+            raise InvalidOptionException('max_entries must be 1 or greater, or None for no limit')
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (luid, time stored). Ordered from least to most recently used
+        self._entries = OrderedDict()  # type: OrderedDict[Tuple[str, str, str, str], Tuple[str, float]]
+        # Reverse index, (site_luid, content_type, luid) -> the keys holding that LUID, for constant time
+        # LUID -> name lookups and invalidation by LUID
+        self._keys_by_luid = {}  # type: Dict[Tuple[str, str, str], Dict[Tuple[str, str, str, str], None]]
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(site_luid: str, content_type: str, name: str, scope: Optional[str]) -> Tuple[str, str, str, str]:
+        if scope is None:
+            scope = ''
+        return site_luid, content_type, scope, name
+
+    def _is_expired(self, stored_at: float) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        return time.time() - stored_at > self.ttl_seconds
+
+    def get(self, site_luid: str, content_type: str, name: str, scope: Optional[str] = None) -> Optional[str]:
+        key = self._key(site_luid, content_type, name, scope)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            if entry is not None and self._is_expired(entry[1]):
+                self._forget([key])
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def store(self, site_luid: str, content_type: str, name: str, luid: str, scope: Optional[str] = None):
+        if name is None or luid is None:
+            return
+        key = self._key(site_luid, content_type, name, scope)
+        entry = (luid, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            self._save(key, entry)
+
+    # Stores many (name, luid, scope) entries at once, e.g. from a full listing, written to any persistent backing
+    # in one go. Entries with a LUID of None are discarded instead, since the name can't be resolved on its own
+    def store_many(self, site_luid: str, content_type: str,
+                   entries: List[Tuple[str, Optional[str], Optional[str]]]):
+        stored_at = time.time()
+        saved = []
+        discarded_keys = []
+        with self._lock:
+            for name, luid, scope in entries:
+                if name is None:
+                    continue
+                key = self._key(site_luid, content_type, name, scope)
+                if luid is None:
+                    discarded_keys.append(key)
+                else:
+                    saved.append((key, (luid, stored_at)))
+                    self._remember(key, (luid, stored_at))
+            self._forget(discarded_keys)
+            self._save_many(saved, discarded_keys)
+
+    # Removes the single entry for a name in one scope
+    def discard(self, site_luid: str, content_type: str, name: str, scope: Optional[str] = None):
+        key = self._key(site_luid, content_type, name, scope)
+        with self._lock:
+            self._forget([key])
+            self._delete_stored_key(key)
+
+    # Reverse lookup of the name stored for a LUID, if there is an unexpired entry for it
+    def query_name(self, site_luid: str, content_type: str, luid: str) -> Optional[str]:
+        with self._lock:
+            keys = self._keys_by_luid.get((site_luid, content_type, luid))
+            if keys is None:
+                loaded = self._load_by_luid(site_luid, content_type, luid)
+                if loaded is None:
+                    self.misses += 1
+                    return None
+                self._remember(loaded[0], loaded[1])
+                keys = self._keys_by_luid[(site_luid, content_type, luid)]
+            for key in list(keys):
+                entry = self._entries[key]
+                if self._is_expired(entry[1]):
+                    self._forget([key])
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key[3]
+            self.misses += 1
+            return None
+
+    # Removes entries for a content type, either those matching a name (in any scope) or a LUID,
+    # or every entry of the content type when neither is given. Returns the number of entries removed
+    def invalidate(self, site_luid: str, content_type: str, name: Optional[str] = None,
+                   luid: Optional[str] = None) -> int:
+        with self._lock:
+            if luid is not None:
+                keys = [key for key in self._keys_by_luid.get((site_luid, content_type, luid), {})
+                        if name is None or key[3] == name]
+            else:
+                keys = [key for key in self._entries
+                        if key[0] == site_luid and key[1] == content_type and (name is None or key[3] == name)]
+            self._forget(keys)
+            self._delete_stored(site_luid, content_type, name, luid)
+            return len(keys)
+
+    # Empties the cache, or just the entries for one site
+    def clear(self, site_luid: Optional[str] = None):
+        with self._lock:
+            if site_luid is None:
+                self._entries.clear()
+                self._keys_by_luid.clear()
+            else:
+                self._forget([key for key in self._entries if key[0] == site_luid])
+            self._clear_stored(site_luid)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, key: Tuple[str, str, str, str], entry: Tuple[str, float]):
+        previous = self._entries.get(key)
+        if previous is not None and previous[0] != entry[0]:
+            self._unindex(key, previous[0])
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._keys_by_luid.setdefault((key[0], key[1], entry[0]), {})[key] = None
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                old_key, old_entry = self._entries.popitem(last=False)
+                self._unindex(old_key, old_entry[0])
+
+    def _forget(self, keys: List[Tuple[str, str, str, str]]):
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._unindex(key, entry[0])
+
+    def _unindex(self, key: Tuple[str, str, str, str], luid: str):
+        luid_key = (key[0], key[1], luid)
+        keys = self._keys_by_luid.get(luid_key)
+        if keys is not None:
+            keys.pop(key, None)
+            if len(keys) == 0:
+                del self._keys_by_luid[luid_key]
+
+    # Storage hooks for a persistent backing. The in-memory cache has nothing behind it
+    def _load(self, key: Tuple[str, str, str, str]) -> Optional[Tuple[str, float]]:
+        return None
+
+    def _load_by_luid(self, site_luid: str, content_type: str,
+                      luid: str) -> Optional[Tuple[Tuple[str, str, str, str], Tuple[str, float]]]:
+        return None
+
+    def _save(self, key: Tuple[str, str, str, str], entry: Tuple[str, float]):
+        pass
+
+    def _delete_stored_key(self, key: Tuple[str, str, str, str]):
+        pass
+
+    def _save_many(self, entries: List[Tuple[Tuple[str, str, str, str], Tuple[str, float]]],
+                   discarded_keys: List[Tuple[str, str, str, str]]):
+        for key, entry in entries:
+            self._save(key, entry)
+        for key in discarded_keys:
+            self._delete_stored_key(key)
+
+    def _delete_stored(self, site_luid: str, content_type: str, name: Optional[str], luid: Optional[str]):
+        pass
+
+    def _clear_stored(self, site_luid: Optional[str]):
+        pass
+
+
+# LuidCache that also writes every entry to a sqlite database file, so lookups survive between runs of a script.
+# The in-memory LRU sits in front; the file is only read when a name isn't already in memory
+class SqliteLuidCache(LuidCache):
+    def __init__(self, db_filename: str, ttl_seconds: Optional[float] = 86400, max_entries: Optional[int] = 50000):
+        LuidCache.__init__(self, ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self.db_filename = db_filename
+        self._db = sqlite3.connect(db_filename, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS luid_cache (
+                                site_luid TEXT NOT NULL, content_type TEXT NOT NULL, scope TEXT NOT NULL,
+                                name TEXT NOT NULL, luid TEXT NOT NULL, stored_at REAL NOT NULL,
+                                PRIMARY KEY (site_luid, content_type, scope, name))""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS luid_cache_luid ON luid_cache (site_luid, content_type, luid)")
+        self._db.commit()
+
+    def _load(self, key: Tuple[str, str, str, str]) -> Optional[Tuple[str, float]]:
+        row = self._db.execute("SELECT luid, stored_at FROM luid_cache WHERE site_luid = ? AND content_type = ? "
+                               "AND scope = ? AND name = ?", key).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    def _load_by_luid(self, site_luid: str, content_type: str,
+                      luid: str) -> Optional[Tuple[Tuple[str, str, str, str], Tuple[str, float]]]:
+        row = self._db.execute("SELECT scope, name, stored_at FROM luid_cache WHERE site_luid = ? AND content_type = ? "
+                               "AND luid = ? ORDER BY stored_at DESC", (site_luid, content_type, luid)).fetchone()
+        if row is None:
+            return None
+        return (site_luid, content_type, row[0], row[1]), (luid, row[2])
+
+    def _save(self, key: Tuple[str, str, str, str], entry: Tuple[str, float]):
+        self._db.execute("INSERT OR REPLACE INTO luid_cache (site_luid, content_type, scope, name, luid, stored_at) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", key + entry)
+        self._db.commit()
+
+    def _delete_stored_key(self, key: Tuple[str, str, str, str]):
+        self._db.execute("DELETE FROM luid_cache WHERE site_luid = ? AND content_type = ? AND scope = ? AND name = ?",
+                         key)
+        self._db.commit()
+
+    # One transaction for the whole batch, rather than a commit (and a sync to disk) for every entry
+    def _save_many(self, entries: List[Tuple[Tuple[str, str, str, str], Tuple[str, float]]],
+                   discarded_keys: List[Tuple[str, str, str, str]]):
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO luid_cache (site_luid, content_type, scope, name, luid, "
+                                 "stored_at) VALUES (?, ?, ?, ?, ?, ?)", [key + entry for key, entry in entries])
+            self._db.executemany("DELETE FROM luid_cache WHERE site_luid = ? AND content_type = ? AND scope = ? "
+                                 "AND name = ?", discarded_keys)
+
+    def _delete_stored(self, site_luid: str, content_type: str, name: Optional[str], luid: Optional[str]):
+        sql = "DELETE FROM luid_cache WHERE site_luid = ? AND content_type = ?"
+        params = [site_luid, content_type]
+        if name is not None:
+            sql += " AND name = ?"
+            params.append(name)
+        if luid is not None:
+            sql += " AND luid = ?"
+            params.append(luid)
+        self._db.execute(sql, params)
+        self._db.commit()
+
+    def _clear_stored(self, site_luid: Optional[str]):
+        if site_luid is None:
+            self._db.execute("DELETE FROM luid_cache")
+        else:
+            self._db.execute("DELETE FROM luid_cache WHERE site_luid = ?", (site_luid, ))
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -8,21 +8,21 @@ class AlertMethods():
     #def __getattr__(self, attr):
     #    return getattr(self.rest_api_base, attr)
 
-    def query_data_driven_alerts(self) -> ET.Element:
+    def query_data_driven_alerts(self, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        alerts = self.rest.query_resource("dataAlerts")
+        alerts = self.rest.query_resource("dataAlerts", fields=fields)
         self.rest.end_log_block()
         return alerts
 
-    def query_data_driven_alerts_for_view(self, view_luid: str) -> ET.Element:
+    def query_data_driven_alerts_for_view(self, view_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        alerts = self.rest.query_resource("dataAlerts?filter=viewId:eq:{}".format(view_luid))
+        alerts = self.rest.query_resource("dataAlerts?filter=viewId:eq:{}".format(view_luid), fields=fields)
         self.rest.end_log_block()
         return alerts
 
-    def query_data_driven_alert_details(self, data_alert_luid: str) -> ET.Element:
+    def query_data_driven_alert_details(self, data_alert_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        alert_details = self.rest.query_resource("dataAlerts/{}".format(data_alert_luid))
+        alert_details = self.rest.query_resource("dataAlerts/{}".format(data_alert_luid), fields=fields)
         self.rest.end_log_block()
         return alert_details
 
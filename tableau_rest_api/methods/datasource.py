@@ -18,14 +18,17 @@ class DatasourceMethods():
 
     def query_datasources(self, project_name_or_luid: Optional[str] = None, all_fields: Optional[bool] = True,
                           filters: Optional[List[UrlFilter]] = None, sorts: Optional[List[Sort]] = None,
-                          fields: Optional[List[str]] = None) -> ET.Element:
+                          fields: Optional[List[str]] = None, page_size: Optional[int] = None) -> ET.Element:
 
         self.rest.start_log_block()
         if fields is None:
             if all_fields is True:
                 fields = ['_all_']
+        if project_name_or_luid is not None:
+            fields = self.rest._add_required_fields(fields, ['project.id'])
 
-        datasources = self.rest.query_resource('datasources', filters=filters, sorts=sorts, fields=fields)
+        datasources = self.rest.query_resource('datasources', filters=filters, sorts=sorts, fields=fields,
+                                               page_size=page_size)
 
         # If there is a project filter
         if project_name_or_luid is not None:
@@ -40,9 +43,28 @@ class DatasourceMethods():
         self.rest.end_log_block()
         return dses
 
+    # Generator version of query_datasources, yielding each datasource Element as the pages come back
+    def iter_datasources(self, project_name_or_luid: Optional[str] = None, all_fields: Optional[bool] = True,
+                         filters: Optional[List[UrlFilter]] = None, sorts: Optional[List[Sort]] = None,
+                         fields: Optional[List[str]] = None, page_size: Optional[int] = None) -> Iterator[ET.Element]:
+        if fields is None:
+            if all_fields is True:
+                fields = ['_all_']
+        if project_name_or_luid is not None:
+            fields = self.rest._add_required_fields(fields, ['project.id'])
+
+        dses = self.rest.iter_resource('datasources', filters=filters, sorts=sorts, fields=fields,
+                                       page_size=page_size)
+
+        # If there is a project filter
+        if project_name_or_luid is not None:
+            project_luid = self.rest.query_project_luid(project_name_or_luid)
+            dses = (ds for ds in dses if ds.find('t:project[@id="{}"]'.format(project_luid), self.rest.ns_map) is not None)
+        return dses
+
     def query_datasources_json(self, all_fields: Optional[bool] = True, filters: Optional[List[UrlFilter]] = None,
                                sorts: Optional[List[Sort]] = None, fields: Optional[List[str]] = None,
-                               page_number: Optional[int] = None) -> Dict:
+                               page_number: Optional[int] = None, page_size: Optional[int] = None) -> Dict:
 
         self.rest.start_log_block()
         if fields is None:
@@ -50,17 +72,18 @@ class DatasourceMethods():
                 fields = ['_all_']
 
         datasources = self.rest.query_resource_json('datasources', filters=filters, sorts=sorts, fields=fields,
-                                               page_number=page_number)
+                                               page_number=page_number, page_size=page_size)
 
         self.rest.end_log_block()
         return datasources
 
     # Tries to guess name or LUID, hope there is only one
-    def query_datasource(self, ds_name_or_luid: str, proj_name_or_luid: Optional[str] = None) -> ET.Element:
+    def query_datasource(self, ds_name_or_luid: str, proj_name_or_luid: Optional[str] = None,
+                         fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
 
         ds_luid = self.rest.query_datasource_luid(ds_name_or_luid, proj_name_or_luid)
-        ds = self.rest.query_resource("datasources/{}".format(ds_luid))
+        ds = self.rest.query_resource("datasources/{}".format(ds_luid), fields=fields)
         self.rest.end_log_block()
         return ds
 
@@ -138,40 +161,37 @@ class DatasourceMethods():
         self.rest.start_log_block()
 
         ds_luid = self.rest.query_datasource_luid(ds_name_or_luid, project_name_or_luid=proj_name_or_luid)
+        # Streamed to disk in chunks, so large extracts are never held in memory
         try:
-            if include_extract is False:
-                url = self.rest.build_api_url("datasources/{}/content?includeExtract=False".format(ds_luid))
-            else:
-                url = self.rest.build_api_url("datasources/{}/content".format(ds_luid))
-            ds = self.rest.send_binary_get_request(url)
-            extension = None
-            if self.rest._last_response_content_type.find('application/xml') != -1:
-                extension = '.tds'
-            elif self.rest._last_response_content_type.find('application/octet-stream') != -1:
-                extension = '.tdsx'
-            self.rest.log('Response type was {} so extension will be {}'.format(self.rest._last_response_content_type, extension))
-            if extension is None:
-                raise IOError('File extension could not be determined')
+            result = self.rest._download_content('datasource', ds_luid, filename_no_extension,
+                                                 include_extract=include_extract)
         except RecoverableHTTPException as e:
             self.rest.log("download_datasource resulted in HTTP error {}, Tableau Code {}".format(e.http_code, e.tableau_error_code))
             self.rest.end_log_block()
             raise
-        except:
+        except IOError:
+            self.rest.log("Error: File '{}' cannot be opened to save to".format(filename_no_extension))
             self.rest.end_log_block()
             raise
-        try:
-
-            save_filename = filename_no_extension + extension
-            save_file = open(save_filename, 'wb')
-            save_file.write(ds)
-            save_file.close()
-
-        except IOError:
-            self.rest.log("Error: File '{}' cannot be opened to save to".format(filename_no_extension + extension))
+        except:
+            self.rest.end_log_block()
             raise
 
         self.rest.end_log_block()
-        return save_filename
+        return result['filename']
+
+    # Downloads many datasources in parallel, streaming each to disk. See WorkbookMethods.download_workbooks
+    def download_datasources(self, save_to_directory: str, ds_luids: Optional[List[str]] = None,
+                             project_name_or_luid: Optional[str] = None, include_extract: bool = True,
+                             max_concurrent_downloads: int = 4, skip_existing: bool = True, resume: bool = True,
+                             use_project_directories: bool = True, chunk_size: int = 1024 * 1024) -> List[Dict]:
+        return self.rest._download_content_in_bulk('datasource', save_to_directory=save_to_directory,
+                                                   luids=ds_luids, project_name_or_luid=project_name_or_luid,
+                                                   include_extract=include_extract,
+                                                   max_concurrent_downloads=max_concurrent_downloads,
+                                                   skip_existing=skip_existing, resume=resume,
+                                                   use_project_directories=use_project_directories,
+                                                   chunk_size=chunk_size)
 
     def publish_datasource(self, ds_filename: str, ds_name: str, project_obj: Project,
                            overwrite: bool = False, connection_username: Optional[str] = None,
@@ -66,9 +66,9 @@ class ExtractMethods():
         return self.update_datasource_now(ds_name_or_luid, proj_name_or_luid)
 
     # Checks status of AD sync process or extract
-    def query_job(self, job_luid: str) -> ET.Element:
+    def query_job(self, job_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        job = self.rest.query_resource("jobs/{}".format(job_luid))
+        job = self.rest.query_resource("jobs/{}".format(job_luid), fields=fields)
         self.rest.end_log_block()
         return job
 
@@ -104,7 +104,8 @@ class ExtractMethods():
                    created_at_filter: Optional[UrlFilter] = None, started_at_filter: Optional[UrlFilter] = None,
                    ended_at_filter: Optional[UrlFilter] = None, title_filter: Optional[UrlFilter] = None,
                    subtitle_filter: Optional[UrlFilter] = None,
-                   notes_filter: Optional[UrlFilter] = None) -> ET.Element:
+                   notes_filter: Optional[UrlFilter] = None, page_size: Optional[int] = None,
+                   fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         filter_checks = {'progress': progress_filter, 'jobType': job_type_filter,
                          'createdAt': created_at_filter, 'title': title_filter,
@@ -112,7 +113,7 @@ class ExtractMethods():
                          'subtitle': subtitle_filter, 'startedAt': started_at_filter}
         filters = self.rest._check_filter_objects(filter_checks)
 
-        jobs = self.rest.query_resource("jobs", filters=filters)
+        jobs = self.rest.query_resource("jobs", filters=filters, fields=fields, page_size=page_size)
         self.rest.log('Found {} jobs'.format(str(len(jobs))))
         self.rest.end_log_block()
         return jobs
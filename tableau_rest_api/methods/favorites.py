@@ -52,17 +52,19 @@ class FavoritesMethods():
         self.rest.end_log_block()
         return update_response
 
-    def query_user_favorites(self, username_or_luid: str) -> ET.Element:
+    def query_user_favorites(self, username_or_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         user_luid = self.rest.query_user_luid(username_or_luid)
-        favorites = self.rest.query_resource("favorites/{}/".format(user_luid))
+        favorites = self.rest.query_resource("favorites/{}/".format(user_luid), fields=fields)
         self.rest.end_log_block()
         return favorites
 
-    def query_user_favorites_json(self, username_or_luid: str, page_number: Optional[int] = None) -> str:
+    def query_user_favorites_json(self, username_or_luid: str, page_number: Optional[int] = None,
+                                  fields: Optional[List[str]] = None) -> str:
         self.rest.start_log_block()
         user_luid = self.rest.query_user_luid(username_or_luid)
-        favorites = self.rest.query_resource_json("favorites/{}/".format(user_luid), page_number=page_number)
+        favorites = self.rest.query_resource_json("favorites/{}/".format(user_luid), page_number=page_number,
+                                                  fields=fields)
         self.rest.end_log_block()
         return favorites
 
@@ -10,18 +10,22 @@ class FlowMethods33():
 
     def query_flow_luid(self, flow_name: str, project_name_or_luid: Optional[str] = None) -> str:
         self.rest.start_log_block()
+        if self.rest.is_luid(flow_name):
+            self.rest.end_log_block()
+            return flow_name
 
         flow_name_filter = UrlFilter33.create_name_filter(flow_name)
 
-        flows = self.rest.query_flows_for_a_site(flow_name_filter=flow_name_filter,
-                                            project_name_or_luid=project_name_or_luid)
+        flows = self.query_flows_for_a_site(flow_name_filter=flow_name_filter,
+                                            project_name_or_luid=project_name_or_luid,
+                                            fields=self.rest._lookup_fields['flow'])
         # There should only be one flow here if any found
         if len(flows) == 1:
             self.rest.end_log_block()
             return flows[0].get("id")
         else:
             self.rest.end_log_block()
-            raise NoMatchFoundException("No {} found with name {}".format(flows, flow_name))
+            raise NoMatchFoundException("No flow found with name {}".format(flow_name))
 
     def query_flows_for_a_site(self, project_name_or_luid: Optional[str] = None, all_fields: bool = True,
                                updated_at_filter: Optional[UrlFilter] = None,
@@ -53,31 +57,34 @@ class FlowMethods33():
         self.rest.end_log_block()
         return flows
 
-    def query_flows_for_a_user(self, username_or_luid: str, is_owner_flag: bool = False) -> ET.Element:
+    def query_flows_for_a_user(self, username_or_luid: str, is_owner_flag: bool = False,
+                               fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         user_luid = self.rest.query_user_luid(username_or_luid)
         additional_url_params = ""
         if is_owner_flag is True:
             additional_url_params += "?ownedBy=true"
 
-        flows = self.rest.query_resource('users/{}/flows{}'.format(user_luid, additional_url_params))
+        flows = self.rest.query_resource('users/{}/flows{}'.format(user_luid, additional_url_params), fields=fields)
         self.rest.end_log_block()
         return flows
 
-    def query_flow(self, flow_name_or_luid: str, project_name_or_luid: Optional[str] = None) -> ET.Element:
+    def query_flow(self, flow_name_or_luid: str, project_name_or_luid: Optional[str] = None,
+                   fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        flow_luid = self.rest.query_flow_luid(flow_name_or_luid, project_name_or_luid=project_name_or_luid)
+        flow_luid = self.query_flow_luid(flow_name_or_luid, project_name_or_luid=project_name_or_luid)
 
-        flow = self.rest.query_resource('flows/{}'.format(flow_luid))
+        flow = self.rest.query_resource('flows/{}'.format(flow_luid), fields=fields)
 
         self.rest.end_log_block()
         return flow
 
     def query_flow_connections(self, flow_name_or_luid: str,
-                               project_name_or_luid: Optional[str] = None) -> ET.Element:
+                               project_name_or_luid: Optional[str] = None,
+                               fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        flow_luid = self.rest.query_flow_luid(flow_name_or_luid, project_name_or_luid=project_name_or_luid)
-        connections = self.rest.query_resource('flows/{}/connections'.format(flow_luid))
+        flow_luid = self.query_flow_luid(flow_name_or_luid, project_name_or_luid=project_name_or_luid)
+        connections = self.rest.query_resource('flows/{}/connections'.format(flow_luid), fields=fields)
         self.rest.end_log_block()
         return connections
 
@@ -8,35 +8,48 @@ class GroupMethods():
     #    return getattr(self.rest_api_base, attr)
 
     def query_groups(self, filters: Optional[List[UrlFilter]] = None,
-                     sorts: Optional[List[Sort]] = None) -> ET.Element:
+                     sorts: Optional[List[Sort]] = None, page_size: Optional[int] = None,
+                     fields: Optional[List[str]] = None) -> ET.Element:
         
         self.rest.start_log_block()
-        groups = self.rest.query_resource("groups", filters=filters, sorts=sorts)
+        groups = self.rest.query_resource("groups", filters=filters, sorts=sorts, fields=fields, page_size=page_size)
         for group in groups:
             # Add to group-name : luid cache
             group_luid = group.get("id")
             group_name = group.get('name')
-            self.rest.group_name_luid_cache[group_name] = group_luid
+            self.rest._store_cached_luid('group', group_name, group_luid)
         self.rest.end_log_block()
         return groups
 
+    # Generator version of query_groups, yielding each group Element as the pages come back
+    def iter_groups(self, filters: Optional[List[UrlFilter]] = None,
+                    sorts: Optional[List[Sort]] = None, page_size: Optional[int] = None,
+                    fields: Optional[List[str]] = None) -> Iterator[ET.Element]:
+        for group in self.rest.iter_resource("groups", filters=filters, sorts=sorts, fields=fields,
+                                             page_size=page_size):
+            # Add to group-name : luid cache
+            self.rest._store_cached_luid('group', group.get('name'), group.get("id"))
+            yield group
+
     # # No basic verb for querying a single group, so run a query_groups
 
     def query_groups_json(self, filters: Optional[List[UrlFilter]] = None,
-                     sorts: Optional[List[Sort]] = None, page_number: Optional[int] = None) -> Dict:
+                     sorts: Optional[List[Sort]] = None, page_number: Optional[int] = None,
+                     page_size: Optional[int] = None, fields: Optional[List[str]] = None) -> Dict:
 
             self.rest.start_log_block()
-            groups = self.rest.query_resource_json("groups", filters=filters, sorts=sorts, page_number=page_number)
+            groups = self.rest.query_resource_json("groups", filters=filters, sorts=sorts, fields=fields,
+                                                   page_number=page_number, page_size=page_size)
             self.rest.end_log_block()
             return groups
 
-    def query_group(self, group_name_or_luid: str) -> ET.Element:
+    def query_group(self, group_name_or_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        group = self.rest.query_single_element_from_endpoint_with_filter('group', group_name_or_luid)
+        group = self.rest.query_single_element_from_endpoint_with_filter('group', group_name_or_luid, fields=fields)
         # Add to group_name : luid cache
         group_luid = group.get("id")
         group_name = group.get('name')
-        self.rest.group_name_luid_cache[group_name] = group_luid
+        self.rest._store_cached_luid('group', group_name, group_luid)
 
         self.rest.end_log_block()
         return group
@@ -97,33 +110,26 @@ class GroupMethods():
             group = response.findall('.//t:group', self.rest.ns_map)
             return group[0].get('id')
 
-    # Take a single user_luid string or a collection of luid_strings
-    def add_users_to_group(self, username_or_luid_s: Union[List[str], str], group_name_or_luid: str) -> ET.Element:
+    # Take a single user_luid string or a collection of luid_strings. With max_concurrent_requests above 1, that
+    # many users are added at once. Users already in the group are skipped. Returns a result dict for each user
+    # (see _send_group_member_changes)
+    def add_users_to_group(self, username_or_luid_s: Union[List[str], str], group_name_or_luid: str,
+                           max_concurrent_requests: int = 1) -> List[Dict]:
         self.rest.start_log_block()
         group_luid = self.rest.query_group_luid(group_name_or_luid)
 
         users = self.rest.to_list(username_or_luid_s)
-        for user in users:
-            user_luid = self.rest.query_user_luid(user)
-
-            tsr = ET.Element("tsRequest")
-            u = ET.Element("user")
-            u.set("id", user_luid)
-            tsr.append(u)
-
-            url = self.rest.build_api_url("groups/{}/users/".format(group_luid))
-            try:
-                self.rest.log("Adding username ID {} to group ID {}".format(user_luid, group_luid))
-                result = self.rest.send_add_request(url, tsr)
-                return result
-            except RecoverableHTTPException as e:
-                self.rest.log("Recoverable HTTP exception {} with Tableau Error Code {}, skipping".format(str(e.http_code), e.tableau_error_code))
+        user_luids = self.rest._query_user_luids(users)
+        results = self._send_group_member_changes(group_luid, [(user_luids[u], u) for u in users], [],
+                                                  max_concurrent_requests=max_concurrent_requests)
         self.rest.end_log_block()
+        return results
 
-    def query_users_in_group(self, group_name_or_luid: str) -> ET.Element:
+    def query_users_in_group(self, group_name_or_luid: str, fields: Optional[List[str]] = None,
+                             page_size: Optional[int] = None) -> ET.Element:
         self.rest.start_log_block()
         luid = self.rest.query_group_luid(group_name_or_luid)
-        users = self.rest.query_resource("groups/{}/users".format(luid))
+        users = self.rest.query_resource("groups/{}/users".format(luid), fields=fields, page_size=page_size)
         self.rest.end_log_block()
         return users
 
@@ -191,35 +197,118 @@ class GroupMethods():
             self.rest.send_delete_request(url)
         self.rest.end_log_block()
 
-    def remove_users_from_group(self, username_or_luid_s: Union[List[str], str], group_name_or_luid: str):
+    def remove_users_from_group(self, username_or_luid_s: Union[List[str], str], group_name_or_luid: str,
+                                max_concurrent_requests: int = 1) -> List[Dict]:
         self.rest.start_log_block()
-        group_name = ""
-        if self.rest.is_luid(group_name_or_luid):
-            group_luid = group_name_or_luid
-        else:
-            group_name = group_name_or_luid
-            group_luid = self.rest.query_group_name(group_name_or_luid)
+        group_luid = self.rest.query_group_luid(group_name_or_luid)
+        users = self.rest.to_list(username_or_luid_s)
+        user_luids = self.rest._query_user_luids(users)
+        results = self._send_group_member_changes(group_luid, [], [(user_luids[u], u) for u in users],
+                                                  max_concurrent_requests=max_concurrent_requests)
+        self.rest.end_log_block()
+        return results
+
+    # Makes the members of a group match username_or_luid_s, sending only the changes: the users who aren't in the
+    # group yet are added and, with remove_others=True, the members who aren't in the list are removed. Everyone is
+    # resolved from the group's member listing and one pass through the user listing, rather than a lookup per user.
+    # Changes are sent max_concurrent_requests at a time. With dry_run=True nothing is sent, and each change is
+    # reported with a status of 'planned'. Returns a result dict for each change (see _send_group_member_changes)
+    def sync_group_members(self, group_name_or_luid: str, username_or_luid_s: Union[List[str], str],
+                           remove_others: bool = True, max_concurrent_requests: int = 4,
+                           dry_run: bool = False) -> List[Dict]:
+        self.rest.start_log_block()
+        group_luid = self.rest.query_group_luid(group_name_or_luid)
+        # The largest page size, so a big group is read in as few requests as possible
+        members = self.query_users_in_group(group_luid, fields=['id', 'name'], page_size=1000)
+        # luid : name of the current members
+        member_names = {}
+        for member in members:
+            member_names[member.get('id')] = member.get('name')
+
         users = self.rest.to_list(username_or_luid_s)
+        user_luids = self.rest._query_user_luids(users, known_luids={v: k for k, v in member_names.items()})
+        additions = []
+        desired_luids = set()
         for user in users:
-            username = ""
-            if self.rest.is_luid(user):
-                user_luid = user
-            else:
-                username = user
-                user_luid = self.rest.query_user_luid(user)
-            url = self.rest.build_api_url("groups/{}/users/{}".format(group_luid, user_luid))
-            self.rest.log('Removing user {}, id {} from group {}, id {}'.format(username, user_luid, group_name, group_luid))
-            self.rest.send_delete_request(url)
+            user_luid = user_luids[user]
+            if user_luid is None:
+                additions.append((None, user))
+            elif user_luid not in desired_luids:
+                desired_luids.add(user_luid)
+                if user_luid not in member_names:
+                    additions.append((user_luid, user))
+        removals = []
+        if remove_others is True:
+            removals = [(luid, member_names[luid]) for luid in member_names if luid not in desired_luids]
+        self.rest.log('Group {}: {} members, {} to add, {} to remove'.format(group_luid, len(member_names),
+                                                                            len(additions), len(removals)))
+        results = self._send_group_member_changes(group_luid, additions, removals,
+                                                  max_concurrent_requests=max_concurrent_requests, dry_run=dry_run)
         self.rest.end_log_block()
+        return results
+
+    # Sends the adds and removes for one group, max_concurrent_requests at a time. additions and removals are lists of
+    # (user LUID, username) tuples; a LUID of None means the username wasn't found. A failure doesn't stop the rest.
+    # Returns a dict for each, in order, with the keys 'group_luid', 'user_luid', 'username', 'action' ('add' or
+    # 'remove') and 'status', which is one of 'added', 'removed', 'already_member', 'not_member', 'planned' or
+    # 'failed'. Failures also have the exception in 'error'
+    def _send_group_member_changes(self, group_luid: str, additions: List[Tuple[Optional[str], str]],
+                                   removals: List[Tuple[Optional[str], str]], max_concurrent_requests: int = 1,
+                                   dry_run: bool = False) -> List[Dict]:
+        changes = [('add', user_luid, username) for user_luid, username in additions]
+        changes.extend([('remove', user_luid, username) for user_luid, username in removals])
+
+        def send(change: Tuple[str, Optional[str], str]) -> Dict:
+            action, user_luid, username = change
+            result = {'group_luid': group_luid, 'user_luid': user_luid, 'username': username, 'action': action}
+            if user_luid is None:
+                result['status'] = 'failed'
+                result['error'] = NoMatchFoundException("No user found with name {}".format(username))
+                return result
+            if dry_run is True:
+                result['status'] = 'planned'
+                return result
+            try:
+                if action == 'add':
+                    tsr = ET.Element("tsRequest")
+                    u = ET.Element("user")
+                    u.set("id", user_luid)
+                    tsr.append(u)
+                    url = self.rest.build_api_url("groups/{}/users/".format(group_luid))
+                    self.rest.log("Adding username ID {} to group ID {}".format(user_luid, group_luid))
+                    self.rest.send_add_request(url, tsr)
+                    result['status'] = 'added'
+                else:
+                    url = self.rest.build_api_url("groups/{}/users/{}".format(group_luid, user_luid))
+                    self.rest.log('Removing user {}, id {} from group id {}'.format(username, user_luid, group_luid))
+                    self.rest.send_delete_request(url, raise_exceptions=True)
+                    result['status'] = 'removed'
+            except RecoverableHTTPException as e:
+                if action == 'add' and e.http_code == 409:
+                    result['status'] = 'already_member'
+                elif action == 'remove' and e.http_code == 404:
+                    result['status'] = 'not_member'
+                else:
+                    self.rest.log("Recoverable HTTP exception {} with Tableau Error Code {}, skipping".format(
+                        str(e.http_code), e.tableau_error_code))
+                    result['status'] = 'failed'
+                    result['error'] = e
+            except Exception as e:
+                self.rest.log('{} of user {} failed: {}'.format(action, user_luid, e))
+                result['status'] = 'failed'
+                result['error'] = e
+            return result
+
+        return self.rest._run_in_parallel(send, changes, max_concurrent_requests=max_concurrent_requests)
 
 
 class GroupMethods37(GroupMethods):
     def __init__(self, rest_api_base: TableauRestApiBase36):
         self.rest = rest_api_base
 
-    def get_groups_for_a_user(self, username_or_luid: str) -> ET.Element:
+    def get_groups_for_a_user(self, username_or_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         luid = self.rest.query_user_luid(username_or_luid)
-        users = self.rest.query_resource("users/{}/groups".format(luid))
+        users = self.rest.query_resource("users/{}/groups".format(luid), fields=fields)
         self.rest.end_log_block()
         return users
\ No newline at end of file
@@ -11,16 +11,17 @@ class MetadataMethods35():
     #def __getattr__(self, attr):
     #   return getattr(self.rest_api_base, attr)
 
-    def query_databases(self) -> ET.Element:
+    def query_databases(self, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        response = self.rest.query_resource("databases")
+        response = self.rest.query_resource("databases", fields=fields)
         self.rest.end_log_block()
         return response
 
-    def query_database(self, database_name_or_luid: str) -> ET.Element:
+    def query_database(self, database_name_or_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         # Implement the search mechanism eventually using XPath similar to old workbooks / datasources lookup
-        response = self.rest.query_single_element_from_endpoint("database", name_or_luid=database_name_or_luid)
+        response = self.rest.query_single_element_from_endpoint("database", name_or_luid=database_name_or_luid,
+                                                                fields=fields)
         self.rest.end_log_block()
         return response
 
@@ -56,16 +57,17 @@ class MetadataMethods35():
         self.rest.rest_api_base.send_delete_request(url)
         self.rest.end_log_block()
 
-    def query_tables(self) -> ET.Element:
+    def query_tables(self, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        response = self.rest.query_resource("tables")
+        response = self.rest.query_resource("tables", fields=fields)
         self.rest.end_log_block()
         return response
 
-    def query_table(self, table_name_or_luid: str) -> ET.Element:
+    def query_table(self, table_name_or_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         # Implement the search mechanism eventually using XPath similar to old workbooks / datasources lookup
-        response = self.rest.query_single_element_from_endpoint("table", name_or_luid=table_name_or_luid)
+        response = self.rest.query_single_element_from_endpoint("table", name_or_luid=table_name_or_luid,
+                                                                fields=fields)
         self.rest.end_log_block()
         return response
 
@@ -101,10 +103,10 @@ class MetadataMethods35():
         self.rest.rest_api_base.send_delete_request(url)
         self.rest.end_log_block()
 
-    def query_columns_in_a_table(self, table_name_or_luid: str) -> ET.Element:
+    def query_columns_in_a_table(self, table_name_or_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         table_luid = self.rest.query_table_luid(table_name_or_luid)
-        response = self.rest.query_resource("tables/{}/columns".format(table_luid))
+        response = self.rest.query_resource("tables/{}/columns".format(table_luid), fields=fields)
         self.rest.end_log_block()
         return response
 
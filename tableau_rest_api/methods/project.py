@@ -11,7 +11,8 @@ class ProjectMethods():
     def query_projects(self, name_filter: Optional[UrlFilter] = None, owner_name_filter: Optional[UrlFilter] = None,
                        updated_at_filter: Optional[UrlFilter] = None, created_at_filter: Optional[UrlFilter] = None,
                        owner_domain_filter: Optional[UrlFilter] = None, owner_email_filter: Optional[UrlFilter] = None,
-                       sorts: Optional[List[Sort]] = None) -> ET.Element:
+                       sorts: Optional[List[Sort]] = None, page_size: Optional[int] = None,
+                       fields: Optional[List[str]] = None) -> ET.Element:
         filter_checks = {'name': name_filter, 'ownerName': owner_name_filter,
                          'updatedAt': updated_at_filter, 'createdAt': created_at_filter,
                          'ownerDomain': owner_domain_filter, 'ownerEmail': owner_email_filter}
@@ -19,17 +20,32 @@ class ProjectMethods():
         filters = self.rest._check_filter_objects(filter_checks)
 
         self.rest.start_log_block()
-        projects = self.rest.query_resource("projects", filters=filters, sorts=sorts)
+        projects = self.rest.query_resource("projects", filters=filters, sorts=sorts, fields=fields,
+                                            page_size=page_size)
         self.rest.end_log_block()
         return projects
 
+    # Generator version of query_projects, yielding each project Element as the pages come back
+    def iter_projects(self, name_filter: Optional[UrlFilter] = None, owner_name_filter: Optional[UrlFilter] = None,
+                      updated_at_filter: Optional[UrlFilter] = None, created_at_filter: Optional[UrlFilter] = None,
+                      owner_domain_filter: Optional[UrlFilter] = None, owner_email_filter: Optional[UrlFilter] = None,
+                      sorts: Optional[List[Sort]] = None, page_size: Optional[int] = None,
+                      fields: Optional[List[str]] = None) -> Iterator[ET.Element]:
+        filter_checks = {'name': name_filter, 'ownerName': owner_name_filter,
+                         'updatedAt': updated_at_filter, 'createdAt': created_at_filter,
+                         'ownerDomain': owner_domain_filter, 'ownerEmail': owner_email_filter}
+
+        filters = self.rest._check_filter_objects(filter_checks)
+        return self.rest.iter_resource("projects", filters=filters, sorts=sorts, fields=fields, page_size=page_size)
+
     def query_projects_json(self, name_filter: Optional[UrlFilter] = None,
                             owner_name_filter: Optional[UrlFilter] = None,
                             updated_at_filter: Optional[UrlFilter] = None,
                             created_at_filter: Optional[UrlFilter] = None,
                             owner_domain_filter: Optional[UrlFilter] = None,
                             owner_email_filter: Optional[UrlFilter] = None, sorts: Optional[List[Sort]] = None,
-                            page_number: Optional[int] = None) -> Dict:
+                            page_number: Optional[int] = None, page_size: Optional[int] = None,
+                            fields: Optional[List[str]] = None) -> Dict:
         filter_checks = {'name': name_filter, 'ownerName': owner_name_filter,
                          'updatedAt': updated_at_filter, 'createdAt': created_at_filter,
                          'ownerDomain': owner_domain_filter, 'ownerEmail': owner_email_filter}
@@ -37,7 +53,8 @@ class ProjectMethods():
         filters = self.rest._check_filter_objects(filter_checks)
 
         self.rest.start_log_block()
-        projects = self.rest.query_resource_json("projects", filters=filters, sorts=sorts, page_number=None)
+        projects = self.rest.query_resource_json("projects", filters=filters, sorts=sorts, fields=fields,
+                                                 page_number=page_number, page_size=page_size)
         self.rest.end_log_block()
         return projects
 
@@ -108,10 +125,10 @@ class ProjectMethods():
 
 
 
-    def query_project_xml_object(self, project_name_or_luid: str) -> ET.Element:
+    def query_project_xml_object(self, project_name_or_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         luid = self.rest.query_project_luid(project_name_or_luid)
-        proj_xml = self.rest.query_single_element_from_endpoint_with_filter('project', luid)
+        proj_xml = self.rest.query_single_element_from_endpoint_with_filter('project', luid, fields=fields)
         self.rest.end_log_block()
         return proj_xml
 
@@ -1,12 +1,19 @@
 # -*- coding: utf-8 -*-
 
 import os
-from typing import Union, Optional, List, Dict, Tuple
+import csv
+import json
+from typing import Union, Optional, List, Dict, Tuple, Iterator, Callable, Any
 from urllib.parse import urlencode
 import copy
 import xml.etree.ElementTree as ET
 import random
 import re
+import time
+import calendar
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
 
 from tableau_tools.logger import Logger
 from tableau_tools.logging_methods import LoggingMethods
@@ -15,7 +22,15 @@ from ._lookups import LookupMethods
 from tableau_tools.tableau_exceptions import *
 from tableau_tools.tableau_rest_api.rest_xml_request import RestXmlRequest
 from tableau_tools.tableau_rest_api.rest_json_request import RestJsonRequest
-from tableau_tools.tableau_rest_api.published_content import Project, Project33, Workbook, Datasource, Flow33
+from tableau_tools.tableau_rest_api.lookup_cache import LuidCache, SqliteLuidCache
+from tableau_tools.tableau_rest_api.multipart_body import MultipartBody
+from tableau_tools.tableau_rest_api.resumable_upload import ResumableUpload
+from tableau_tools.tableau_rest_api.retry_policy import RetryPolicy
+from tableau_tools.tableau_rest_api.rate_limiter import RateLimiter
+from tableau_tools.tableau_rest_api.http_transport import HttpTransport
+from tableau_tools.tableau_rest_api.xml_response_parser import XmlResponseParser
+from tableau_tools.tableau_rest_api.published_content import Project, Project33, Workbook, Datasource, Flow33, \
+    PublishedContent
 from tableau_tools.tableau_rest_api.url_filter import *
 from tableau_tools.tableau_rest_api.sort import *
 from ...tableau_rest_xml import TableauRestXml
@@ -41,22 +56,48 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
         self._login_as_user_id: str = ""
         self._last_error = None
         self.logger: Optional[Logger] = None
-        self._last_response_content_type = None
-
-        self._request_obj: Optional[RestXmlRequest] = None
-        self._request_json_obj: Optional[RestJsonRequest] = None
+        # Each request gets its own RestXmlRequest / RestJsonRequest, all sharing the requests Session of the
+        # transport, so a connection can be used from many threads at once. Details of the last request are kept
+        # per thread. Pool size, timeouts and proxies are set with set_transport()
+        self.transport: HttpTransport = HttpTransport()
+        self._thread_local = threading.local()
 
         # UrlFilter object for factory methods
         self.url_filters = UrlFilter31
         self.sorts = Sort
 
-        # Lookup caches to minimize calls
-        self.username_luid_cache = {}
-        self.group_name_luid_cache = {}
+        # Lookup cache to minimize calls. Covers every content type, keyed by site. Set to None to disable
+        self.luid_cache: Optional[LuidCache] = LuidCache()
 
         # For working around SSL issues
         self.verify_ssl_cert = True
 
+        # Failed requests (HTTP 429 and 5xx, connection errors) are retried with backoff. Set with set_retry_policy()
+        self.retry_policy: Optional[RetryPolicy] = RetryPolicy()
+        # Throttles the requests sent on this connection. Set with set_rate_limiter()
+        self.rate_limiter: Optional[RateLimiter] = None
+        # Parses every XML response. Set with set_xml_parser()
+        self.xml_parser: XmlResponseParser = XmlResponseParser()
+
+        # Set via enable_concurrent_paging() to request the pages of large listings in parallel
+        self.concurrent_paging = False
+        self.max_concurrent_page_requests = 4
+
+        # Number of items per page on paginated queries. None leaves it to the server default (100)
+        self.page_size: Optional[int] = None
+
+        # Files up to single_upload_limit_mb are published in one request, anything larger is sent in
+        # publish_chunk_size_mb pieces through a file upload session. Set with set_publish_chunking()
+        self.single_upload_limit_mb: float = 20
+        self.publish_chunk_size_mb: float = 10
+
+        # Chunked uploads retry failed chunks and keep a checkpoint so they can be resumed. Set with
+        # set_upload_options()
+        self.upload_max_retries: int = 5
+        self.upload_backoff_seconds: float = 2.0
+        self.upload_read_ahead_chunks: int = 2
+        self.upload_checkpoint_directory: Optional[str] = None
+
         self.version: Optional[str] = None
         self.api_version: str  = api_version
         # Starting in version 6 of tableau_tools,  2018.3 is the lowest supported version
@@ -117,15 +158,195 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
     @token.setter
     def token(self, new_token: str):
         self._token = new_token
-        if self._request_obj is not None:
-            self._request_obj.token = self._token
-        if self._request_json_obj is not None:
-            self._request_json_obj.token = self._token
 
     def enable_logging(self, logger_obj: Logger):
         self.logger = logger_obj
-        if self._request_obj is not None:
-            self._request_obj.enable_logging(logger_obj)
+
+    # The request objects last used by the current thread, for looking at the details of the last response
+    @property
+    def _request_obj(self) -> Optional[RestXmlRequest]:
+        return getattr(self._thread_local, 'request_obj', None)
+
+    @property
+    def _request_json_obj(self) -> Optional[RestJsonRequest]:
+        return getattr(self._thread_local, 'request_json_obj', None)
+
+    @property
+    def _last_response_content_type(self) -> Optional[str]:
+        return getattr(self._thread_local, 'last_response_content_type', None)
+
+    @_last_response_content_type.setter
+    def _last_response_content_type(self, content_type: Optional[str]):
+        self._thread_local.last_response_content_type = content_type
+
+    def _get_session(self) -> requests.Session:
+        return self.transport.session
+
+    # A new RestXmlRequest for a single request, with the current token and settings of the connection. Nothing
+    # about the request is stored on the shared objects, so these can be made from any thread
+    def _new_request_obj(self, url: Optional[str] = None, token: Optional[str] = None) -> RestXmlRequest:
+        if token is None:
+            token = self.token
+        request_obj = RestXmlRequest(url, token, self.logger, ns_map_url=self.ns_map['t'],
+                                     verify_ssl_cert=self.verify_ssl_cert,
+                                     concurrent_paging=self.concurrent_paging,
+                                     max_concurrent_page_requests=self.max_concurrent_page_requests,
+                                     session=self._get_session(), retry_policy=self.retry_policy,
+                                     rate_limiter=self.rate_limiter, timeout=self.transport.timeout,
+                                     xml_parser=self.xml_parser)
+        self._thread_local.request_obj = request_obj
+        return request_obj
+
+    def _new_request_json_obj(self, url: Optional[str] = None) -> RestJsonRequest:
+        request_json_obj = RestJsonRequest(url, self.token, self.logger, ns_map_url=self.ns_map['t'],
+                                           verify_ssl_cert=self.verify_ssl_cert, session=self._get_session(),
+                                           retry_policy=self.retry_policy, rate_limiter=self.rate_limiter,
+                                           timeout=self.transport.timeout)
+        self._thread_local.request_json_obj = request_json_obj
+        return request_json_obj
+
+    # Requests pages 2..N of any paginated query in parallel. Keep max_concurrent_requests modest so the
+    # Tableau Server is not overloaded
+    def enable_concurrent_paging(self, max_concurrent_requests: int = 4):
+        if max_concurrent_requests < 1:
+            raise InvalidOptionException('max_concurrent_requests must be 1 or greater')
+        self.concurrent_paging = True
+        self.max_concurrent_page_requests = max_concurrent_requests
+
+    def disable_concurrent_paging(self):
+        self.concurrent_paging = False
+
+    # Sets the pageSize used by all paginated queries on this connection. Larger pages mean far fewer requests
+    # on big sites; the REST API allows up to 1000. None goes back to the server default
+    def set_page_size(self, page_size: Optional[int]):
+        if page_size is not None:
+            self._check_page_size(page_size)
+        self.page_size = page_size
+
+    @staticmethod
+    def _check_page_size(page_size: int):
+        if page_size < 1 or page_size > 1000:
+            raise InvalidOptionException('page_size must be between 1 and 1000')
+
+    # Replaces the RetryPolicy used for every request on this connection, or None to never retry. One RetryPolicy
+    # can be shared between connections so they share its retry budget
+    def set_retry_policy(self, retry_policy: Optional[RetryPolicy]):
+        self.retry_policy = retry_policy
+
+    # Throttles every request on this connection with the RateLimiter, or None for no limit. Give several
+    # connections the same RateLimiter to keep all of them together under one limit
+    def set_rate_limiter(self, rate_limiter: Optional[RateLimiter]):
+        self.rate_limiter = rate_limiter
+
+    # Replaces the HttpTransport (connection pool, timeouts, proxies) used for every request on this connection.
+    # Requests already in progress finish on the old one. Several connections can share one HttpTransport
+    def set_transport(self, transport: HttpTransport):
+        self.transport = transport
+
+    # Chooses how XML responses are parsed, e.g. set_xml_parser(XmlResponseParser('lxml'))
+    def set_xml_parser(self, xml_parser: XmlResponseParser):
+        self.xml_parser = xml_parser
+
+    # Controls how files are published. Files up to single_upload_limit_mb go in one request; larger files are
+    # appended to a file upload session in chunk_size_mb pieces. Either way the file is streamed from disk, so
+    # memory use doesn't depend on these settings. The REST API accepts at most 64 MB in one request
+    def set_publish_chunking(self, single_upload_limit_mb: float = 20, chunk_size_mb: float = 10):
+        if single_upload_limit_mb < 0 or single_upload_limit_mb > 64:
+            raise InvalidOptionException('single_upload_limit_mb must be between 0 and 64')
+        if chunk_size_mb <= 0 or chunk_size_mb > 64:
+            raise InvalidOptionException('chunk_size_mb must be greater than 0 and no more than 64')
+        self.single_upload_limit_mb = single_upload_limit_mb
+        self.publish_chunk_size_mb = chunk_size_mb
+
+    # Controls chunked uploads (see ResumableUpload). A failed chunk is retried up to max_retries times, waiting
+    # backoff_seconds and then doubling. read_ahead_chunks are read from disk while the current chunk is sent. The
+    # checkpoint for resuming an upload is saved next to the file being published, or in checkpoint_directory
+    def set_upload_options(self, max_retries: int = 5, backoff_seconds: float = 2.0, read_ahead_chunks: int = 2,
+                           checkpoint_directory: Optional[str] = None):
+        if max_retries < 0:
+            raise InvalidOptionException('max_retries must be 0 or greater')
+        if read_ahead_chunks < 0:
+            raise InvalidOptionException('read_ahead_chunks must be 0 or greater')
+        self.upload_max_retries = max_retries
+        self.upload_backoff_seconds = backoff_seconds
+        self.upload_read_ahead_chunks = read_ahead_chunks
+        self.upload_checkpoint_directory = checkpoint_directory
+
+    # Replaces the LUID lookup cache for this connection. With sqlite_filename, lookups are also kept on disk and
+    # survive between runs. A LuidCache can also be assigned to .luid_cache directly to share it between connections
+    def enable_luid_cache(self, ttl_seconds: Optional[float] = 900, max_entries: Optional[int] = 50000,
+                          sqlite_filename: Optional[str] = None):
+        if sqlite_filename is not None:
+            self.luid_cache = SqliteLuidCache(db_filename=sqlite_filename, ttl_seconds=ttl_seconds,
+                                              max_entries=max_entries)
+        else:
+            self.luid_cache = LuidCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    def disable_luid_cache(self):
+        self.luid_cache = None
+
+    # Schedules are the only cached content type that lives at the server level rather than in a site
+    def _luid_cache_site(self, content_type: str) -> str:
+        if content_type == 'schedule':
+            return ""
+        return self.site_luid
+
+    def _query_cached_luid(self, content_type: str, name: str, scope: Optional[str] = None) -> Optional[str]:
+        if self.luid_cache is None:
+            return None
+        luid = self.luid_cache.get(self._luid_cache_site(content_type), content_type, name, scope=scope)
+        if luid is not None:
+            self.log('Found {} {} in cache with luid {}'.format(content_type, name, luid))
+        return luid
+
+    def _store_cached_luid(self, content_type: str, name: str, luid: str, scope: Optional[str] = None):
+        if self.luid_cache is not None:
+            self.luid_cache.store(self._luid_cache_site(content_type), content_type, name, luid, scope=scope)
+
+    # Caches the name and LUID of every element from a full listing. Names that appear more than once are skipped,
+    # since they can't be resolved by name alone
+    def _store_cached_luids_from_elements(self, content_type: str, elements: ET.Element):
+        if self.luid_cache is None:
+            return
+        name_counts = {}
+        for e in elements:
+            name_counts[e.get('name')] = name_counts.get(e.get('name'), 0) + 1
+        self.luid_cache.store_many(self._luid_cache_site(content_type), content_type,
+                                   [(e.get('name'), e.get('id'), None) for e in elements
+                                    if name_counts[e.get('name')] == 1])
+
+    # Caches a name -> LUID dict built from a full listing. Names that appeared more than once (with a LUID of None)
+    # are dropped from the cache, since they can't be resolved by name alone
+    def _store_cached_luids_from_names(self, content_type: str, names: Dict[str, Optional[str]]):
+        if self.luid_cache is None:
+            return
+        self.luid_cache.store_many(self._luid_cache_site(content_type), content_type,
+                                   [(name, luid, None) for name, luid in names.items()])
+
+    # Drops cached lookups. With no content_type the whole cache for the current site is cleared, otherwise
+    # only entries of that type matching the name or LUID (or all of that type, if name_or_luid is None)
+    def invalidate_luid_cache(self, content_type: Optional[str] = None, name_or_luid: Optional[str] = None):
+        if self.luid_cache is None:
+            return
+        if content_type is None:
+            self.luid_cache.clear(self.site_luid)
+        elif name_or_luid is None:
+            self.luid_cache.invalidate(self._luid_cache_site(content_type), content_type)
+        elif self.is_luid(name_or_luid):
+            self.luid_cache.invalidate(self._luid_cache_site(content_type), content_type, luid=name_or_luid)
+        else:
+            self.luid_cache.invalidate(self._luid_cache_site(content_type), content_type, name=name_or_luid)
+
+    # Any update or delete of a single piece of content can change or remove a name, so those LUIDs are
+    # dropped from the cache based on the URL of the request
+    def _invalidate_luid_cache_for_url(self, url: str):
+        if self.luid_cache is None:
+            return
+        match = re.search(r'/(sites/[^/]+/(users|groups|projects|workbooks|datasources|databases|tables|webhooks)'
+                          r'|api/[^/]+/(schedules))/([0-9a-fA-F-]+)/?(\?|$)', url)
+        if match is not None:
+            plural = match.group(2) if match.group(2) is not None else match.group(3)
+            self.invalidate_luid_cache(content_type=plural[:-1], name_or_luid=match.group(4))
 
     #
     # Object helpers and setter/getters
@@ -251,27 +472,21 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
 
         self.log('Logging in via: {}'.format(url))
 
-        # Create the RestXmlRequest to be used throughout
-
-        self._request_obj = RestXmlRequest(url, self.token, self.logger, ns_map_url=self.ns_map['t'],
-                                           verify_ssl_cert=self.verify_ssl_cert)
-        self._request_obj.xml_request = tsr
-        self._request_obj.http_verb = 'post'
+        request_obj = self._new_request_obj(url)
+        request_obj.xml_request = tsr
+        request_obj.http_verb = 'post'
         self.log('Login payload is\n {}'.format(ET.tostring(tsr)))
         try:
-            self._request_obj.request_from_api(0)
+            request_obj.request_from_api(0)
             # self.log(api.get_raw_response())
-            xml = self._request_obj.get_response()
+            xml = request_obj.get_response()
 
             credentials_element = xml.findall('.//t:credentials', self.ns_map)
             self.token = credentials_element[0].get("token")
             self.log("Token is " + self.token)
-            self._request_obj.token = self.token
             self.site_luid = credentials_element[0].findall(".//t:site", self.ns_map)[0].get("id")
             self.user_luid = credentials_element[0].findall(".//t:user", self.ns_map)[0].get("id")
             self.log("Site ID is " + self.site_luid)
-            self._request_obj.url = None
-            self._request_obj.xml_request = None
         except RecoverableHTTPException as e:
             if e.tableau_error_code == '401001':
                 self.end_log_block()
@@ -280,63 +495,48 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
 
     def swap_token(self, site_luid: str, user_luid: str, token: str):
         self.start_log_block()
+        # Every request picks up the current token, and the lookup cache is keyed by site, so nothing else needs
+        # to be reset when changing site
         self.token = token
-        # Reset caches if you are changing site
-        if self.site_luid != site_luid:
-            self.group_name_luid_cache = {}
-            self.username_luid_cache = {}
         self.site_luid = site_luid
         self.user_luid = user_luid
-        if self._request_obj is None:
-            self._request_obj = RestXmlRequest(None, self.token, self.logger, ns_map_url=self.ns_map['t'],
-                                               verify_ssl_cert=self.verify_ssl_cert)
-            self._request_obj.token = self.token
-        else:
-            self._request_obj.token = self.token
         self.end_log_block()
 
     def signout(self, session_token: Optional[str] = None):
         self.start_log_block()
         url = self.build_api_url("auth/signout", server_level=True)
         self.log('Logging out via: {}'.format(url))
-        self._request_obj.url = url
         # This allows for signout when using the older session token style
-        if session_token is not None:
-            self._request_obj.token = session_token
-
-        self._request_obj.http_verb = 'post'
-        self._request_obj.request_from_api()
-        # Reset the main object to the original token for other requests
-        self._request_obj.token = self.token
-        self._request_obj.url = None
+        request_obj = self._new_request_obj(url, token=session_token)
+        request_obj.http_verb = 'post'
+        request_obj.request_from_api()
         self.log('Signed out successfully')
         self.end_log_block()
 
     def switch_site(self, site_content_url):
         self.start_log_block()
-        url = self.build_api_url("auth/signout", server_level=True)
-        self.log('Switching site via'.format(url))
+        url = self.build_api_url("auth/switchSite", server_level=True)
+        self.log('Switching site via {}'.format(url))
         tsr = ET.Element('tsRequest')
         s = ET.Element('site')
         s.set('contentUrl', site_content_url)
         tsr.append(s)
 
-        self._request_obj.http_verb = 'post'
+        request_obj = self._new_request_obj(url)
+        request_obj.xml_request = tsr
+        request_obj.http_verb = 'post'
         self.log('Switch site request XML is\n {}'.format(ET.tostring(tsr)))
 
-        self._request_obj.request_from_api(0)
+        request_obj.request_from_api(0)
         # self.log(api.get_raw_response())
-        xml = self._request_obj.get_response()
+        xml = request_obj.get_response()
 
         credentials_element = xml.findall('.//t:credentials', self.ns_map)
         self.token = credentials_element[0].get("token")
         self.log("Token is " + self.token)
-        self._request_obj.token = self.token
         self.site_luid = credentials_element[0].findall(".//t:site", self.ns_map)[0].get("id")
         self.user_luid = credentials_element[0].findall(".//t:user", self.ns_map)[0].get("id")
         self.log("Site ID is " + self.site_luid)
-        self._request_obj.url = None
-        self._request_obj.xml_request = None
 
         self.end_log_block()
 
@@ -344,13 +544,11 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
     # HTTP "verb" methods. These actually communicate with the RestXmlRequest object to place the requests
     #
 
-    # baseline method for any get request. appends to base url
-    def query_resource(self, url_ending: str, server_level:bool = False, filters: Optional[List[UrlFilter]] = None,
-                       sorts: Optional[List[Sort]] = None, additional_url_ending: Optional[str] = None,
-                       fields: Optional[List[str]] = None) -> ET.Element:
-        self.start_log_block()
-        if self.token == "":
-            raise NotSignedInException('Must use .signin() to create REST API session first')
+    # Adds the filter, sort and fields parameters on to the end of a URL ending
+    @staticmethod
+    def _build_query_url_ending(url_ending: str, filters: Optional[List[UrlFilter]] = None,
+                                sorts: Optional[List[Sort]] = None, fields: Optional[List[str]] = None,
+                                additional_url_ending: Optional[str] = None, page_size: Optional[int] = None) -> str:
         url_endings = []
         if filters is not None:
             if len(filters) > 0:
@@ -375,8 +573,11 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                 url_endings.append(fields_url)
         if additional_url_ending is not None:
             url_endings.append(additional_url_ending)
+        if page_size is not None:
+            url_endings.append("pageSize={}".format(page_size))
 
-        first = True
+        # The url_ending may already have its own parameters
+        first = '?' not in url_ending
         if len(url_endings) > 0:
             for ending in url_endings:
                 if first is True:
@@ -384,48 +585,100 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                     first = False
                 else:
                     url_ending += "&{}".format(ending)
+        return url_ending
 
+    # baseline method for any get request. appends to base url
+    def query_resource(self, url_ending: str, server_level:bool = False, filters: Optional[List[UrlFilter]] = None,
+                       sorts: Optional[List[Sort]] = None, additional_url_ending: Optional[str] = None,
+                       fields: Optional[List[str]] = None, page_size: Optional[int] = None) -> ET.Element:
+        self.start_log_block()
+        if self.token == "":
+            raise NotSignedInException('Must use .signin() to create REST API session first')
+        if page_size is None:
+            page_size = self.page_size
+        else:
+            self._check_page_size(page_size)
+        url_ending = self._build_query_url_ending(url_ending=url_ending, filters=filters, sorts=sorts, fields=fields,
+                                                  additional_url_ending=additional_url_ending, page_size=page_size)
         api_call = self.build_api_url(url_ending, server_level)
-        self._request_obj.set_response_type('xml')
-        self._request_obj.url = api_call
-        self._request_obj.http_verb = 'get'
-        self._request_obj.request_from_api()
-        xml = self._request_obj.get_response()  # return Element rather than ElementTree
-        self._request_obj.url = None
+        request_obj = self._new_request_obj(api_call)
+        request_obj.http_verb = 'get'
+        request_obj.request_from_api()
+        xml = request_obj.get_response()  # return Element rather than ElementTree
         self.end_log_block()
         return xml
 
+    # Streaming version of query_resource. Returns a generator that yields each element (user, workbook, etc.)
+    # as the pages arrive, rather than one Element holding every page, so memory stays flat on large sites
+    def iter_resource(self, url_ending: str, server_level: bool = False, filters: Optional[List[UrlFilter]] = None,
+                      sorts: Optional[List[Sort]] = None, additional_url_ending: Optional[str] = None,
+                      fields: Optional[List[str]] = None, page_size: Optional[int] = None) -> Iterator[ET.Element]:
+        self.start_log_block()
+        if self.token == "":
+            raise NotSignedInException('Must use .signin() to create REST API session first')
+        if page_size is None:
+            page_size = self.page_size
+        else:
+            self._check_page_size(page_size)
+        url_ending = self._build_query_url_ending(url_ending=url_ending, filters=filters, sorts=sorts, fields=fields,
+                                                  additional_url_ending=additional_url_ending, page_size=page_size)
+        api_call = self.build_api_url(url_ending, server_level)
+        elements = self._new_request_obj().iterate_from_api(api_call)
+        self.end_log_block()
+        return elements
+
+    # The fields asked for when looking up a LUID from a name. Only the content types whose listings take a fields
+    # parameter are here. Workbooks and datasources with the same name are told apart by their project (and
+    # datasources by contentUrl), so those come back too
+    _lookup_fields = {'user': ['id', 'name'], 'group': ['id', 'name'], 'project': ['id', 'name'],
+                      'workbook': ['id', 'name', 'project.id', 'project.name'],
+                      'datasource': ['id', 'name', 'contentUrl', 'project.id', 'project.name'],
+                      'flow': ['id', 'name', 'project.id', 'project.name']}
+
+    # When resolving many usernames at once, up to this many are looked up one by one. Any more and the user listing
+    # is read instead (1000 users per request)
+    max_individual_user_lookups = 20
+
+    # Adds any fields a method needs for its own filtering (e.g. project.id to filter by project) to the fields that
+    # were asked for. Nothing is added when all fields or the default fields are being returned anyway
+    @staticmethod
+    def _add_required_fields(fields: Optional[List[str]], required_fields: List[str]) -> Optional[List[str]]:
+        if fields is None or '_all_' in fields or '_default_' in fields:
+            return fields
+        return list(fields) + [f for f in required_fields if f not in fields]
+
+    # fields, if given, is used instead of all_fields
     def query_elements_from_endpoint_with_filter(self, element_name: str, name_or_luid: Optional[str] = None,
-                                                 all_fields: bool = True) -> ET.Element:
+                                                 all_fields: bool = True,
+                                                 fields: Optional[List[str]] = None) -> ET.Element:
 
         self.start_log_block()
+        if fields is None and all_fields is True:
+            fields = ['_all_']
         # A few elements have singular endpoints
         singular_endpoints = ['workbook', 'user', 'datasource', 'site']
         if element_name in singular_endpoints and self.is_luid(name_or_luid):
-            if all_fields is True:
-                element = self.query_resource("{}s/{}?fields=_all_".format(element_name, name_or_luid))
-            else:
-                element = self.query_resource("{}s/{}".format(element_name, name_or_luid))
+            element = self.query_resource("{}s/{}".format(element_name, name_or_luid), fields=fields)
             self.end_log_block()
             return element
         else:
             if self.is_luid(name_or_luid):
-                if all_fields is True:
-                    elements = self.query_resource("{}s?fields=_all_".format(element_name))
-                else:
-                    elements = self.query_resource("{}s".format(element_name))
+                elements = self.query_resource("{}s".format(element_name), fields=fields)
                 luid = name_or_luid
                 elements = elements.findall('.//t:{}[@id="{}"]'.format(element_name, luid), self.ns_map)
             else:
-                elements = self.query_resource("{}s?filter=name:eq:{}&fields=_all_".format(element_name, name_or_luid))
+                elements = self.query_resource("{}s?filter=name:eq:{}".format(element_name, name_or_luid),
+                                               fields=fields)
         self.end_log_block()
         return elements
 
     def query_single_element_from_endpoint_with_filter(self, element_name: str,
                                                        name_or_luid: Optional[str] = None,
-                                                       all_fields: bool = True) -> ET.Element:
+                                                       all_fields: bool = True,
+                                                       fields: Optional[List[str]] = None) -> ET.Element:
         self.start_log_block()
-        elements = self.query_elements_from_endpoint_with_filter(element_name, name_or_luid, all_fields=all_fields)
+        elements = self.query_elements_from_endpoint_with_filter(element_name, name_or_luid, all_fields=all_fields,
+                                                                 fields=fields)
 
         if len(elements) == 1:
             self.end_log_block()
@@ -445,7 +698,7 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
         if content_url is True:
             if content_type not in content_url_endpoints:
                 raise InvalidOptionException('Only workbook and datasource can be used as content_type when searching via content_url')
-        filterable_endpoints = ['project', 'workbook', 'datasource']  # complete this outy
+        filterable_endpoints = ['user', 'group', 'project', 'workbook', 'datasource']
         if content_type in filterable_endpoints and content_url is False:
             luid = self.query_single_element_luid_from_endpoint_with_filter(element_name=content_type, name=name)
         else:
@@ -462,13 +715,9 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
         pass
 
     def query_single_element_luid_from_endpoint_with_filter(self, element_name: str, name: str) -> str:
-        # Double check which can be optimized with the Fields to only bring back id
-        optimizable_fields = ['user', ]
         self.start_log_block()
-        if element_name in optimizable_fields:
-            elements = self.query_resource("{}s?filter=name:eq:{}&fields=id".format(element_name, name))
-        else:
-            elements = self.query_resource("{}s?filter=name:eq:{}".format(element_name, name))
+        elements = self.query_resource("{}s?filter=name:eq:{}".format(element_name, name),
+                                       fields=self._lookup_fields.get(element_name))
         if len(elements) == 1:
             self.end_log_block()
             return elements[0].get("id")
@@ -476,114 +725,125 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
             self.end_log_block()
             raise NoMatchFoundException("No {} found with name {}".format(element_name, name))
 
+    # For endpoints that can't be filtered by name on the Tableau Server (schedules, webhooks, databases, tables).
+    # The whole listing is read once, at the largest page size, and every name in it is loaded into the lookup
+    # cache, so later lookups of the same content type are answered without going to the server
     def query_single_element_luid_by_name_from_endpoint(self, element_name: str, name: str,
                                                         server_level: bool = False) -> str:
         self.start_log_block()
         # Short circuit if this is already a luid
         if self.is_luid(name):
+            self.end_log_block()
             return name
 
-        elements = self.query_resource("{}s".format(element_name), server_level=server_level)
-        # Groups have a cache within tableau_tools
-        if element_name == 'group':
-            for e in elements:
-                self.group_name_luid_cache[e.get('name')] = e.get('id')
-        element = elements.findall('.//t:{}[@name="{}"]'.format(element_name, name), self.ns_map)
-        if len(element) == 1:
+        luids_with_name = []
+        # name -> LUID, None once a name has been seen twice
+        names = {}
+        for element in self.iter_resource("{}s".format(element_name), server_level=server_level,
+                                          fields=self._lookup_fields.get(element_name), page_size=1000):
+            element_name_value = element.get('name')
+            if element_name_value == name:
+                luids_with_name.append(element.get('id'))
+            if element_name_value in names:
+                names[element_name_value] = None
+            else:
+                names[element_name_value] = element.get('id')
+        self._store_cached_luids_from_names(element_name, names)
+        self.log('Loaded {} {} names into the lookup cache'.format(len(names), element_name))
+
+        if len(luids_with_name) == 1:
             self.end_log_block()
-            return element[0].get("id")
-        else:
+            return luids_with_name[0]
+        elif len(luids_with_name) == 0:
             self.end_log_block()
             raise NoMatchFoundException("No {} found with name {}".format(element_name, name))
+        else:
+            self.end_log_block()
+            raise MultipleMatchesFoundException(
+                'More than one {} found by name {}. Please determine LUID using another method'.format(element_name,
+                                                                                                      name))
 
     # baseline method for any get request. appends to base url
     def query_resource_json(self, url_ending: str, server_level: bool = False,
                             filters: Optional[List[UrlFilter]] = None,
                             sorts: Optional[List[Sort]] = None, additional_url_ending: str = None,
-                            fields: Optional[List[str]] = None, page_number: Optional[int] = None) -> Dict:
+                            fields: Optional[List[str]] = None, page_number: Optional[int] = None,
+                            page_size: Optional[int] = None) -> Dict:
         self.start_log_block()
         if self.token == "":
             raise NotSignedInException('Must use .signin() to create REST API session first')
-        url_endings = []
-        if filters is not None:
-            if len(filters) > 0:
-                filters_url = "filter="
-                for f in filters:
-                    filters_url += f.get_filter_string() + ","
-                filters_url = filters_url[:-1]
-                url_endings.append(filters_url)
-        if sorts is not None:
-            if len(sorts) > 0:
-                sorts_url = "sort="
-                for sort in sorts:
-                    sorts_url += sort.get_sort_string() + ","
-                sorts_url = sorts_url[:-1]
-                url_endings.append(sorts_url)
-        if fields is not None:
-            if len(fields) > 0:
-                fields_url = "fields="
-                for field in fields:
-                    fields_url += "{},".format(field)
-                fields_url = fields_url[:-1]
-                url_endings.append(fields_url)
-        if additional_url_ending is not None:
-            url_endings.append(additional_url_ending)
-
-        first = True
-        if len(url_endings) > 0:
-            for ending in url_endings:
-                if first is True:
-                    url_ending += "?{}".format(ending)
-                    first = False
-                else:
-                    url_ending += "&{}".format(ending)
-
+        if page_size is None:
+            page_size = self.page_size
+        else:
+            self._check_page_size(page_size)
+        url_ending = self._build_query_url_ending(url_ending=url_ending, filters=filters, sorts=sorts, fields=fields,
+                                                  additional_url_ending=additional_url_ending, page_size=page_size)
         api_call = self.build_api_url(url_ending, server_level)
-        if self._request_json_obj is None:
-            self._request_json_obj = RestJsonRequest(token=self.token, logger=self.logger,
-                                                     verify_ssl_cert=self.verify_ssl_cert)
-        self._request_json_obj.http_verb = 'get'
-        self._request_json_obj.url = api_call
-        self._request_json_obj.request_from_api(page_number=page_number)
-        json_response = self._request_json_obj.get_response()  # return JSON as string
-        self._request_obj.url = None
+        request_json_obj = self._new_request_json_obj(api_call)
+        request_json_obj.http_verb = 'get'
+        request_json_obj.request_from_api(page_number=page_number)
+        json_response = request_json_obj.get_response()  # return JSON as string
         self.end_log_block()
         return json_response
 
+    # Content with a singular endpoint is fetched on its own, after resolving a name with query_{element}_luid (which
+    # uses the lookup cache). Anything else is found in a single pass through the listing, by LUID if it is already
+    # known or cached, otherwise by name
     def query_single_element_from_endpoint(self, element_name: str, name_or_luid: str,
-                                           server_level: bool = False) -> ET.Element:
+                                           server_level: bool = False,
+                                           fields: Optional[List[str]] = None) -> ET.Element:
 
         self.start_log_block()
         # A few elements have singular endpoints
         singular_endpoints = ['workbook', 'user', 'datasource', 'site', 'database', 'table']
-        if element_name in singular_endpoints and self.is_luid(name_or_luid):
-            element = self.query_resource("{}s/{}".format(element_name, name_or_luid))
-            self.end_log_block()
-            return element
-        else:
-            elements = self.query_resource("{}s".format(element_name), server_level=server_level)
+        if element_name in singular_endpoints:
             if self.is_luid(name_or_luid):
                 luid = name_or_luid
+            elif hasattr(self, 'query_{}_luid'.format(element_name)):
+                luid = getattr(self, 'query_{}_luid'.format(element_name))(name_or_luid)
             else:
-                luid = self.query_single_element_luid_by_name_from_endpoint(element_name, name_or_luid)
-            element = elements.findall('.//t:{}[@id="{}"]'.format(element_name, luid), self.ns_map)
-        if len(element) == 1:
+                luid = self.query_single_element_luid_by_name_from_endpoint(element_name, name_or_luid,
+                                                                            server_level=server_level)
+            element = self.query_resource("{}s/{}".format(element_name, luid), server_level=server_level,
+                                          fields=fields)
             self.end_log_block()
-            return element[0]
+            return element
+
+        name = None
+        if self.is_luid(name_or_luid):
+            luid = name_or_luid
         else:
+            name = name_or_luid
+            luid = self._query_cached_luid(element_name, name)
+        # Matches on the name are collected as well, in case a cached LUID is out of date
+        elements_with_name = []
+        for element in self.iter_resource("{}s".format(element_name), server_level=server_level, fields=fields,
+                                          page_size=1000):
+            if luid is not None and element.get('id') == luid:
+                self.end_log_block()
+                return element
+            if name is not None and element.get('name') == name:
+                elements_with_name.append(element)
+        if len(elements_with_name) == 1:
+            self._store_cached_luid(element_name, name, elements_with_name[0].get('id'))
             self.end_log_block()
-            raise NoMatchFoundException("No {} found with name or luid {}".format(element_name, name_or_luid))
+            return elements_with_name[0]
+        elif len(elements_with_name) > 1:
+            self.end_log_block()
+            raise MultipleMatchesFoundException(
+                'More than one {} found by name {}. Please determine LUID using another method'.format(element_name,
+                                                                                                      name_or_luid))
+        self.end_log_block()
+        raise NoMatchFoundException("No {} found with name or luid {}".format(element_name, name_or_luid))
 
     def send_post_request(self, url: str) -> ET.Element:
         self.start_log_block()
         if self.token == "":
             raise NotSignedInException('Must use .signin() to create REST API session first')
-        self._request_obj.set_response_type('xml')
-        self._request_obj.url = url
-        self._request_obj.http_verb = 'post'
-        self._request_obj.request_from_api(0)
-        xml = self._request_obj.get_response()  # return Element rather than ElementTree
-        self._request_obj.url = None
+        request_obj = self._new_request_obj(url)
+        request_obj.http_verb = 'post'
+        request_obj.request_from_api(0)
+        xml = request_obj.get_response()  # return Element rather than ElementTree
         self.end_log_block()
         return xml
 
@@ -591,30 +851,21 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
         self.start_log_block()
         if self.token == "":
             raise NotSignedInException('Must use .signin() to create REST API session first')
-        self._request_obj.set_response_type('xml')
-        self._request_obj.url = url
-        self._request_obj.xml_request = request
-        self._request_obj.http_verb = 'post'
-        self._request_obj.request_from_api(0)  # Zero disables paging, for all non queries
-        xml = self._request_obj.get_response()  # return Element rather than ElementTree
-        # Clean up after request made
-        self._request_obj.url = None
-        self._request_obj.xml_request = None
+        request_obj = self._new_request_obj(url)
+        request_obj.xml_request = request
+        request_obj.http_verb = 'post'
+        request_obj.request_from_api(0)  # Zero disables paging, for all non queries
+        xml = request_obj.get_response()  # return Element rather than ElementTree
         self.end_log_block()
         return xml
 
     def send_add_request_json(self, url: str, request: Dict) -> Dict:
         self.start_log_block()
-        if self._request_json_obj is None:
-            self._request_json_obj = RestJsonRequest(token=self.token, logger=self.logger,
-                                                     verify_ssl_cert=self.verify_ssl_cert)
-        self._request_json_obj.http_verb = 'post'
-        self._request_json_obj.url = url
-        self._request_json_obj.json_request = request
-        self._request_json_obj.request_from_api(0)
-        json_response = self._request_json_obj.get_response()
-        self._request_json_obj.url = None
-        self._request_json_obj.json_request = None
+        request_json_obj = self._new_request_json_obj(url)
+        request_json_obj.http_verb = 'post'
+        request_json_obj.json_request = request
+        request_json_obj.request_from_api(0)
+        json_response = request_json_obj.get_response()
         self.end_log_block()
         return json_response
 
@@ -622,71 +873,68 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
         self.start_log_block()
         if self.token == "":
             raise NotSignedInException('Must use .signin() to create REST API session first')
-        self._request_obj.set_response_type('xml')
-        self._request_obj.url = url
-        self._request_obj.xml_request = request
-        self._request_obj.http_verb = 'put'
-        self._request_obj.request_from_api(0)  # Zero disables paging, for all non queries
+        self._invalidate_luid_cache_for_url(url)
+        request_obj = self._new_request_obj(url)
+        request_obj.xml_request = request
+        request_obj.http_verb = 'put'
+        request_obj.request_from_api(0)  # Zero disables paging, for all non queries
         self.end_log_block()
-        self._request_obj.url = None
-        self._request_obj.xml_request = None
-        return self._request_obj.get_response()
+        return request_obj.get_response()
 
-    def send_delete_request(self, url: str) -> int:
+    # Returns 1 if the delete succeeded. A RecoverableHTTPException (e.g. the resource wasn't there) is logged and
+    # None is returned, unless raise_exceptions=True, for callers that need to know exactly what happened
+    def send_delete_request(self, url: str, raise_exceptions: bool = False) -> Optional[int]:
         self.start_log_block()
         if self.token == "":
             raise NotSignedInException('Must use .signin() to create REST API session first')
-        self._request_obj.set_response_type('xml')
-        self._request_obj.url = url
-        self._request_obj.http_verb = 'delete'
+        self._invalidate_luid_cache_for_url(url)
+        request_obj = self._new_request_obj(url)
+        request_obj.http_verb = 'delete'
 
         try:
-            self._request_obj.request_from_api(0)  # Zero disables paging, for all non queries
-            self._request_obj.url = None
+            request_obj.request_from_api(0)  # Zero disables paging, for all non queries
             self.end_log_block()
             # Return for counter
             return 1
         except RecoverableHTTPException as e:
             self.log('Non fatal HTTP Exception Response {}, Tableau Code {}'.format(e.http_code, e.tableau_error_code))
+            self.end_log_block()
+            if raise_exceptions is True:
+                raise
             if e.tableau_error_code in [404003, 404002]:
                 self.log('Delete action did not find the resource. Consider successful, keep going')
-            self._request_obj.url = None
-            self.end_log_block()
         except:
+            self.end_log_block()
             raise
 
-    def send_publish_request(self, url: str, xml_request: Optional[ET.Element], content: bytes,
-                             boundary_string: str) -> ET.Element:
+    def send_publish_request(self, url: str, xml_request: Optional[ET.Element],
+                             content: Union[bytes, MultipartBody], boundary_string: str) -> ET.Element:
         self.start_log_block()
         if self.token == "":
             raise NotSignedInException('Must use .signin() to create REST API session first')
-        self._request_obj.set_response_type('xml')
-        self._request_obj.url = url
-        self._request_obj.set_publish_content(content, boundary_string)
-        self._request_obj.xml_request = xml_request
-        self._request_obj.http_verb = 'post'
-        self._request_obj.request_from_api(0)
-        xml = self._request_obj.get_response()  # return Element rather than ElementTree
-        # Cleanup
-        self._request_obj.set_publish_content(None, None)
-        self._request_obj.xml_request = None
-        self._request_obj.url = None
+        request_obj = self._new_request_obj(url)
+        request_obj.set_publish_content(content, boundary_string)
+        request_obj.xml_request = xml_request
+        request_obj.http_verb = 'post'
+        request_obj.request_from_api(0)
+        xml = request_obj.get_response()  # return Element rather than ElementTree
+        # Cleanup, so the content can be released while the request object is still around for inspection
+        request_obj.set_publish_content(None, None)
         self.end_log_block()
         return xml
 
-    def send_append_request(self, url: str, content: bytes, boundary_string: str) -> ET.Element:
+    def send_append_request(self, url: str, content: Union[bytes, MultipartBody],
+                            boundary_string: str) -> ET.Element:
         self.start_log_block()
         if self.token == "":
             raise NotSignedInException('Must use .signin() to create REST API session first')
-        self._request_obj.set_response_type('xml')
-        self._request_obj.url = url
-        self._request_obj.set_publish_content(content, boundary_string)
-        self._request_obj.http_verb = 'put'
-        self._request_obj.request_from_api(0)
-        xml = self._request_obj.get_response()  # return Element rather than ElementTree
+        request_obj = self._new_request_obj(url)
+        request_obj.set_publish_content(content, boundary_string)
+        request_obj.http_verb = 'put'
+        request_obj.request_from_api(0)
+        xml = request_obj.get_response()  # return Element rather than ElementTree
         # Cleanup
-        self._request_obj.set_publish_content(None, None)
-        self._request_obj.url = None
+        request_obj.set_publish_content(None, None)
         self.end_log_block()
         return xml
 
@@ -695,21 +943,219 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
         self.start_log_block()
         if self.token == "":
             raise NotSignedInException('Must use .signin() to create REST API session first')
-        self._request_obj.url = url
-
-        self._request_obj.http_verb = 'get'
-        self._request_obj.set_response_type('binary')
-        self._request_obj.request_from_api(0)
+        request_obj = self._new_request_obj(url)
+        request_obj.http_verb = 'get'
+        request_obj.set_response_type('binary')
+        request_obj.request_from_api(0)
         # Set this content type so we can set the file extension
-        self._last_response_content_type = self._request_obj.get_last_response_content_type()
+        self._last_response_content_type = request_obj.get_last_response_content_type()
 
-        # Cleanup
-        self._request_obj.url = None
+        self.end_log_block()
+        return request_obj.get_response()
+
+    # File extensions for downloaded content, depending on whether the server sent the plain XML or the packaged file
+    _download_extensions = {'workbook': ('.twb', '.twbx'), 'datasource': ('.tds', '.tdsx')}
+
+    # Generic implementation of workbook and datasource downloads. The file is streamed to disk chunk_size bytes at a
+    # time, so even multi-GB files never sit in memory. It is written to filename_no_extension + '.part' and only
+    # renamed once complete; with resume=True an existing .part file is continued from where it stopped, if the
+    # server supports Range requests. The updated_at and ETag of the download are kept in a '.part.json' file next
+    # to it, and the .part file is thrown away rather than resumed if they no longer match the content on the server.
+    # With skip_existing=True, a file that is already there is not downloaded again if its modified time matches
+    # updated_at (the updatedAt of the content, which is set as the modified time of every downloaded file) or its
+    # size matches the Content-Length of the download.
+    # Returns a dict describing the download: luid, filename, status ('downloaded', 'resumed' or 'skipped'),
+    # bytes, seconds and mb_per_second
+    def _download_content(self, content_type: str, luid: str, filename_no_extension: str,
+                          include_extract: bool = True, chunk_size: int = 1024 * 1024,
+                          updated_at: Optional[str] = None, skip_existing: bool = False,
+                          resume: bool = False) -> Dict:
+        self.start_log_block()
+        if self.token == "":
+            raise NotSignedInException('Must use .signin() to create REST API session first')
+        xml_extension, packaged_extension = self._download_extensions[content_type]
+        result = {'luid': luid, 'filename': None, 'status': None, 'bytes': 0, 'seconds': 0.0, 'mb_per_second': 0.0}
+
+        updated_timestamp = None
+        if updated_at is not None:
+            updated_timestamp = calendar.timegm(time.strptime(updated_at, '%Y-%m-%dT%H:%M:%SZ'))
+        if skip_existing is True and updated_timestamp is not None:
+            for extension in (xml_extension, packaged_extension):
+                existing_filename = filename_no_extension + extension
+                if os.path.exists(existing_filename) and int(os.path.getmtime(existing_filename)) == updated_timestamp:
+                    self.log('{} is already up to date, skipping'.format(existing_filename))
+                    result.update({'filename': existing_filename, 'status': 'skipped',
+                                   'bytes': os.path.getsize(existing_filename)})
+                    self.end_log_block()
+                    return result
+
+        partial_filename = filename_no_extension + '.part'
+        partial_info_filename = partial_filename + '.json'
+        byte_offset = 0
+        etag = None
+        if resume is True and os.path.exists(partial_filename):
+            partial_info = self._read_partial_download_info(partial_info_filename)
+            # Without updated_at there's no telling which version of the content the partial file holds
+            if partial_info is not None and updated_at is not None and partial_info.get('updated_at') == updated_at:
+                byte_offset = os.path.getsize(partial_filename)
+                etag = partial_info.get('etag')
+            else:
+                self.log('{} is from a different version of the content, starting again'.format(partial_filename))
+
+        if include_extract is False:
+            url = self.build_api_url("{}s/{}/content?includeExtract=False".format(content_type, luid))
+        else:
+            url = self.build_api_url("{}s/{}/content".format(content_type, luid))
+        start_time = time.time()
+        response = self._new_request_obj(url).stream_from_api(byte_offset=byte_offset, if_range=etag)
+        try:
+            response_content_type = response.headers.get('Content-Type', '')
+            if response_content_type.find('application/xml') != -1:
+                save_filename = filename_no_extension + xml_extension
+            elif response_content_type.find('application/octet-stream') != -1:
+                save_filename = filename_no_extension + packaged_extension
+            else:
+                raise IOError('File extension could not be determined')
+            self.log('Response type was {} so file will be {}'.format(response_content_type, save_filename))
+            # Server didn't honor the Range request, so the whole file is coming
+            if response.status_code != 206:
+                byte_offset = 0
+
+            content_length = response.headers.get('Content-Length')
+            if skip_existing is True and byte_offset == 0 and content_length is not None and \
+                    os.path.exists(save_filename) and os.path.getsize(save_filename) == int(content_length):
+                self.log('{} is already there with the same size, skipping'.format(save_filename))
+                result.update({'filename': save_filename, 'status': 'skipped', 'bytes': int(content_length)})
+                self.end_log_block()
+                return result
+
+            if byte_offset == 0:
+                with open(partial_info_filename, 'w') as partial_info_file:
+                    json.dump({'updated_at': updated_at, 'etag': response.headers.get('ETag')}, partial_info_file)
+            bytes_written = 0
+            with open(partial_filename, 'ab' if byte_offset > 0 else 'wb') as save_file:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    save_file.write(chunk)
+                    bytes_written += len(chunk)
+        finally:
+            response.close()
+        os.replace(partial_filename, save_filename)
+        if os.path.exists(partial_info_filename):
+            os.remove(partial_info_filename)
+        if updated_timestamp is not None:
+            os.utime(save_filename, (updated_timestamp, updated_timestamp))
+
+        seconds = time.time() - start_time
+        result.update({'filename': save_filename, 'status': 'resumed' if byte_offset > 0 else 'downloaded',
+                       'bytes': bytes_written, 'seconds': seconds})
+        if seconds > 0:
+            result['mb_per_second'] = bytes_written / (1024 * 1024) / seconds
+        self.log('Saved {} bytes to {} in {:.2f} seconds ({:.2f} MB/s)'.format(bytes_written, save_filename, seconds,
+                                                                              result['mb_per_second']))
+        self.end_log_block()
+        return result
 
+    # The contents of the '.part.json' file kept next to a partial download, or None if it is missing or unreadable
+    @staticmethod
+    def _read_partial_download_info(partial_info_filename: str) -> Optional[Dict]:
+        try:
+            with open(partial_info_filename, 'r') as partial_info_file:
+                return json.load(partial_info_file)
+        except (IOError, ValueError):
+            return None
+
+    # Calls function on each of the items, max_concurrent_requests at a time, and returns the results in order.
+    # function should catch its own exceptions, so one failure doesn't stop the others
+    def _run_in_parallel(self, function: Callable[[Any], Any], items: List[Any],
+                         max_concurrent_requests: int = 4) -> List[Any]:
+        if max_concurrent_requests < 1:
+            raise InvalidOptionException('max_concurrent_requests must be 1 or greater')
+        if max_concurrent_requests == 1 or len(items) <= 1:
+            return [function(item) for item in items]
+        with ThreadPoolExecutor(max_workers=max_concurrent_requests) as executor:
+            return list(executor.map(function, items))
+
+    # Downloads many workbooks or datasources at once, max_concurrent_downloads at a time. Either give a list of
+    # LUIDs, or leave it as None to download everything (optionally only within one project). Files are saved as
+    # save_to_directory/{project name}/{contentUrl}, or straight into save_to_directory as {contentUrl}_{luid} with
+    # use_project_directories=False, so that content from different projects can't overwrite each other. A failure
+    # on one file doesn't stop the others; its result has status 'failed' and the exception in 'error'. Returns the
+    # result dict of each download (see _download_content), in order
+    def _download_content_in_bulk(self, content_type: str, save_to_directory: str, luids: Optional[List[str]] = None,
+                                  project_name_or_luid: Optional[str] = None, include_extract: bool = True,
+                                  max_concurrent_downloads: int = 4, skip_existing: bool = True,
+                                  resume: bool = True, use_project_directories: bool = True,
+                                  chunk_size: int = 1024 * 1024) -> List[Dict]:
+        self.start_log_block()
+        if max_concurrent_downloads < 1:
+            raise InvalidOptionException('max_concurrent_downloads must be 1 or greater')
+
+        # Only what is needed to name and check each file is kept from the listing
+        def file_info(content_element: ET.Element) -> Dict[str, Optional[str]]:
+            project_element = content_element.find('t:project', self.ns_map)
+            return {'contentUrl': content_element.get('contentUrl'), 'name': content_element.get('name'),
+                    'updatedAt': content_element.get('updatedAt'),
+                    'projectName': project_element.get('name') if project_element is not None else None}
+
+        if luids is None:
+            filters = None
+            project_luid = None
+            if project_name_or_luid is not None:
+                if self.is_luid(project_name_or_luid):
+                    project_luid = project_name_or_luid
+                    project_name = self.query_project_name(project_luid)
+                else:
+                    project_luid = self.query_project_luid(project_name_or_luid)
+                    project_name = project_name_or_luid
+                filters = [UrlFilter33.get_project_name_equals_filter(project_name)]
+            content = self.iter_resource("{}s".format(content_type), filters=filters, page_size=1000,
+                                         fields=['id', 'name', 'contentUrl', 'updatedAt', 'project.id',
+                                                 'project.name'])
+            # Nested projects can share a name, so the filter can still return content from other projects
+            items = [(c.get('id'), file_info(c)) for c in content
+                     if project_luid is None or
+                     c.find('t:project[@id="{}"]'.format(project_luid), self.ns_map) is not None]
+        else:
+            items = [(luid, None) for luid in luids]
+
+        def download(item: Tuple[str, Optional[Dict[str, Optional[str]]]]) -> Dict:
+            luid, info = item
+            try:
+                if info is None:
+                    info = file_info(self.query_resource("{}s/{}".format(content_type, luid)).find(
+                        './/t:{}'.format(content_type), self.ns_map))
+                directory = save_to_directory
+                if use_project_directories is True and info['projectName'] is not None:
+                    project_name = info['projectName'].replace('/', '_').replace('\\', '_')
+                    directory = os.path.join(directory, project_name)
+                os.makedirs(directory, exist_ok=True)
+                filename = info['contentUrl']
+                if filename is None or filename == '':
+                    filename = info['name'].replace('/', '_').replace('\\', '_')
+                if use_project_directories is False:
+                    filename = '{}_{}'.format(filename, luid)
+                result = self._download_content(content_type, luid, os.path.join(directory, filename),
+                                                include_extract=include_extract, chunk_size=chunk_size,
+                                                updated_at=info['updatedAt'], skip_existing=skip_existing,
+                                                resume=resume)
+            except Exception as e:
+                self.log('Download of {} {} failed: {}'.format(content_type, luid, e))
+                result = {'luid': luid, 'filename': None, 'status': 'failed', 'bytes': 0, 'seconds': 0.0,
+                          'mb_per_second': 0.0, 'error': e}
+            return result
+
+        results = self._run_in_parallel(download, items, max_concurrent_requests=max_concurrent_downloads)
+
+        total_bytes = sum(r['bytes'] for r in results if r['status'] in ['downloaded', 'resumed'])
+        self.log('{} {}s: {} downloaded, {} skipped, {} failed, {} bytes transferred'.format(
+            len(results), content_type, len([r for r in results if r['status'] in ['downloaded', 'resumed']]),
+            len([r for r in results if r['status'] == 'skipped']),
+            len([r for r in results if r['status'] == 'failed']), total_bytes))
         self.end_log_block()
-        return self._request_obj.get_response()
+        return results
 
     # Generic implementation of all content publishing
+    # The multipart body is streamed from the file as it is sent, rather than built up in memory first
     def _publish_content(self, content_type: str, content_filename: str, content_name: str, project_luid: str,
                          url_params: Optional[Dict] = None,
                          connection_username: Optional[str] = None, connection_password: Optional[str] = None,
@@ -718,7 +1164,9 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                          generate_thumbnails_as_username_or_luid: Optional[str] = None,
                          description: Optional[str] = None, views_to_hide_list: Optional[List[str]] = None):
         # Single upload limit in MB
-        single_upload_limit = 20
+        single_upload_limit = self.single_upload_limit_mb
+        if url_params is None:
+            url_params = {}
 
         # If you need a temporary copy when fixing the published datasources
         temp_wb_filename = None
@@ -751,9 +1199,10 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                 #    temp_wb_filename = t_file.save_new_file('temp_wb')
                 #    content_filename = temp_wb_filename
 
-                # Open the file to be uploaded
+                # Check the file to be uploaded. It is only read as it is sent
                 try:
-                    content_file = open(content_filename, 'rb')
+                    with open(content_filename, 'rb'):
+                        pass
                 except IOError:
                     print("Error: File '{}' cannot be opened to upload".format(content_filename))
                     raise
@@ -765,10 +1214,7 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                 # Request type is mixed and require a boundary
                 boundary_string = self.generate_boundary_string()
 
-                # Create the initial XML portion of the request
-                publish_request = bytes("--{}\r\n".format(boundary_string).encode('utf-8'))
-                publish_request += bytes('Content-Disposition: name="request_payload"\r\n'.encode('utf-8'))
-                publish_request += bytes('Content-Type: text/xml\r\n\r\n'.encode('utf-8'))
+                publish_request = MultipartBody(boundary_string)
 
                 # Build publish request in ElementTree then convert at publish
                 publish_request_xml = ET.Element('tsRequest')
@@ -813,27 +1259,18 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                 t1.append(p)
                 publish_request_xml.append(t1)
 
+                # The initial XML portion of the request
                 encoded_request = ET.tostring(publish_request_xml, encoding='utf-8')
-
-                publish_request += bytes(encoded_request)
-                publish_request += bytes("\r\n--{}".format(boundary_string).encode('utf-8'))
+                publish_request.add_part('name="request_payload"', 'text/xml', encoded_request)
 
                 # Upload as single if less than file_size_limit MB
                 if file_size_mb <= single_upload_limit:
                     # If part of a single upload, this if the next portion
                     self.log("Less than {} MB, uploading as a single call".format(str(single_upload_limit)))
-                    publish_request += bytes('\r\n'.encode('utf-8'))
-                    publish_request += bytes('Content-Disposition: name="tableau_{}"; filename="{}"\r\n'.format(
-                        content_type, final_filename).encode('utf-8'))
-                    publish_request += bytes('Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8'))
-
-                    # Content needs to be read unencoded from the file
-                    content = content_file.read()
-
-                    # Add to string as regular binary, no encoding
-                    publish_request += content
-
-                    publish_request += bytes("\r\n--{}--".format(boundary_string).encode('utf-8'))
+                    publish_request.add_file_part('name="tableau_{}"; filename="{}"'.format(content_type,
+                                                                                          final_filename),
+                                                  content_filename)
+                    publish_request.finish()
 
                     url = self.build_api_url("{}s").format(content_type)
 
@@ -848,24 +1285,28 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                             i += 1
                         url += additional_params
 
-                    content_file.close()
-                    if temp_wb_filename is not None:
-                        os.remove(temp_wb_filename)
-                    if cleanup_temp_file is True:
-                        os.remove(final_filename)
-
-                    results = self.send_publish_request(url=url, xml_request=None, content=publish_request,
-                                                 boundary_string=boundary_string)
+                    try:
+                        results = self.send_publish_request(url=url, xml_request=None, content=publish_request,
+                                                            boundary_string=boundary_string)
+                    finally:
+                        publish_request.close()
+                        if temp_wb_filename is not None:
+                            os.remove(temp_wb_filename)
+                        if cleanup_temp_file is True:
+                            os.remove(final_filename)
                     return results
                 # Break up into chunks for upload
                 else:
-                    self.log("Greater than 10 MB, uploading in chunks")
-                    upload_session_id = self.initiate_file_upload()
-
-                    # Upload each chunk
-                    for piece in self.read_file_in_chunks(content_file):
-                        self.log("Appending chunk to upload session {}".format(upload_session_id))
-                        self.append_to_file_upload(upload_session_id, piece, final_filename)
+                    self.log("Greater than {} MB, uploading in chunks".format(str(single_upload_limit)))
+                    # Checkpointed, so running the same publish again resumes an upload that failed part way
+                    resumable_upload = ResumableUpload(self, content_filename,
+                                                       chunk_size=int(self.publish_chunk_size_mb * 1024 * 1024),
+                                                       upload_filename=final_filename,
+                                                       checkpoint_directory=self.upload_checkpoint_directory,
+                                                       max_retries=self.upload_max_retries,
+                                                       backoff_seconds=self.upload_backoff_seconds,
+                                                       read_ahead_chunks=self.upload_read_ahead_chunks)
+                    upload_session_id = resumable_upload.upload()
 
                     # Finalize the publish
                     url = self.build_api_url("{}s").format(content_type) + "?uploadSessionId={}".format(
@@ -882,15 +1323,16 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                             i += 1
                         url += additional_params
 
-                    publish_request += bytes("--".encode('utf-8'))  # Need to finish off the last boundary
+                    publish_request.finish()  # Need to finish off the last boundary
                     self.log("Finishing the upload with a publish request")
-                    content_file.close()
                     if temp_wb_filename is not None:
                         os.remove(temp_wb_filename)
                     if cleanup_temp_file is True:
                         os.remove(final_filename)
-                    return self.send_publish_request(url=url, xml_request=None, content=publish_request,
-                                                     boundary_string=boundary_string)
+                    results = self.send_publish_request(url=url, xml_request=None, content=publish_request,
+                                                        boundary_string=boundary_string)
+                    resumable_upload.remove_checkpoint()
+                    return results
 
         if file_extension is None:
             raise InvalidOptionException(
@@ -906,21 +1348,29 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
     # Uploads a chunk to an already started session
     def append_to_file_upload(self, upload_session_id: str, content: bytes, filename: str):
         boundary_string = self.generate_boundary_string()
-        publish_request = bytes("--{}\r\n".format(boundary_string))
-        publish_request += bytes('Content-Disposition: name="request_payload"\r\n')
-        publish_request += bytes('Content-Type: text/xml\r\n\r\n')
-        publish_request += bytes('\r\n')
-        publish_request += bytes("--{}\r\n".format(boundary_string))
-        publish_request += bytes('Content-Disposition: name="tableau_file"; filename="{}"\r\n'.format(
-            filename))
-        publish_request += bytes('Content-Type: application/octet-stream\r\n\r\n')
-
-        publish_request += content
-
-        publish_request += "\r\n--{}--".format(boundary_string)
+        publish_request = MultipartBody(boundary_string)
+        publish_request.add_part('name="request_payload"', 'text/xml', b'')
+        publish_request.add_part('name="tableau_file"; filename="{}"'.format(filename), 'application/octet-stream',
+                                 content)
+        publish_request.finish()
         url = self.build_api_url("fileUploads/{}".format(upload_session_id))
         self.send_append_request(url=url, content=publish_request, boundary_string=boundary_string)
 
+    # Uploads length bytes of a file from offset, read from disk as it is sent rather than loaded into memory
+    def _append_file_range_to_file_upload(self, upload_session_id: str, content_filename: str, offset: int,
+                                          length: int, filename: str):
+        boundary_string = self.generate_boundary_string()
+        publish_request = MultipartBody(boundary_string)
+        publish_request.add_part('name="request_payload"', 'text/xml', b'')
+        publish_request.add_file_part('name="tableau_file"; filename="{}"'.format(filename), content_filename,
+                                      offset=offset, length=length)
+        publish_request.finish()
+        url = self.build_api_url("fileUploads/{}".format(upload_session_id))
+        try:
+            self.send_append_request(url=url, content=publish_request, boundary_string=boundary_string)
+        finally:
+            publish_request.close()
+
     # Generic implementation of all the CSV/PDF/PNG requests
     def _query_data_file(self, download_type: str, view_name_or_luid: str, high_resolution: Optional[bool] = None,
                          view_filter_map: Optional[Dict] = None,
@@ -1044,29 +1494,297 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
         proj_obj = Project(luid, self, self.version, self.logger, content_xml_obj=project_xml_obj)
         return proj_obj
 
+#
+# Permissions snapshot
+#
+
+    # The content types that have permissions, and that projects have default permissions for (other than project)
+    permissions_snapshot_content_types = ['project', 'workbook', 'datasource', 'view']
+    permissions_snapshot_columns = ['site_content_url', 'content_type', 'content_luid', 'content_name',
+                                    'project_luid', 'project_name', 'default_permissions', 'grantee_type',
+                                    'grantee_luid', 'grantee_name', 'capability', 'mode', 'error']
+
+    # Reads the permissions of everything on the site: each project (and its default permissions for the other
+    # content types, with include_default_permissions=True), workbook, datasource, flow and view.
+    # The content and every user and group are listed once, then the permissions of each item are requested
+    # max_concurrent_requests at a time. Returns a dict for each capability that is set, with the keys in
+    # permissions_snapshot_columns. 'default_permissions' is the content type of a project's default permissions, or
+    # None. If the permissions of an item can't be read, it has a single row with the exception in 'error'
+    def query_permissions_snapshot(self, content_types: Optional[List[str]] = None,
+                                   include_default_permissions: bool = True,
+                                   max_concurrent_requests: int = 4) -> List[Dict]:
+        self.start_log_block()
+        if content_types is None:
+            content_types = self.permissions_snapshot_content_types
+        for content_type in content_types:
+            if content_type not in self.permissions_snapshot_content_types:
+                raise InvalidOptionException('content_types can only include: {}'.format(
+                    ", ".join(self.permissions_snapshot_content_types)))
+
+        # The name of every grantee, so each row can be labeled without any more requests
+        grantee_names = self._query_grantee_names()
+
+        # (content_type, luid, name, project_luid, project_name, default_permissions, url_ending) for each request
+        items = []
+        for content_type in content_types:
+            fields = None
+            if content_type in ['workbook', 'datasource', 'flow']:
+                fields = ['id', 'name', 'project.id', 'project.name']
+            for element in self.iter_resource("{}s".format(content_type), fields=fields, page_size=1000):
+                luid = element.get('id')
+                if content_type == 'project':
+                    items.append((content_type, luid, element.get('name'), luid, element.get('name'), None,
+                                  "projects/{}/permissions".format(luid)))
+                    if include_default_permissions is True:
+                        for default_type in content_types:
+                            if default_type in ['workbook', 'datasource', 'flow']:
+                                items.append((content_type, luid, element.get('name'), luid, element.get('name'),
+                                              default_type, "projects/{}/default-permissions/{}s".format(
+                                                  luid, default_type)))
+                else:
+                    project = element.find('t:project', self.ns_map)
+                    project_luid = project.get('id') if project is not None else None
+                    project_name = project.get('name') if project is not None else None
+                    items.append((content_type, luid, element.get('name'), project_luid, project_name, None,
+                                  "{}s/{}/permissions".format(content_type, luid)))
+        self.log('Reading the permissions of {} items'.format(len(items)))
+
+        def query_permissions(item: Tuple) -> List[Dict]:
+            content_type, luid, name, project_luid, project_name, default_permissions, url_ending = item
+            row = {'site_content_url': self.site_content_url, 'content_type': content_type, 'content_luid': luid,
+                   'content_name': name, 'project_luid': project_luid, 'project_name': project_name,
+                   'default_permissions': default_permissions, 'grantee_type': None, 'grantee_luid': None,
+                   'grantee_name': None, 'capability': None, 'mode': None, 'error': None}
+            try:
+                permissions = self.query_resource(url_ending)
+            except Exception as e:
+                self.log('Reading the permissions of {} {} failed: {}'.format(content_type, luid, e))
+                row['error'] = e
+                return [row]
+            rows = []
+            for grantee_capabilities in permissions.findall('.//t:granteeCapabilities', self.ns_map):
+                grantee = None
+                for child in grantee_capabilities:
+                    if child.tag in [self.ns_prefix + 'user', self.ns_prefix + 'group']:
+                        grantee = child
+                if grantee is None:
+                    continue
+                grantee_type = grantee.tag[len(self.ns_prefix):]
+                for capability in grantee_capabilities.findall('.//t:capability', self.ns_map):
+                    capability_row = dict(row)
+                    capability_row.update({'grantee_type': grantee_type, 'grantee_luid': grantee.get('id'),
+                                           'grantee_name': grantee_names.get((grantee_type, grantee.get('id'))),
+                                           'capability': capability.get('name'), 'mode': capability.get('mode')})
+                    rows.append(capability_row)
+            return rows
+
+        snapshot = []
+        for rows in self._run_in_parallel(query_permissions, items, max_concurrent_requests=max_concurrent_requests):
+            snapshot.extend(rows)
+        self.log('Permissions snapshot has {} rows'.format(len(snapshot)))
+        self.end_log_block()
+        return snapshot
+
+    # Writes a permissions snapshot (see query_permissions_snapshot) to a CSV file, one row per capability. Pass
+    # in a snapshot you already have, or leave it as None to take one now. Returns the number of rows written
+    def export_permissions_snapshot(self, filename: str, snapshot: Optional[List[Dict]] = None,
+                                    content_types: Optional[List[str]] = None,
+                                    include_default_permissions: bool = True,
+                                    max_concurrent_requests: int = 4) -> int:
+        self.start_log_block()
+        if snapshot is None:
+            snapshot = self.query_permissions_snapshot(content_types=content_types,
+                                                       include_default_permissions=include_default_permissions,
+                                                       max_concurrent_requests=max_concurrent_requests)
+        with open(filename, 'w', newline='', encoding='utf-8') as output_file:
+            output_writer = csv.DictWriter(output_file, fieldnames=self.permissions_snapshot_columns)
+            output_writer.writeheader()
+            output_writer.writerows(snapshot)
+        self.log('Wrote {} rows to {}'.format(len(snapshot), filename))
+        self.end_log_block()
+        return len(snapshot)
+
+    # { ('user' or 'group', luid) : name } of every user and group on the site, from one listing of each
+    def _query_grantee_names(self) -> Dict[Tuple[str, str], str]:
+        grantee_names = {}
+        for grantee_type in ['user', 'group']:
+            for grantee in self.iter_resource("{}s".format(grantee_type), fields=['id', 'name'], page_size=1000):
+                grantee_names[(grantee_type, grantee.get('id'))] = grantee.get('name')
+        return grantee_names
+
+#
+# Permissions replication
+#
+
+    # Matches every user and group on orig_site (another signed-in connection) to the one with the same name on this
+    # site. Returns { ('user' or 'group', luid on orig_site) : luid on this site, or None if there is no match }.
+    # With a username_map { orig_username : username on this site }, users are matched through it instead, and
+    # users who aren't in it have no match. The users and groups of each site are listed once, so the cost doesn't
+    # depend on how many permissions will be translated with it
+    def query_grantee_translation_table(self, orig_site: 'TableauRestApiBase',
+                                        username_map: Optional[Dict[str, str]] = None
+                                        ) -> Dict[Tuple[str, str], Optional[str]]:
+        self.start_log_block()
+        orig_names = orig_site._query_grantee_names()
+        # (grantee_type, name) : luid on this site, None if the name isn't unique
+        luids = {}
+        for (grantee_type, luid), name in self._query_grantee_names().items():
+            if (grantee_type, name) in luids:
+                luids[(grantee_type, name)] = None
+            else:
+                luids[(grantee_type, name)] = luid
+
+        translation_table = {}
+        for (grantee_type, orig_luid), name in orig_names.items():
+            if grantee_type == 'user' and username_map is not None:
+                name = username_map.get(name)
+            translation_table[(grantee_type, orig_luid)] = luids.get((grantee_type, name))
+        self.log('Matched {} of {} users and groups from the original site'.format(
+            len([luid for luid in translation_table.values() if luid is not None]), len(translation_table)))
+        self.end_log_block()
+        return translation_table
+
+    # Works out how the permissions of orig_content_list (PublishedContent objects from orig_site, e.g. every
+    # project) will be replicated onto this site, before anything is changed. Returns a dict of:
+    #   'translation_table': pass it to replicate_permissions() or replicate_permissions_direct_xml() of each one,
+    #                        so none of them have to look up any users or groups
+    #   'grantees': every distinct ('user' or 'group', luid) with permissions on any of them (or project defaults)
+    #   'unmatched': the grantees that have no match on this site, whose permissions will be left out
+    def plan_permissions_replication(self, orig_site: 'TableauRestApiBase', orig_content_list: List[PublishedContent],
+                                     username_map: Optional[Dict[str, str]] = None) -> Dict:
+        self.start_log_block()
+        grantees = set()
+        for orig_content in orig_content_list:
+            grantees.update(orig_content.get_grantees())
+        translation_table = self.query_grantee_translation_table(orig_site, username_map=username_map)
+        unmatched = [grantee for grantee in grantees if translation_table.get(grantee) is None]
+        self.log('{} users and groups have permissions on the original content, {} have no match'.format(
+            len(grantees), len(unmatched)))
+        self.end_log_block()
+        return {'translation_table': translation_table, 'grantees': sorted(grantees), 'unmatched': sorted(unmatched)}
+
 #
 # Lookup Methods (previously in _lookups.py)
 #
 
+    # Pages once through the full listing of each content type and loads every name and LUID into the lookup cache,
+    # so bulk operations that resolve thousands of names don't make a request per name.
+    # Workbooks and datasources are cached under their project's LUID and name, and without a project only when the
+    # name is unique across the site. Returns the number of items loaded for each content type
+    def warm_lookup_cache(self, content_types: Optional[List[str]] = None, page_size: int = 1000) -> Dict[str, int]:
+        self.start_log_block()
+        if self.luid_cache is None:
+            raise InvalidOptionException('The LUID cache has been disabled. Use enable_luid_cache() first')
+        warmable_types = ['user', 'group', 'project', 'schedule', 'workbook', 'datasource', 'webhook', 'database',
+                          'table']
+        if content_types is None:
+            content_types = warmable_types
+        for content_type in content_types:
+            if content_type not in warmable_types:
+                raise InvalidOptionException('content_types can only include: {}'.format(", ".join(warmable_types)))
+
+        counts = {}
+        for content_type in content_types:
+            server_level = False
+            fields = None
+            if content_type in ['user', 'project']:
+                fields = ['id', 'name']
+            elif content_type in ['workbook', 'datasource']:
+                fields = ['id', 'name', 'project.id', 'project.name']
+            elif content_type == 'schedule':
+                server_level = True
+
+            scoped = content_type in ['workbook', 'datasource']
+            # name -> LUID for the unscoped entries, None once a name has been seen twice
+            unscoped = {}
+            # (name, LUID, project) for the entries cached per project
+            scoped_entries = []
+            count = 0
+            for element in self.iter_resource("{}s".format(content_type), server_level=server_level, fields=fields,
+                                              page_size=page_size):
+                name = element.get('name')
+                luid = element.get('id')
+                count += 1
+                if name in unscoped:
+                    unscoped[name] = None
+                else:
+                    unscoped[name] = luid
+                if scoped:
+                    project = element.find('t:project', self.ns_map)
+                    if project is not None:
+                        scoped_entries.append((name, luid, project.get('id')))
+                        scoped_entries.append((name, luid, project.get('name')))
+            if scoped:
+                self.luid_cache.store_many(self._luid_cache_site(content_type), content_type, scoped_entries)
+            # An ambiguous name must always be looked up with its project, or by LUID
+            self._store_cached_luids_from_names(content_type, unscoped)
+            self.log('Loaded {} {}s into the lookup cache'.format(count, content_type))
+            counts[content_type] = count
+        self.end_log_block()
+        return counts
+
     def query_user_luid(self, username: str) -> str:
         self.start_log_block()
-        if username in self.username_luid_cache:
-            user_luid = self.username_luid_cache[username]
-        else:
+        user_luid = self._query_cached_luid('user', username)
+        if user_luid is None:
             user_luid = self.query_luid_from_name(content_type="user", name=username)
-            self.username_luid_cache[username] = user_luid
+            self._store_cached_luid('user', username, user_luid)
         self.end_log_block()
         return user_luid
 
+    # Resolves many usernames at once. Returns a dict of each username (or LUID) to its LUID, or None if there is no
+    # such user. known_luids is any name : LUID dict already at hand (e.g. the members of a group). Names that aren't
+    # in it or in the lookup cache are looked up one at a time if there are only a few, otherwise from one pass
+    # through the user listing, which stops as soon as all of them have been found
+    def _query_user_luids(self, usernames_or_luids: List[str],
+                          known_luids: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+        self.start_log_block()
+        user_luids = {}
+        unresolved = []
+        for username in usernames_or_luids:
+            if self.is_luid(username):
+                user_luids[username] = username
+            elif known_luids is not None and username in known_luids:
+                user_luids[username] = known_luids[username]
+            else:
+                user_luid = self._query_cached_luid('user', username)
+                if user_luid is None:
+                    unresolved.append(username)
+                user_luids[username] = user_luid
+
+        if 0 < len(unresolved) <= self.max_individual_user_lookups:
+            for username in unresolved:
+                try:
+                    user_luids[username] = self.query_user_luid(username)
+                except NoMatchFoundException:
+                    pass
+        elif len(unresolved) > 0:
+            remaining = set(unresolved)
+            for user in self.iter_resource("users", fields=self._lookup_fields['user'], page_size=1000):
+                self._store_cached_luid('user', user.get('name'), user.get('id'))
+                if user.get('name') in remaining:
+                    user_luids[user.get('name')] = user.get('id')
+                    remaining.discard(user.get('name'))
+                    if len(remaining) == 0:
+                        break
+        self.end_log_block()
+        return user_luids
+
     # Datasources in different projects can have the same 'pretty name'.
     def query_datasource_luid(self, datasource_name: str, project_name_or_luid: Optional[str] = None,
                               content_url: Optional[str] = None) -> str:
         self.start_log_block()
         if self.is_luid(datasource_name):
             return datasource_name
+        if content_url is None:
+            ds_luid = self._query_cached_luid('datasource', datasource_name, scope=project_name_or_luid)
+            if ds_luid is not None:
+                self.end_log_block()
+                return ds_luid
         # This quick filters down to just those with the name
 
-        datasources_with_name = self.query_elements_from_endpoint_with_filter('datasource', datasource_name)
+        datasources_with_name = self.query_elements_from_endpoint_with_filter(
+            'datasource', datasource_name, fields=self._lookup_fields['datasource'])
 
         # Throw exception if nothing found
         if len(datasources_with_name) == 0:
@@ -1089,6 +1807,7 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
             # If no Project Name is specified, but only one match, return, otherwise throw MultipleMatchesException
             if project_name_or_luid is None:
                 if len(datasources_with_name) == 1:
+                    self._store_cached_luid('datasource', datasource_name, datasources_with_name[0].get("id"))
                     self.end_log_block()
                     return datasources_with_name[0].get("id")
                 # If no project is declared, and more than one match
@@ -1105,6 +1824,8 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                         './/t:project[@name="{}"]/..'.format(project_name_or_luid),
                         TableauRestXml.ns_map)
                 if len(ds_in_proj) == 1:
+                    self._store_cached_luid('datasource', datasource_name, ds_in_proj[0].get("id"),
+                                            scope=project_name_or_luid)
                     self.end_log_block()
                     return ds_in_proj[0].get("id")
                 else:
@@ -1115,40 +1836,77 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
     def query_group_luid(self, group_name: str) -> str:
         self.start_log_block()
 
-        if group_name in self.group_name_luid_cache:
-            group_luid = self.group_name_luid_cache[group_name]
-            self.log('Found group name {} in cache with luid {}'.format(group_name, group_luid))
-        else:
+        group_luid = self._query_cached_luid('group', group_name)
+        if group_luid is None:
             group_luid = self.query_luid_from_name(content_type='group', name=group_name)
-            self.group_name_luid_cache[group_name] = group_luid
+            self._store_cached_luid('group', group_name, group_luid)
         self.end_log_block()
         return group_luid
 
+    # Reverse of the LUID lookups. The lookup cache keeps an index by LUID, so once a LUID has been seen this is
+    # answered without going to the Tableau Server. On a miss, the whole listing is loaded into the cache, so the
+    # next reverse lookup of the same content type is answered from the cache as well
+    def _query_name_from_luid(self, content_type: str, luid: str) -> str:
+        if self.luid_cache is not None:
+            name = self.luid_cache.query_name(self._luid_cache_site(content_type), content_type, luid)
+            if name is not None:
+                self.log('Found {} name {} in cache with luid {}'.format(content_type, name, luid))
+                return name
+        # Users have a singular endpoint, so no need to bring back everyone
+        if content_type == 'user':
+            element = self.query_resource("users/{}".format(luid)).find('.//t:user', self.ns_map)
+        else:
+            elements = self.query_resource("{}s".format(content_type),
+                                           server_level=(self._luid_cache_site(content_type) == ""),
+                                           fields=self._lookup_fields.get(content_type))
+            self.log('Loading the {} lookup cache'.format(content_type))
+            self._store_cached_luids_from_elements(content_type, elements)
+            element = elements.find('.//t:{}[@id="{}"]'.format(content_type, luid), self.ns_map)
+        if element is None:
+            raise NoMatchFoundException("No {} found with luid {}".format(content_type, luid))
+        name = element.get('name')
+        self._store_cached_luid(content_type, name, luid)
+        return name
+
     def query_group_name(self, group_luid: str) -> str:
         self.start_log_block()
-        for name, luid in list(self.group_name_luid_cache.items()):
-            if luid == group_luid:
-                group_name = name
-                self.log('Found group name {} in cache with luid {}'.format(group_name, group_luid))
-                return group_name
-        # If match is found
-        group = self.query_single_element_from_endpoint('group', group_luid)
-        group_luid = group.get("id")
-        group_name = group.get('name')
-        self.log('Loading the Group: LUID cache')
-        self.group_name_luid_cache[group_name] = group_luid
+        group_name = self._query_name_from_luid('group', group_luid)
         self.end_log_block()
         return group_name
 
+    def query_username(self, user_luid: str) -> str:
+        self.start_log_block()
+        username = self._query_name_from_luid('user', user_luid)
+        self.end_log_block()
+        return username
+
+    def query_project_name(self, project_luid: str) -> str:
+        self.start_log_block()
+        project_name = self._query_name_from_luid('project', project_luid)
+        self.end_log_block()
+        return project_name
+
+    def query_schedule_name(self, schedule_luid: str) -> str:
+        self.start_log_block()
+        schedule_name = self._query_name_from_luid('schedule', schedule_luid)
+        self.end_log_block()
+        return schedule_name
+
     def query_project_luid(self, project_name: str) -> str:
         self.start_log_block()
-        project_luid = self.query_luid_from_name(content_type='project', name=project_name)
+        project_luid = self._query_cached_luid('project', project_name)
+        if project_luid is None:
+            project_luid = self.query_luid_from_name(content_type='project', name=project_name)
+            self._store_cached_luid('project', project_name, project_luid)
         self.end_log_block()
         return project_luid
 
     def query_schedule_luid(self, schedule_name: str) -> str:
         self.start_log_block()
-        luid = self.query_single_element_luid_by_name_from_endpoint('schedule', schedule_name, server_level=True)
+        luid = self._query_cached_luid('schedule', schedule_name)
+        if luid is None:
+            luid = self.query_single_element_luid_by_name_from_endpoint('schedule', schedule_name, server_level=True)
+            self._store_cached_luid('schedule', schedule_name, luid)
         self.end_log_block()
         return luid
 
@@ -1183,12 +1941,18 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
         # Short circuit if LUID is passed in
         if self.is_luid(wb_name):
             return wb_name
-        workbooks_with_name = self.query_elements_from_endpoint_with_filter('workbook', wb_name)
+        wb_luid = self._query_cached_luid('workbook', wb_name, scope=proj_name_or_luid)
+        if wb_luid is not None:
+            self.end_log_block()
+            return wb_luid
+        workbooks_with_name = self.query_elements_from_endpoint_with_filter('workbook', wb_name,
+                                                                            fields=self._lookup_fields['workbook'])
         if len(workbooks_with_name) == 0:
             self.end_log_block()
             raise NoMatchFoundException("No workbook found for named {}".format(wb_name))
         elif len(workbooks_with_name) == 1:
             wb_luid = workbooks_with_name[0].get("id")
+            self._store_cached_luid('workbook', wb_name, wb_luid, scope=proj_name_or_luid)
             self.end_log_block()
             return wb_luid
         elif len(workbooks_with_name) > 1 and proj_name_or_luid is not None:
@@ -1203,6 +1967,7 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
                 self.end_log_block()
                 raise NoMatchFoundException('No workbook found with name {} in project {}'.format(wb_name, proj_name_or_luid))
             wb_luid = wb_in_proj[0].get("id")
+            self._store_cached_luid('workbook', wb_name, wb_luid, scope=proj_name_or_luid)
             self.end_log_block()
             return wb_luid
         else:
@@ -1210,48 +1975,37 @@ class TableauRestApiBase(LoggingMethods, TableauRestXml):
             raise MultipleMatchesFoundException('More than one workbook found by name {} without a project specified'.format(wb_name))
 
     def query_database_luid(self, database_name: str) -> str:
-            self.start_log_block()
-            # Short circuit if LUID is passed in
-            if self.is_luid(database_name):
-                return database_name
-            databases = self.query_resource("databases")
-            databases_with_name = databases.findall('.//t:database[@name="{}"]'.format(database_name), TableauRestXml.ns_map)
-            if len(databases_with_name) == 0:
-                self.end_log_block()
-                raise NoMatchFoundException(
-                    "No database found named {}".format(database_name))
-            elif len(databases_with_name) == 1:
-                db_luid = databases_with_name[0].get("id")
-                self.end_log_block()
-                return db_luid
-            else:
-                self.end_log_block()
-                raise MultipleMatchesFoundException(
-                    'More than one database found by name {}. Please determine LUID using another method'.format(database_name))
+        self.start_log_block()
+        # Short circuit if LUID is passed in
+        if self.is_luid(database_name):
+            self.end_log_block()
+            return database_name
+        luid = self._query_cached_luid('database', database_name)
+        if luid is None:
+            luid = self.query_single_element_luid_by_name_from_endpoint('database', database_name)
+            self._store_cached_luid('database', database_name, luid)
+        self.end_log_block()
+        return luid
 
     def query_table_luid(self, table_name: str) -> str:
-            self.start_log_block()
-            # Short circuit if LUID is passed in
-            if self.is_luid(table_name):
-                return table_name
-            tables = self.query_resource("tables")
-            tables_with_name = tables.findall('.//t:table[@name="{}"]'.format(table_name), TableauRestXml.ns_map)
-            if len(tables_with_name) == 0:
-                self.end_log_block()
-                raise NoMatchFoundException(
-                    "No database found named {}".format(table_name))
-            elif len(tables_with_name) == 1:
-                t_luid = tables_with_name[0].get("id")
-                self.end_log_block()
-                return t_luid
-            else:
-                self.end_log_block()
-                raise MultipleMatchesFoundException(
-                    'More than one table found by name {}. Please determine LUID using another method'.format(table_name))
+        self.start_log_block()
+        # Short circuit if LUID is passed in
+        if self.is_luid(table_name):
+            self.end_log_block()
+            return table_name
+        luid = self._query_cached_luid('table', table_name)
+        if luid is None:
+            luid = self.query_single_element_luid_by_name_from_endpoint('table', table_name)
+            self._store_cached_luid('table', table_name, luid)
+        self.end_log_block()
+        return luid
 
     def query_webhook_luid(self, webhook_name: str) -> str:
         self.start_log_block()
-        luid = self.query_single_element_luid_by_name_from_endpoint('webhook', webhook_name)
+        luid = self._query_cached_luid('webhook', webhook_name)
+        if luid is None:
+            luid = self.query_single_element_luid_by_name_from_endpoint('webhook', webhook_name)
+            self._store_cached_luid('webhook', webhook_name, luid)
         self.end_log_block()
         return luid
 
@@ -1262,6 +2016,8 @@ class TableauRestApiBase33(TableauRestApiBase):
         self.set_tableau_server_version('2019.1')
         self.url_filters = UrlFilter33
 
+    permissions_snapshot_content_types = ['project', 'workbook', 'datasource', 'flow', 'view']
+
     def get_published_project_object(self, project_name_or_luid: str,
                                      project_xml_obj: Optional[ET.Element] = None) -> Project33:
         luid = self.query_project_luid(project_name_or_luid)
@@ -1357,18 +2113,44 @@ class TableauRestApiBase36(TableauRestApiBase35):
         self._login_as_user_id: str = ""
         self._last_error = None
         self.logger: Optional[Logger] = None
-        self._last_response_content_type = None
-
-        self._request_obj: Optional[RestXmlRequest] = None
-        self._request_json_obj: Optional[RestJsonRequest] = None
+        # Each request gets its own RestXmlRequest / RestJsonRequest, all sharing the requests Session of the
+        # transport, so a connection can be used from many threads at once. Details of the last request are kept
+        # per thread. Pool size, timeouts and proxies are set with set_transport()
+        self.transport: HttpTransport = HttpTransport()
+        self._thread_local = threading.local()
 
-        # Lookup caches to minimize calls
-        self.username_luid_cache = {}
-        self.group_name_luid_cache = {}
+        # Lookup cache to minimize calls. Covers every content type, keyed by site. Set to None to disable
+        self.luid_cache: Optional[LuidCache] = LuidCache()
 
         # For working around SSL issues
         self.verify_ssl_cert = True
 
+        # Failed requests (HTTP 429 and 5xx, connection errors) are retried with backoff. Set with set_retry_policy()
+        self.retry_policy: Optional[RetryPolicy] = RetryPolicy()
+        # Throttles the requests sent on this connection. Set with set_rate_limiter()
+        self.rate_limiter: Optional[RateLimiter] = None
+        # Parses every XML response. Set with set_xml_parser()
+        self.xml_parser: XmlResponseParser = XmlResponseParser()
+
+        # Set via enable_concurrent_paging() to request the pages of large listings in parallel
+        self.concurrent_paging = False
+        self.max_concurrent_page_requests = 4
+
+        # Number of items per page on paginated queries. None leaves it to the server default (100)
+        self.page_size: Optional[int] = None
+
+        # Files up to single_upload_limit_mb are published in one request, anything larger is sent in
+        # publish_chunk_size_mb pieces through a file upload session. Set with set_publish_chunking()
+        self.single_upload_limit_mb: float = 20
+        self.publish_chunk_size_mb: float = 10
+
+        # Chunked uploads retry failed chunks and keep a checkpoint so they can be resumed. Set with
+        # set_upload_options()
+        self.upload_max_retries: int = 5
+        self.upload_backoff_seconds: float = 2.0
+        self.upload_read_ahead_chunks: int = 2
+        self.upload_checkpoint_directory: Optional[str] = None
+
         self.version: Optional[str] = None
         self.api_version: Optional[str]  = api_version
         # Starting in version 5 of tableau_tools, 10.3 is the lowest supported version
@@ -1412,27 +2194,21 @@ class TableauRestApiBase36(TableauRestApiBase35):
 
         self.log('Logging in via: {}'.format(url))
 
-        # Create the RestXmlRequest to be used throughout
-
-        self._request_obj = RestXmlRequest(url, self.token, self.logger, ns_map_url=self.ns_map['t'],
-                                           verify_ssl_cert=self.verify_ssl_cert)
-        self._request_obj.xml_request = tsr
-        self._request_obj.http_verb = 'post'
+        request_obj = self._new_request_obj(url)
+        request_obj.xml_request = tsr
+        request_obj.http_verb = 'post'
         self.log('Login payload is\n {}'.format(ET.tostring(tsr)))
 
-        self._request_obj.request_from_api(0)
+        request_obj.request_from_api(0)
         # self.log(api.get_raw_response())
-        xml = self._request_obj.get_response()
+        xml = request_obj.get_response()
 
         credentials_element = xml.findall('.//t:credentials', self.ns_map)
         self.token = credentials_element[0].get("token")
         self.log("Token is " + self.token)
-        self._request_obj.token = self.token
         self.site_luid = credentials_element[0].findall(".//t:site", self.ns_map)[0].get("id")
         self.user_luid = credentials_element[0].findall(".//t:user", self.ns_map)[0].get("id")
         self.log("Site ID is " + self.site_luid)
-        self._request_obj.url = None
-        self._request_obj.xml_request = None
         self.end_log_block()
 
 class TableauRestApiBase37(TableauRestApiBase36):
@@ -8,37 +8,40 @@ class ScheduleMethods():
     #def __getattr__(self, attr):
     #    return getattr(self.rest_api_base, attr)
 
-    def query_schedules(self) -> ET.Element:
+    def query_schedules(self, page_size: Optional[int] = None, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        schedules = self.rest.query_resource("schedules", server_level=True)
+        schedules = self.rest.query_resource("schedules", server_level=True, fields=fields, page_size=page_size)
         self.rest.end_log_block()
         return schedules
 
-    def query_schedules_json(self, page_number: Optional[int] = None)-> Dict:
+    def query_schedules_json(self, page_number: Optional[int] = None, page_size: Optional[int] = None,
+                             fields: Optional[List[str]] = None) -> Dict:
         self.rest.start_log_block()
-        schedules = self.rest.query_resource_json("schedules", server_level=True, page_number=page_number)
+        schedules = self.rest.query_resource_json("schedules", server_level=True, fields=fields,
+                                                  page_number=page_number, page_size=page_size)
         self.rest.end_log_block()
         return schedules
 
-    def query_extract_schedules(self) -> ET.Element:
+    def query_extract_schedules(self, page_size: Optional[int] = None) -> ET.Element:
         self.rest.start_log_block()
-        schedules = self.query_schedules()
+        schedules = self.query_schedules(page_size=page_size)
         extract_schedules = schedules.findall('.//t:schedule[@type="Extract"]', self.rest.ns_map)
         self.rest.end_log_block()
         return extract_schedules
 
-    def query_subscription_schedules(self) -> ET.Element:
+    def query_subscription_schedules(self, page_size: Optional[int] = None) -> ET.Element:
         self.rest.start_log_block()
-        schedules = self.query_schedules()
+        schedules = self.query_schedules(page_size=page_size)
         subscription_schedules = schedules.findall('.//t:schedule[@type="Subscription"]', self.rest.ns_map)
         self.rest.end_log_block()
         return subscription_schedules
 
 
 
-    def query_schedule(self, schedule_name_or_luid: str) -> ET.Element:
+    def query_schedule(self, schedule_name_or_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        schedule = self.rest.query_single_element_from_endpoint('schedule', schedule_name_or_luid, server_level=True)
+        schedule = self.rest.query_single_element_from_endpoint('schedule', schedule_name_or_luid, server_level=True,
+                                                                fields=fields)
         self.rest.end_log_block()
         return schedule
 
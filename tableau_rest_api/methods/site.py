@@ -36,15 +36,17 @@ class SiteMethods():
     #
 
     # Site queries don't have the site portion of the URL, so login option gets correct format
-    def query_sites(self) -> ET.Element:
+    def query_sites(self, page_size: Optional[int] = None, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        sites = self.rest.query_resource("sites", server_level=True)
+        sites = self.rest.query_resource("sites", server_level=True, fields=fields, page_size=page_size)
         self.rest.end_log_block()
         return sites
 
-    def query_sites_json(self, page_number: Optional[int] = None) -> Dict:
+    def query_sites_json(self, page_number: Optional[int] = None, page_size: Optional[int] = None,
+                         fields: Optional[List[str]] = None) -> Dict:
         self.rest.start_log_block()
-        sites = self.rest.query_resource_json("sites", server_level=True, page_number=page_number)
+        sites = self.rest.query_resource_json("sites", server_level=True, fields=fields, page_number=page_number,
+                                              page_size=page_size)
         self.rest.end_log_block()
         return sites
 
@@ -61,9 +63,9 @@ class SiteMethods():
         return site_content_urls
 
     # You can only query a site you have logged into this way. Better to use methods that run through query_sites
-    def query_current_site(self) -> ET.Element:
+    def query_current_site(self, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        site = self.rest.query_resource("sites/{}".format(self.rest.site_luid), server_level=True)
+        site = self.rest.query_resource("sites/{}".format(self.rest.site_luid), server_level=True, fields=fields)
         self.rest.end_log_block()
         return site
 
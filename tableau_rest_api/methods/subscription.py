@@ -13,10 +13,11 @@ class SubscriptionMethods():
                             subscription_subject: Optional[str] = None, view_or_workbook: Optional[str] = None,
                             content_name_or_luid: Optional[str] = None,
                             project_name_or_luid: Optional[str] = None,
-                            wb_name_or_luid: Optional[str] = None) -> ET.Element:
+                            wb_name_or_luid: Optional[str] = None, page_size: Optional[int] = None,
+                            fields: Optional[List[str]] = None) -> ET.Element:
 
         self.rest.start_log_block()
-        subscriptions = self.rest.query_resource('subscriptions')
+        subscriptions = self.rest.query_resource('subscriptions', fields=fields, page_size=page_size)
         filters_dict = {}
         if subscription_subject is not None:
             filters_dict['subject'] = '[@subject="{}"]'.format(subscription_subject)
@@ -1,4 +1,5 @@
 from .rest_api_base import *
+from .group import GroupMethods
 
 
 class UserMethods():
@@ -11,13 +12,14 @@ class UserMethods():
     # The reference has this name, so for consistency adding an alias
     def get_users(self, all_fields: bool = True, last_login_filter: Optional[UrlFilter] = None,
                   site_role_filter: Optional[UrlFilter] = None, sorts: Optional[List[Sort]] = None,
-                  fields: Optional[List[str] ] =None) -> ET.Element:
+                  fields: Optional[List[str] ] =None, page_size: Optional[int] = None) -> ET.Element:
         return self.query_users(all_fields=all_fields, last_login_filter=last_login_filter,
-                                site_role_filter=site_role_filter, sorts=sorts, fields=fields)
+                                site_role_filter=site_role_filter, sorts=sorts, fields=fields, page_size=page_size)
 
     def query_users(self, all_fields: bool = True, last_login_filter: Optional[UrlFilter] = None,
                     site_role_filter: Optional[UrlFilter] = None, username_filter: Optional[UrlFilter] = None,
-                    sorts: Optional[List[Sort]] = None, fields: Optional[List[str] ] =None) -> ET.Element:
+                    sorts: Optional[List[Sort]] = None, fields: Optional[List[str] ] =None,
+                    page_size: Optional[int] = None) -> ET.Element:
         self.rest.start_log_block()
         if fields is None:
             if all_fields is True:
@@ -26,24 +28,38 @@ class UserMethods():
         filter_checks = {'lastLogin': last_login_filter, 'siteRole': site_role_filter, 'name': username_filter}
         filters = self.rest._check_filter_objects(filter_checks)
 
-        users = self.rest.query_resource("users", filters=filters, sorts=sorts, fields=fields)
+        users = self.rest.query_resource("users", filters=filters, sorts=sorts, fields=fields, page_size=page_size)
         self.rest.log('Found {} users'.format(str(len(users))))
         self.rest.end_log_block()
         return users
 
+    # Generator version of query_users, yielding each user Element as the pages come back
+    def iter_users(self, all_fields: bool = True, last_login_filter: Optional[UrlFilter] = None,
+                   site_role_filter: Optional[UrlFilter] = None, username_filter: Optional[UrlFilter] = None,
+                   sorts: Optional[List[Sort]] = None, fields: Optional[List[str]] = None,
+                   page_size: Optional[int] = None) -> Iterator[ET.Element]:
+        if fields is None:
+            if all_fields is True:
+                fields = ['_all_']
+
+        filter_checks = {'lastLogin': last_login_filter, 'siteRole': site_role_filter, 'name': username_filter}
+        filters = self.rest._check_filter_objects(filter_checks)
+
+        return self.rest.iter_resource("users", filters=filters, sorts=sorts, fields=fields, page_size=page_size)
+
     # The reference has this name, so for consistency adding an alias
     def get_users_json(self, all_fields: bool = True, last_login_filter: Optional[UrlFilter] = None,
                        site_role_filter: Optional[UrlFilter] = None, username_filter: Optional[UrlFilter] = None,
                        sorts: Optional[List[Sort]] = None, fields: Optional[List[str] ] =None,
-                       page_number: Optional[int] = None) -> Dict:
+                       page_number: Optional[int] = None, page_size: Optional[int] = None) -> Dict:
         return  self.query_users_json(all_fields=all_fields, last_login_filter=last_login_filter,
                                      site_role_filter=site_role_filter, username_filter=username_filter, sorts=sorts,
-                                     fields=fields, page_number=page_number)
+                                     fields=fields, page_number=page_number, page_size=page_size)
 
     def query_users_json(self, all_fields: bool = True, last_login_filter: Optional[UrlFilter] = None,
                          site_role_filter: Optional[UrlFilter] = None, username_filter: Optional[UrlFilter] = None,
                          sorts: Optional[List[Sort]] = None, fields: Optional[List[str]] = None,
-                         page_number: Optional[int] = None) -> Dict:
+                         page_number: Optional[int] = None, page_size: Optional[int] = None) -> Dict:
 
         self.rest.start_log_block()
         if fields is None:
@@ -53,30 +69,27 @@ class UserMethods():
         filter_checks = {'lastLogin': last_login_filter, 'siteRole': site_role_filter, 'name': username_filter}
         filters = self.rest._check_filter_objects(filter_checks)
 
-        users = self.rest.query_resource_json("users", filters=filters, sorts=sorts, fields=fields, page_number=page_number)
+        users = self.rest.query_resource_json("users", filters=filters, sorts=sorts, fields=fields, page_number=page_number,
+                                              page_size=page_size)
 
         self.rest.log('Found {} users'.format(str(len(users))))
         self.rest.end_log_block()
         return users
 
-    def query_user(self, username_or_luid: str, all_fields: bool = True) -> ET.Element:
+    def query_user(self, username_or_luid: str, all_fields: bool = True,
+                   fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        user = self.rest.query_single_element_from_endpoint_with_filter("user", username_or_luid, all_fields=all_fields)
+        user = self.rest.query_single_element_from_endpoint_with_filter("user", username_or_luid, all_fields=all_fields,
+                                                                        fields=fields)
         user_luid = user.get("id")
         username = user.get('name')
-        self.rest.username_luid_cache[username] = user_luid
+        self.rest._store_cached_luid('user', username, user_luid)
         self.rest.end_log_block()
         return user
 
     def query_username(self, user_luid: str) -> str:
         self.rest.start_log_block()
-        try:
-            luid_index = list(self.rest.username_luid_cache.values()).index(user_luid)
-            username = list(self.rest.username_luid_cache.keys())[luid_index]
-        except ValueError as e:
-            user = self.query_user(user_luid)
-            username = user.get('name')
-
+        username = self.rest.query_username(user_luid)
         self.rest.end_log_block()
         return username
 
@@ -215,3 +228,190 @@ class UserMethods():
             user_luid = self.rest.query_user_luid(user)
             self.rest.update_user(username_or_luid=user_luid, site_role="Unlicensed")
         self.rest.end_log_block()
+
+    # Makes the users on the site, their site roles and the members of their groups match desired_users, a dict of
+    # username : {'site_role': ..., 'groups': [...], 'full_name': ..., 'email': ..., 'auth_setting': ...}, where
+    # only 'site_role' is required. Every group named in 'groups' is managed: its members become exactly the users
+    # listed with it. Missing groups are created, unless create_missing_groups=False.
+    # Users on the site who aren't in desired_users are left alone, unless unlisted_users is 'unlicense' or 'remove'.
+    # Administrators, guest and the signed-in user are never unlicensed or removed.
+    #
+    # The site is read once (users, groups and the members of the managed groups) and compared with desired_users,
+    # so only the changes are sent, max_concurrent_requests at a time. With dry_run=True nothing is sent.
+    # Returns a dict with 'changes', a dict for each change (see below), 'summary', the number of each action, and
+    # 'rest_calls', how many requests the changes take to send
+    def sync_users(self, desired_users: Dict[str, Dict], unlisted_users: Optional[str] = None,
+                   create_missing_groups: bool = True, max_concurrent_requests: int = 4,
+                   dry_run: bool = False) -> Dict:
+        self.rest.start_log_block()
+        if unlisted_users not in [None, 'unlicense', 'remove']:
+            raise InvalidOptionException("unlisted_users must be None, 'unlicense' or 'remove'")
+        for username in desired_users:
+            if desired_users[username].get('site_role') not in self.rest.site_roles:
+                raise InvalidOptionException("{} is not a valid site role in Tableau Server (user {})".format(
+                    desired_users[username].get('site_role'), username))
+        plan = self._plan_user_sync(desired_users, unlisted_users, create_missing_groups, max_concurrent_requests)
+        changes = plan['changes']
+        summary = {}
+        for change in changes:
+            summary[change['action']] = summary.get(change['action'], 0) + 1
+        rest_calls = sum(change['rest_calls'] for change in changes)
+        self.rest.log('User sync: {} changes, {} REST calls: {}'.format(len(changes), rest_calls, summary))
+        if dry_run is False:
+            self._apply_user_sync(plan, max_concurrent_requests)
+        self.rest.end_log_block()
+        return {'changes': changes, 'summary': summary, 'rest_calls': rest_calls}
+
+    # Reads the site and works out the changes. Each change is a dict with 'action' (one of 'create_group',
+    # 'add_user', 'update_user', 'unlicense_user', 'remove_user', 'add_to_group' or 'remove_from_group'),
+    # 'username', 'user_luid', 'group', 'attributes' (the user attributes being set), 'rest_calls' and 'status',
+    # which is 'planned' until it is sent, then 'done', 'failed' (with the exception in 'error') or, for group
+    # members, the status from _send_group_member_changes
+    def _plan_user_sync(self, desired_users: Dict[str, Dict], unlisted_users: Optional[str],
+                        create_missing_groups: bool, max_concurrent_requests: int) -> Dict:
+        self.rest.start_log_block()
+        user_fields = ['id', 'name', 'siteRole']
+        if any('full_name' in u for u in desired_users.values()):
+            user_fields.append('fullName')
+        if any('email' in u for u in desired_users.values()):
+            user_fields.append('email')
+        current_users = {}
+        for user in self.rest.iter_resource('users', fields=user_fields, page_size=1000):
+            current_users[user.get('name')] = user
+            self.rest._store_cached_luid('user', user.get('name'), user.get('id'))
+        group_luids = {}
+        for group in self.rest.iter_resource('groups', fields=['id', 'name'], page_size=1000):
+            group_luids[group.get('name')] = group.get('id')
+
+        # group name : usernames that should be in it. Everyone is always in All Users
+        desired_groups = {}
+        for username in desired_users:
+            for group_name in desired_users[username].get('groups', []):
+                if group_name != 'All Users':
+                    desired_groups.setdefault(group_name, set()).add(username)
+
+        def query_members(group_name: str) -> Dict[str, str]:
+            members = self.rest.query_resource("groups/{}/users".format(group_luids[group_name]),
+                                               fields=['id', 'name'])
+            return {member.get('name'): member.get('id') for member in members}
+        existing_groups = [g for g in desired_groups if g in group_luids]
+        group_members = dict(zip(existing_groups, self.rest._run_in_parallel(
+            query_members, existing_groups, max_concurrent_requests=max_concurrent_requests)))
+
+        def new_change(action: str, username: Optional[str] = None, user_luid: Optional[str] = None,
+                       group: Optional[str] = None, attributes: Optional[Dict] = None, rest_calls: int = 1) -> Dict:
+            return {'action': action, 'username': username, 'user_luid': user_luid, 'group': group,
+                    'attributes': attributes, 'rest_calls': rest_calls, 'status': 'planned'}
+
+        changes = []
+        for group_name in desired_groups:
+            if group_name not in group_luids:
+                if create_missing_groups is False:
+                    raise NoMatchFoundException("No group found with name {}".format(group_name))
+                changes.append(new_change('create_group', group=group_name))
+
+        attribute_names = {'site_role': 'siteRole', 'full_name': 'fullName', 'email': 'email'}
+        for username in desired_users:
+            desired = {attribute_names[k]: v for k, v in desired_users[username].items() if k in attribute_names}
+            current_user = current_users.get(username)
+            if current_user is None:
+                attributes = dict(desired)
+                if desired_users[username].get('auth_setting') is not None:
+                    attributes['authSetting'] = desired_users[username]['auth_setting']
+                # The name and site role are sent first, then anything else is an update
+                extra = [a for a in attributes if a not in ['siteRole', 'authSetting']]
+                changes.append(new_change('add_user', username=username, attributes=attributes,
+                                          rest_calls=2 if len(extra) > 0 else 1))
+            else:
+                attributes = {a: v for a, v in desired.items() if current_user.get(a) != v}
+                if len(attributes) > 0:
+                    changes.append(new_change('update_user', username=username, user_luid=current_user.get('id'),
+                                              attributes=attributes))
+
+        if unlisted_users is not None:
+            for username in current_users:
+                current_user = current_users[username]
+                if (username in desired_users or username == 'guest'
+                        or current_user.get('id') == self.rest.user_luid
+                        or 'Administrator' in current_user.get('siteRole', '')):
+                    continue
+                if unlisted_users == 'unlicense':
+                    if current_user.get('siteRole') != 'Unlicensed':
+                        changes.append(new_change('unlicense_user', username=username,
+                                                  user_luid=current_user.get('id'),
+                                                  attributes={'siteRole': 'Unlicensed'}))
+                else:
+                    changes.append(new_change('remove_user', username=username, user_luid=current_user.get('id')))
+
+        for group_name in desired_groups:
+            members = group_members.get(group_name, {})
+            for username in desired_groups[group_name]:
+                if username not in members:
+                    user_luid = current_users[username].get('id') if username in current_users else None
+                    changes.append(new_change('add_to_group', username=username, user_luid=user_luid,
+                                              group=group_name))
+            for username in members:
+                if username not in desired_groups[group_name]:
+                    changes.append(new_change('remove_from_group', username=username, user_luid=members[username],
+                                              group=group_name))
+        self.rest.end_log_block()
+        return {'changes': changes, 'group_luids': group_luids}
+
+    # Sends the changes in the order they depend on each other: groups are created and users added first, so their
+    # LUIDs are known when the group members are changed
+    def _apply_user_sync(self, plan: Dict, max_concurrent_requests: int):
+        self.rest.start_log_block()
+        changes = plan['changes']
+        group_luids = plan['group_luids']
+        user_luids = {}
+        group_methods = GroupMethods(self.rest)
+
+        def apply(change: Dict) -> Dict:
+            action = change['action']
+            try:
+                if action == 'create_group':
+                    group_luids[change['group']] = group_methods.create_group(change['group'])
+                elif action == 'add_user':
+                    attributes = change['attributes']
+                    change['user_luid'] = self.add_user_by_username(
+                        change['username'], site_role=attributes['siteRole'],
+                        auth_setting=attributes.get('authSetting'))
+                    if change['rest_calls'] > 1:
+                        self.update_user(change['user_luid'], full_name=attributes.get('fullName'),
+                                         email=attributes.get('email'))
+                    user_luids[change['username']] = change['user_luid']
+                elif action in ['update_user', 'unlicense_user']:
+                    attributes = change['attributes']
+                    self.update_user(change['user_luid'], full_name=attributes.get('fullName'),
+                                     site_role=attributes.get('siteRole'), email=attributes.get('email'))
+                elif action == 'remove_user':
+                    url = self.rest.build_api_url("users/{}".format(change['user_luid']))
+                    self.rest.send_delete_request(url, raise_exceptions=True)
+                else:
+                    if change['user_luid'] is None:
+                        change['user_luid'] = user_luids.get(change['username'])
+                    group_luid = group_luids.get(change['group'])
+                    if group_luid is None:
+                        raise NoMatchFoundException("No group found with name {}".format(change['group']))
+                    member = [(change['user_luid'], change['username'])]
+                    if action == 'add_to_group':
+                        result = group_methods._send_group_member_changes(group_luid, member, [])[0]
+                    else:
+                        result = group_methods._send_group_member_changes(group_luid, [], member)[0]
+                    change['status'] = result['status']
+                    if 'error' in result:
+                        change['error'] = result['error']
+                    return change
+                change['status'] = 'done'
+            except Exception as e:
+                self.rest.log('{} {} failed: {}'.format(action, change['username'] or change['group'], e))
+                change['status'] = 'failed'
+                change['error'] = e
+            return change
+
+        phases = [['create_group', 'add_user'], ['update_user', 'unlicense_user', 'remove_user'],
+                  ['add_to_group', 'remove_from_group']]
+        for phase in phases:
+            self.rest._run_in_parallel(apply, [c for c in changes if c['action'] in phase],
+                                       max_concurrent_requests=max_concurrent_requests)
+        self.rest.end_log_block()
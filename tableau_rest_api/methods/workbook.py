@@ -19,17 +19,24 @@ class WorkbookMethods():
     # This uses the logged in username for convenience by default
     def query_workbooks(self, username_or_luid: Optional[str] = None, project_name_or_luid: Optional[str] = None,
                         all_fields: bool = True, filters: Optional[List[UrlFilter]] = None, sorts: Optional[List[Sort]] = None,
-                        fields: Optional[List[str]] = None) -> ET.Element:
+                        fields: Optional[List[str]] = None, page_size: Optional[int] = None) -> ET.Element:
         self.rest.start_log_block()
+        # Only a projection that was asked for is sent for a user's workbooks, not the all_fields default
+        user_fields = fields
         if fields is None:
             if all_fields is True:
                 fields = ['_all_']
+        if project_name_or_luid is not None:
+            fields = self.rest._add_required_fields(fields, ['project.id'])
+            user_fields = self.rest._add_required_fields(user_fields, ['project.id'])
 
         if username_or_luid is not None:
             user_luid = self.rest.query_user_luid(username_or_luid)
-            wbs = self.rest.query_resource("users/{}/workbooks".format(user_luid))
+            wbs = self.rest.query_resource("users/{}/workbooks".format(user_luid), fields=user_fields,
+                                           page_size=page_size)
         else:
-            wbs = self.rest.query_resource("workbooks", sorts=sorts, filters=filters, fields=fields)
+            wbs = self.rest.query_resource("workbooks", sorts=sorts, filters=filters, fields=fields,
+                                           page_size=page_size)
 
         if project_name_or_luid is not None:
             project_luid = self.rest.query_project_luid(project_name_or_luid)
@@ -40,15 +47,43 @@ class WorkbookMethods():
         self.rest.end_log_block()
         return wbs
 
-    def query_workbooks_for_user(self, username_or_luid: str) -> ET.Element:
+    # Generator version of query_workbooks, yielding each workbook Element as the pages come back
+    def iter_workbooks(self, username_or_luid: Optional[str] = None, project_name_or_luid: Optional[str] = None,
+                       all_fields: bool = True, filters: Optional[List[UrlFilter]] = None,
+                       sorts: Optional[List[Sort]] = None, fields: Optional[List[str]] = None,
+                       page_size: Optional[int] = None) -> Iterator[ET.Element]:
+        user_fields = fields
+        if fields is None:
+            if all_fields is True:
+                fields = ['_all_']
+        if project_name_or_luid is not None:
+            fields = self.rest._add_required_fields(fields, ['project.id'])
+            user_fields = self.rest._add_required_fields(user_fields, ['project.id'])
+
+        if username_or_luid is not None:
+            user_luid = self.rest.query_user_luid(username_or_luid)
+            wbs = self.rest.iter_resource("users/{}/workbooks".format(user_luid), fields=user_fields,
+                                          page_size=page_size)
+        else:
+            wbs = self.rest.iter_resource("workbooks", sorts=sorts, filters=filters, fields=fields,
+                                          page_size=page_size)
+
+        if project_name_or_luid is not None:
+            project_luid = self.rest.query_project_luid(project_name_or_luid)
+            wbs = (wb for wb in wbs if wb.find('t:project[@id="{}"]'.format(project_luid), self.rest.ns_map) is not None)
+        return wbs
+
+    def query_workbooks_for_user(self, username_or_luid: str, page_size: Optional[int] = None,
+                                 fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        wbs = self.query_workbooks(username_or_luid)
+        wbs = self.query_workbooks(username_or_luid, fields=fields, page_size=page_size)
         self.rest.end_log_block()
         return wbs
 
     def query_workbooks_json(self, username_or_luid: Optional[str] = None, all_fields: bool = True,
                              filters: Optional[List[UrlFilter]] = None, sorts: Optional[List[Sort]] = None,
-                             fields: Optional[List[str]] = None, page_number: Optional[int] = None) -> Dict:
+                             fields: Optional[List[str]] = None, page_number: Optional[int] = None,
+                             page_size: Optional[int] = None) -> Dict:
         self.rest.start_log_block()
         if fields is None:
             if all_fields is True:
@@ -57,62 +92,56 @@ class WorkbookMethods():
         if username_or_luid is not None:
             user_luid = self.rest.query_user_luid(username_or_luid)
             wbs = self.rest.query_resource_json("users/{}/workbooks".format(user_luid), sorts=sorts, filters=filters,
-                                           fields=fields, page_number=page_number)
+                                           fields=fields, page_number=page_number, page_size=page_size)
         else:
             wbs = self.rest.query_resource_json("workbooks", sorts=sorts, filters=filters, fields=fields,
-                                           page_number=page_number)
+                                           page_number=page_number, page_size=page_size)
 
         self.rest.end_log_block()
         return wbs
 
     # Because a workbook can have the same pretty name in two projects, requires more logic
     def query_workbook(self, wb_name_or_luid: str, proj_name_or_luid: Optional[str] = None,
-                       username_or_luid: Optional[str] = None) -> ET.Element:
+                       username_or_luid: Optional[str] = None, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        workbooks = self.rest.query_workbooks(username_or_luid)
         if self.rest.is_luid(wb_name_or_luid):
-            workbooks_with_name = self.rest.query_resource("workbooks/{}".format(wb_name_or_luid))
+            wb_luid = wb_name_or_luid
+        elif username_or_luid is None:
+            # Only brings back the id, name and project of the workbooks with this name
+            wb_luid = self.rest.query_workbook_luid(wb_name_or_luid, proj_name_or_luid)
         else:
-            workbooks_with_name = workbooks.findall('.//t:workbook[@name="{}"]'.format(wb_name_or_luid), self.rest.ns_map)
-        if len(workbooks_with_name) == 0:
-            self.rest.end_log_block()
-            raise NoMatchFoundException("No workbook found for username '{}' named {}".format(username_or_luid, wb_name_or_luid))
-        elif proj_name_or_luid is None:
-            if len(workbooks_with_name) == 1:
-                wb_luid = workbooks_with_name[0].get("id")
-                wb = self.rest.query_resource("workbooks/{}".format(wb_luid))
+            workbooks = self.query_workbooks(username_or_luid)
+            workbooks_with_name = workbooks.findall('.//t:workbook[@name="{}"]'.format(wb_name_or_luid),
+                                                    self.rest.ns_map)
+            if len(workbooks_with_name) == 0:
                 self.rest.end_log_block()
-                return wb
+                raise NoMatchFoundException("No workbook found for username '{}' named {}".format(username_or_luid,
+                                                                                                  wb_name_or_luid))
+            if proj_name_or_luid is None:
+                if len(workbooks_with_name) > 1:
+                    self.rest.end_log_block()
+                    raise MultipleMatchesFoundException(
+                        'More than one workbook found by name {} without a project specified'.format(wb_name_or_luid))
             else:
-                self.rest.end_log_block()
-                raise MultipleMatchesFoundException('More than one workbook found by name {} without a project specified').format(wb_name_or_luid)
-        else:
-            if self.rest.is_luid(proj_name_or_luid):
-                wb_in_proj = workbooks.findall('.//t:workbook[@name="{}"]/:project[@id="{}"]/..'.format(wb_name_or_luid, proj_name_or_luid), self.rest.ns_map)
-            else:
-                wb_in_proj = workbooks.findall('.//t:workbook[@name="{}"]/t:project[@name="{}"]/..'.format(wb_name_or_luid, proj_name_or_luid), self.rest.ns_map)
-            if len(wb_in_proj) == 0:
-                self.rest.end_log_block()
-                raise NoMatchFoundException('No workbook found with name {} in project {}'.format(wb_name_or_luid, proj_name_or_luid))
-            wb_luid = wb_in_proj[0].get("id")
-            wb = self.rest.query_resource("workbooks/{}".format(wb_luid))
-            self.rest.end_log_block()
-            return wb
+                if self.rest.is_luid(proj_name_or_luid):
+                    project_xpath = 't:project[@id="{}"]'.format(proj_name_or_luid)
+                else:
+                    project_xpath = 't:project[@name="{}"]'.format(proj_name_or_luid)
+                workbooks_with_name = [wb for wb in workbooks_with_name
+                                       if wb.find(project_xpath, self.rest.ns_map) is not None]
+                if len(workbooks_with_name) == 0:
+                    self.rest.end_log_block()
+                    raise NoMatchFoundException('No workbook found with name {} in project {}'.format(
+                        wb_name_or_luid, proj_name_or_luid))
+            wb_luid = workbooks_with_name[0].get("id")
+        wb = self.rest.query_resource("workbooks/{}".format(wb_luid), fields=fields)
+        self.rest.end_log_block()
+        return wb
 
-    def query_workbooks_in_project(self, project_name_or_luid: str, username_or_luid: Optional[str] = None):
+    def query_workbooks_in_project(self, project_name_or_luid: str, username_or_luid: Optional[str] = None,
+                                   fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-
-        project_luid = self.rest.query_project_luid(project_name_or_luid)
-        if username_or_luid is not None:
-            user_luid = self.rest.query_user_luid(username_or_luid)
-            workbooks = self.query_workbooks(user_luid)
-        else:
-            workbooks = self.query_workbooks()
-        # This brings back the workbook itself
-        wbs_in_project = workbooks.findall('.//t:project[@id="{}"]/..'.format(project_luid), self.rest.ns_map)
-        wbs = ET.Element(self.rest.ns_prefix + 'workbooks')
-        for wb in wbs_in_project:
-            wbs.append(wb)
+        wbs = self.query_workbooks(username_or_luid, project_name_or_luid=project_name_or_luid, fields=fields)
         self.rest.end_log_block()
         return wbs
 
@@ -196,37 +225,43 @@ class WorkbookMethods():
 
 
     def query_workbook_views(self, wb_name_or_luid: str, proj_name_or_luid: Optional[str] = None,
-                             username_or_luid: Optional[str] = None, usage: bool = False) -> ET.Element:
+                             username_or_luid: Optional[str] = None, usage: bool = False,
+                             fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         if usage not in [True, False]:
             raise InvalidOptionException('Usage can only be set to True or False')
         wb_luid = self.rest.query_workbook_luid(wb_name_or_luid, proj_name_or_luid)
-        vws = self.rest.query_resource("workbooks/{}/views?includeUsageStatistics={}".format(wb_luid, str(usage).lower()))
+        vws = self.rest.query_resource("workbooks/{}/views?includeUsageStatistics={}".format(wb_luid, str(usage).lower()),
+                                       fields=fields)
         self.rest.end_log_block()
         return vws
 
     def query_workbook_views_json(self, wb_name_or_luid: str, proj_name_or_luid: Optional[str] = None,
                                   username_or_luid: Optional[str] = None, usage: bool = False,
-                                  page_number: Optional[int] = None) -> Dict:
+                                  page_number: Optional[int] = None, fields: Optional[List[str]] = None) -> Dict:
         self.rest.start_log_block()
         if usage not in [True, False]:
             raise InvalidOptionException('Usage can only be set to True or False')
         wb_luid = self.rest.query_workbook_luid(wb_name_or_luid, proj_name_or_luid)
         url_params = self.rest.build_url_parameter_string(map_dict={'includeUsageStatistics': str(usage).lower()})
-        vws = self.rest.query_resource_json("workbooks/{}/views".format(wb_luid),
+        vws = self.rest.query_resource_json("workbooks/{}/views".format(wb_luid), fields=fields,
                                        additional_url_ending=url_params, page_number=page_number)
         self.rest.end_log_block()
         return vws
 
     def query_workbook_view(self, wb_name_or_luid, view_name_or_luid: Optional[str] = None,
                             view_content_url: Optional[str] = None, proj_name_or_luid: Optional[str] = None,
-                            username_or_luid: Optional[str] = None, usage: bool = False) -> List[ET.Element]:
+                            username_or_luid: Optional[str] = None, usage: bool = False,
+                            fields: Optional[List[str]] = None) -> List[ET.Element]:
 
         self.rest.start_log_block()
         if usage not in [True, False]:
             raise InvalidOptionException('Usage can only be set to True or False')
         wb_luid = self.rest.query_workbook_luid(wb_name_or_luid, proj_name_or_luid)
-        vws = self.rest.query_resource("workbooks/{}/views?includeUsageStatistics={}".format(wb_luid, str(usage).lower()))
+        # The view is matched on its id, name or contentUrl, so those always come back
+        fields = self.rest._add_required_fields(fields, ['id', 'name', 'contentUrl'])
+        vws = self.rest.query_resource("workbooks/{}/views?includeUsageStatistics={}".format(wb_luid, str(usage).lower()),
+                                       fields=fields)
 
         if view_content_url is not None:
             views_with_name = vws.findall('.//t:view[@contentUrl="{}"]'.format(view_content_url), self.rest.ns_map)
@@ -247,16 +282,17 @@ class WorkbookMethods():
     # This should be the key to updating the connections in a workbook. Seems to return
     # LUIDs for connections and the datatypes, but no way to distinguish them
     def query_workbook_connections(self, wb_name_or_luid: str, proj_name_or_luid: Optional[str] = None,
-                                   username_or_luid: Optional[str] = None) -> ET.Element:
+                                   username_or_luid: Optional[str] = None,
+                                   fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
         wb_luid = self.rest.query_workbook_luid(wb_name_or_luid, proj_name_or_luid)
-        conns = self.rest.query_resource("workbooks/{}/connections".format(wb_luid))
+        conns = self.rest.query_resource("workbooks/{}/connections".format(wb_luid), fields=fields)
         self.rest.end_log_block()
         return conns
 
     def query_views(self, all_fields: bool = True, usage: bool = False,
                          filters: Optional[List[UrlFilter]] = None, sorts: Optional[Sort] = None,
-                         fields: Optional[List[str]] = None) -> ET.Element:
+                         fields: Optional[List[str]] = None, page_size: Optional[int] = None) -> ET.Element:
         self.rest.start_log_block()
 
         if fields is None:
@@ -267,13 +303,15 @@ class WorkbookMethods():
             raise InvalidOptionException('Usage can only be set to True or False')
 
         vws = self.rest.query_resource("views", filters=filters, sorts=sorts, fields=fields,
-                                  additional_url_ending="includeUsageStatistics={}".format(str(usage).lower()))
+                                  additional_url_ending="includeUsageStatistics={}".format(str(usage).lower()),
+                                  page_size=page_size)
         self.rest.end_log_block()
         return vws
 
     def query_views_json(self, all_fields: bool = True, usage: bool = False,
                          filters: Optional[List[UrlFilter]] = None, sorts: Optional[Sort] = None,
-                         fields: Optional[List[str]] = None, page_number: Optional[int] = None) -> Dict:
+                         fields: Optional[List[str]] = None, page_number: Optional[int] = None,
+                         page_size: Optional[int] = None) -> Dict:
         self.rest.start_log_block()
 
         if fields is None:
@@ -285,13 +323,13 @@ class WorkbookMethods():
 
         vws = self.rest.query_resource_json("views", filters=filters, sorts=sorts, fields=fields,
                                        additional_url_ending="includeUsageStatistics={}".format(str(usage).lower()),
-                                       page_number=page_number)
+                                       page_number=page_number, page_size=page_size)
         self.rest.end_log_block()
         return vws
 
-    def query_view(self, vw_name_or_luid: str) -> ET.Element:
+    def query_view(self, vw_name_or_luid: str, fields: Optional[List[str]] = None) -> ET.Element:
         self.rest.start_log_block()
-        vw = self.rest.query_single_element_from_endpoint_with_filter('view', vw_name_or_luid)
+        vw = self.rest.query_single_element_from_endpoint_with_filter('view', vw_name_or_luid, fields=fields)
         self.rest.end_log_block()
         return vw
 
@@ -312,42 +350,40 @@ class WorkbookMethods():
         self.rest.start_log_block()
 
         wb_luid = self.rest.query_workbook_luid(wb_name_or_luid, proj_name_or_luid)
+        # Streamed to disk in chunks, so large workbooks are never held in memory
         try:
-            if include_extract is False:
-                url = self.rest.build_api_url("workbooks/{}/content?includeExtract=False".format(wb_luid))
-            else:
-                url = self.rest.build_api_url("workbooks/{}/content".format(wb_luid))
-            wb = self.rest.send_binary_get_request(url)
-            extension = None
-            if self.rest._last_response_content_type.find('application/xml') != -1:
-                extension = '.twb'
-            elif self.rest._last_response_content_type.find('application/octet-stream') != -1:
-                extension = '.twbx'
-            if extension is None:
-                raise IOError('File extension could not be determined')
-            self.rest.log(
-                'Response type was {} so extension will be {}'.format(self.rest._last_response_content_type, extension))
+            result = self.rest._download_content('workbook', wb_luid, filename_no_extension,
+                                                 include_extract=include_extract)
         except RecoverableHTTPException as e:
             self.rest.log("download_workbook resulted in HTTP error {}, Tableau Code {}".format(e.http_code, e.tableau_error_code))
             self.rest.end_log_block()
             raise
-        except:
+        except IOError:
+            self.rest.log("Error: File '{}' cannot be opened to save to".format(filename_no_extension))
             self.rest.end_log_block()
             raise
-        try:
-
-            save_filename = filename_no_extension + extension
-
-            save_file = open(save_filename, 'wb')
-            save_file.write(wb)
-            save_file.close()
-
-        except IOError:
-            self.rest.log("Error: File '{}' cannot be opened to save to".format(filename_no_extension + extension))
+        except:
+            self.rest.end_log_block()
             raise
 
         self.rest.end_log_block()
-        return save_filename
+        return result['filename']
+
+    # Downloads many workbooks in parallel, streaming each to disk. Give a list of LUIDs, or leave wb_luids as None
+    # for every workbook on the site (or in one project). Files already downloaded with the same updatedAt or size
+    # are skipped, and interrupted downloads are resumed. Returns a dict for each workbook with the filename,
+    # status ('downloaded', 'resumed', 'skipped' or 'failed'), bytes, seconds and mb_per_second
+    def download_workbooks(self, save_to_directory: str, wb_luids: Optional[List[str]] = None,
+                           project_name_or_luid: Optional[str] = None, include_extract: bool = True,
+                           max_concurrent_downloads: int = 4, skip_existing: bool = True, resume: bool = True,
+                           use_project_directories: bool = True, chunk_size: int = 1024 * 1024) -> List[Dict]:
+        return self.rest._download_content_in_bulk('workbook', save_to_directory=save_to_directory, luids=wb_luids,
+                                                   project_name_or_luid=project_name_or_luid,
+                                                   include_extract=include_extract,
+                                                   max_concurrent_downloads=max_concurrent_downloads,
+                                                   skip_existing=skip_existing, resume=resume,
+                                                   use_project_directories=use_project_directories,
+                                                   chunk_size=chunk_size)
 
     # In 3.2, you can hide views from publishing
     def publish_workbook(self, workbook_filename: str, workbook_name: str, project_obj: Project,
@@ -0,0 +1,122 @@
+import os
+from typing import Optional, List, Union, Tuple, Iterator, BinaryIO
+
+
+# File-like multipart/mixed request body for publishing and file uploads. Parts are added as either bytes or a
+# range of a file on disk, and the file parts are only read as the HTTP layer asks for more of the body. This means
+# a publish never holds more than read_size bytes of the file in memory, no matter how big the file is.
+# The length is known up front, so requests still sends a Content-Length header rather than a chunked body.
+# Each body opens its own handle on the file, so several bodies for different ranges of the same file can be sent
+# from different threads at once
+class MultipartBody:
+    def __init__(self, boundary_string: str, read_size: int = 1024 * 1024):
+        self.boundary_string = boundary_string
+        self.read_size = read_size
+        # Each segment is either bytes or (filename, offset, length)
+        self._segments: List[Union[bytes, Tuple[str, int, int]]] = []
+        self._length = 0
+        self._finished = False
+        self._position = 0
+        self._segment_index = 0
+        self._segment_position = 0
+        self._file: Optional[BinaryIO] = None
+
+    def _add_segment(self, segment: Union[bytes, Tuple[str, int, int]], length: int):
+        if self._finished is True:
+            raise RuntimeError('Cannot add a part after the closing boundary has been added')
+        self._segments.append(segment)
+        self._length += length
+
+    def _add_part_header(self, content_disposition: str, content_type: str):
+        header = "--{}\r\nContent-Disposition: {}\r\nContent-Type: {}\r\n\r\n".format(self.boundary_string,
+                                                                                     content_disposition, content_type)
+        header = header.encode('utf-8')
+        self._add_segment(header, len(header))
+
+    def add_part(self, content_disposition: str, content_type: str, content: bytes):
+        self._add_part_header(content_disposition, content_type)
+        self._add_segment(content + b'\r\n', len(content) + 2)
+
+    # Adds length bytes of the file starting at offset, or everything from offset onward if length is None
+    def add_file_part(self, content_disposition: str, filename: str, offset: int = 0, length: Optional[int] = None,
+                      content_type: str = 'application/octet-stream'):
+        if length is None:
+            length = os.path.getsize(filename) - offset
+        self._add_part_header(content_disposition, content_type)
+        self._add_segment((filename, offset, length), length)
+        self._add_segment(b'\r\n', 2)
+
+    # Adds the closing boundary. Must be called once all of the parts are added
+    def finish(self) -> 'MultipartBody':
+        closing = "--{}--".format(self.boundary_string).encode('utf-8')
+        self._add_segment(closing, len(closing))
+        self._finished = True
+        return self
+
+    def __len__(self) -> int:
+        return self._length
+
+    def tell(self) -> int:
+        return self._position
+
+    # Only rewinding to the start is supported, which is all that is needed to send the body again
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if offset != 0 or whence != 0:
+            raise IOError('MultipartBody can only seek back to the beginning')
+        self.close()
+        self._position = 0
+        self._segment_index = 0
+        self._segment_position = 0
+        return 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length - self._position
+        pieces = []
+        remaining = size
+        while remaining > 0 and self._segment_index < len(self._segments):
+            segment = self._segments[self._segment_index]
+            if isinstance(segment, bytes):
+                piece = segment[self._segment_position:self._segment_position + remaining]
+                segment_length = len(segment)
+            else:
+                filename, offset, segment_length = segment
+                # An empty file (or length=0) has nothing to read, so the segment is just passed over
+                piece = b''
+                if segment_length - self._segment_position > 0:
+                    if self._file is None:
+                        self._file = open(filename, 'rb')
+                        self._file.seek(offset + self._segment_position)
+                    piece = self._file.read(min(remaining, segment_length - self._segment_position))
+                    if len(piece) == 0:
+                        raise IOError('{} ended before the expected {} bytes could be read'.format(filename,
+                                                                                               segment_length))
+            pieces.append(piece)
+            remaining -= len(piece)
+            self._segment_position += len(piece)
+            if self._segment_position >= segment_length:
+                self.close()
+                self._segment_index += 1
+                self._segment_position = 0
+        data = b''.join(pieces)
+        self._position += len(data)
+        return data
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            data = self.read(self.read_size)
+            if len(data) == 0:
+                break
+            yield data
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # The whole body as bytes, only meant for small bodies and for logging / debugging
+    def getvalue(self) -> bytes:
+        self.seek(0)
+        data = self.read()
+        self.seek(0)
+        return data
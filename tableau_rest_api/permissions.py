@@ -1,4 +1,5 @@
-from typing import Union, Any, Optional, List, Dict
+from typing import Union, Any, Optional, List, Dict, Tuple, Iterator
+from collections.abc import MutableMapping
 
 from tableau_tools.logging_methods import LoggingMethods
 from tableau_tools.tableau_exceptions import *
@@ -118,122 +119,93 @@ class Permissions(LoggingMethods):
         '3.6': capabilities_3_5
     }
 
-    def __init__(self, group_or_user: str, luid: str, content_type: Optional[str] = None):
-        if group_or_user not in ['group', 'user']:
-            raise InvalidOptionException('group_or_user must be "group" or "user"')
-        self.content_type = content_type
-        self.obj_type = group_or_user
-        self._luid = luid
-        # Get total set of capabilities, set to None by default
-        self.capabilities = {}
-        self.__allowable_modes = ['Allow', 'Deny', None]
-        self.role_set = {
-            'Publisher': {
-                'all': 'Allow',
-                'Connect': None,
-                'Download': None,
-                'Move': None,
-                'Delete': None,
-                'Set Permissions': None,
-                'Project Leader': None,
-             },
-            'Interactor': {
-                'all': True,
-                'Connect': None,
-                'Download': None,
-                'Move': None,
-                'Delete': None,
-                'Set Permissions': None,
-                'Project Leader': None,
-                'Save': None
-            },
-            'Viewer': {
-                'View': 'Allow',
-                'Export Image': 'Allow',
-                'View Summary Data': 'Allow',
-                'View Comments': 'Allow',
-                'Add Comment': 'Allow'
-            },
-            'Editor': {
-                'all': True,
-                'Connect': None,
-                'Project Leader': None
-            },
-            'Data Source Connector': {
-                'all': None,
-                'Connect': None,
-                'Project Leader': None
-            },
-            'Data Source Editor': {
-                'all': None,
-                'View': 'Allow',
-                'Connect': 'Allow',
-                'Save': 'Allow',
-                'Download': 'Allow',
-                'Delete': 'Allow',
-                'Set Permissions': 'Allow'
-            },
-            'Project Leader': {
-                'all': None,
-                'Project Leader': 'Allow'
-            }
+    role_set = {
+        'Publisher': {
+            'all': 'Allow',
+            'Connect': None,
+            'Download': None,
+            'Move': None,
+            'Delete': None,
+            'Set Permissions': None,
+            'Project Leader': None,
+         },
+        'Interactor': {
+            'all': True,
+            'Connect': None,
+            'Download': None,
+            'Move': None,
+            'Delete': None,
+            'Set Permissions': None,
+            'Project Leader': None,
+            'Save': None
+        },
+        'Viewer': {
+            'View': 'Allow',
+            'Export Image': 'Allow',
+            'View Summary Data': 'Allow',
+            'View Comments': 'Allow',
+            'Add Comment': 'Allow'
+        },
+        'Editor': {
+            'all': True,
+            'Connect': None,
+            'Project Leader': None
+        },
+        'Data Source Connector': {
+            'all': None,
+            'Connect': None,
+            'Project Leader': None
+        },
+        'Data Source Editor': {
+            'all': None,
+            'View': 'Allow',
+            'Connect': 'Allow',
+            'Save': 'Allow',
+            'Download': 'Allow',
+            'Delete': 'Allow',
+            'Set Permissions': 'Allow'
+        },
+        'Project Leader': {
+            'all': None,
+            'Project Leader': 'Allow'
         }
+    }
 
-        self.site_roles = (
-            'Interactor',
-            'Publisher',
-            'SiteAdministrator',
-            'Unlicensed',
-            'UnlicensedWithPublish',   # This was sunset at some point
-            'Viewer',
-            'ViewerWithPublish',
-            'ServerAdministrator',
-            'ReadOnly',
-            'Explorer',
-            'ExplorerCanPublish',
-            'SiteAdministratorExplorer',
-            'Creator',
-            'SiteAdministratorCreator'
-        )
-
-        server_content_roles_2_1 = {
-                "project": (
-                    'Viewer',
-                    'Publisher',
-                    'Project Leader'
-                ),
-                "workbook": (
-                    'Viewer',
-                    'Interactor',
-                    'Editor'
-                ),
-                "datasource": (
-                    'Editor',
-                    'Connector'
-                )
-            }
-
-        server_content_roles_3_3 = {
-                "project": (
-                    'Viewer',
-                    'Publisher',
-                    'Project Leader'
-                ),
-                "workbook": (
-                    'Viewer',
-                    'Interactor',
-                    'Editor'
-                ),
-                "datasource": (
-                    'Editor',
-                    'Connector'
-                ),
-                "flow" : (
-
-                )
-            }
+    site_roles = (
+        'Interactor',
+        'Publisher',
+        'SiteAdministrator',
+        'Unlicensed',
+        'UnlicensedWithPublish',   # This was sunset at some point
+        'Viewer',
+        'ViewerWithPublish',
+        'ServerAdministrator',
+        'ReadOnly',
+        'Explorer',
+        'ExplorerCanPublish',
+        'SiteAdministratorExplorer',
+        'Creator',
+        'SiteAdministratorCreator'
+    )
+
+    server_content_roles_2_1 = {
+            "project": (
+                'Viewer',
+                'Publisher',
+                'Project Leader'
+            ),
+            "workbook": (
+                'Viewer',
+                'Interactor',
+                'Editor'
+            ),
+            "datasource": (
+                'Editor',
+                'Connector'
+            )
+        }
 
-        server_content_roles_3_5 = {
+    server_content_roles_3_3 = {
             "project": (
                 'Viewer',
                 'Publisher',
@@ -248,47 +220,191 @@ class Permissions(LoggingMethods):
                 'Editor',
                 'Connector'
             ),
-            "flow": (
+            "flow" : (
 
-            ),
-            "database": (),
-            "table" : ()
+            )
         }
 
-        self.server_content_roles = {
-            '3.2': server_content_roles_2_1,
-            '3.3': server_content_roles_3_3,
-            '3.4': server_content_roles_3_3,
-            '3.5': server_content_roles_3_5,
-            '3.6': server_content_roles_3_5
-        }
+    server_content_roles_3_5 = {
+        "project": (
+            'Viewer',
+            'Publisher',
+            'Project Leader'
+        ),
+        "workbook": (
+            'Viewer',
+            'Interactor',
+            'Editor'
+        ),
+        "datasource": (
+            'Editor',
+            'Connector'
+        ),
+        "flow": (
 
-        self.server_to_rest_capability_map = {
-            'Add Comment': 'AddComment',
-            'Move': 'ChangeHierarchy',
-            'Set Permissions': 'ChangePermissions',
-            'Connect': 'Connect',
-            'Delete': 'Delete',
-            'View Summary Data': 'ExportData',
-            'Download Summary Data': 'ExportData',
-            'Export Image': 'ExportImage',
-            'Download Image/PDF': 'ExportImage',
-            'Download': 'ExportXml',
-            'Download Workbook/Save As': 'ExportXml',
-            'Filter': 'Filter',
-            'Project Leader': 'ProjectLeader',
-            'View': 'Read',
-            'Share Customized': 'ShareView',
-            'View Comments': 'ViewComments',
-            'View Underlying Data': 'ViewUnderlyingData',
-            'Download Full Data' : 'ViewUnderlyingData',
-            'Web Edit': 'WebAuthoring',
-            'Save': 'Write',
-            'Inherited Project Leader': 'InheritedProjectLeader',
-            'all': 'all'  # special command to do everything
-        }
+        ),
+        "database": (),
+        "table" : ()
+    }
 
+    server_content_roles = {
+        '3.2': server_content_roles_2_1,
+        '3.3': server_content_roles_3_3,
+        '3.4': server_content_roles_3_3,
+        '3.5': server_content_roles_3_5,
+        '3.6': server_content_roles_3_5
+    }
 
+    server_to_rest_capability_map = {
+        'Add Comment': 'AddComment',
+        'Move': 'ChangeHierarchy',
+        'Set Permissions': 'ChangePermissions',
+        'Connect': 'Connect',
+        'Delete': 'Delete',
+        'View Summary Data': 'ExportData',
+        'Download Summary Data': 'ExportData',
+        'Export Image': 'ExportImage',
+        'Download Image/PDF': 'ExportImage',
+        'Download': 'ExportXml',
+        'Download Workbook/Save As': 'ExportXml',
+        'Filter': 'Filter',
+        'Project Leader': 'ProjectLeader',
+        'View': 'Read',
+        'Share Customized': 'ShareView',
+        'View Comments': 'ViewComments',
+        'View Underlying Data': 'ViewUnderlyingData',
+        'Download Full Data' : 'ViewUnderlyingData',
+        'Web Edit': 'WebAuthoring',
+        'Save': 'Write',
+        'Inherited Project Leader': 'InheritedProjectLeader',
+        'all': 'all'  # special command to do everything
+    }
+
+    allowable_modes = ('Allow', 'Deny', None)
+
+    # Every REST API capability has a fixed bit, { capability_name : bit }, so any set of capabilities is one int.
+    # Filled in once the class is defined, see below
+    capability_bits: Dict[str, int] = {}
+    _masks: Dict[Tuple[str, ...], int] = {}
+
+    # The role definitions, capability tables and name map above are shared by the class rather than copied into
+    # every object, and there is no per-object __dict__, so each Permissions object is only these few attributes
+    __slots__ = ('content_type', 'obj_type', '_luid', 'logger', '_capabilities_mask', '_allow_mask', '_deny_mask')
+
+    def __init__(self, group_or_user: str, luid: str, content_type: Optional[str] = None):
+        if group_or_user not in ['group', 'user']:
+            raise InvalidOptionException('group_or_user must be "group" or "user"')
+        self.content_type = content_type
+        self.obj_type = group_or_user
+        self._luid = luid
+        self.logger = None
+        # The capabilities this object has, and which of those are set to Allow and which to Deny, as bitmasks.
+        # A capability in the first but in neither of the others is unspecified (None)
+        self._capabilities_mask = 0
+        self._allow_mask = 0
+        self._deny_mask = 0
+
+    # The bitmask for a tuple of capability names, worked out once for each tuple
+    @staticmethod
+    def _mask_for(capability_names: Tuple[str, ...]) -> int:
+        mask = Permissions._masks.get(capability_names)
+        if mask is None:
+            mask = 0
+            for capability_name in capability_names:
+                if capability_name != 'all':
+                    mask |= Permissions.capability_bits[capability_name]
+            Permissions._masks[capability_names] = mask
+        return mask
+
+    def _store_capability(self, capability_name: str, mode: Optional[str]):
+        bit = self.capability_bits.get(capability_name)
+        if bit is None:
+            raise InvalidOptionException('"{}" is not a capability in REST API or Server'.format(capability_name))
+        if mode not in self.allowable_modes:
+            raise InvalidOptionException('Capability mode can only be "Allow", "Deny" (case-sensitive) or None')
+        self._capabilities_mask |= bit
+        if mode == 'Allow':
+            self._allow_mask |= bit
+            self._deny_mask &= ~bit
+        elif mode == 'Deny':
+            self._deny_mask |= bit
+            self._allow_mask &= ~bit
+        else:
+            self._allow_mask &= ~bit
+            self._deny_mask &= ~bit
+
+    def _remove_capability(self, capability_name: str):
+        bit = self.capability_bits.get(capability_name, 0)
+        if self._capabilities_mask & bit == 0:
+            raise KeyError(capability_name)
+        self._capabilities_mask &= ~bit
+        self._allow_mask &= ~bit
+        self._deny_mask &= ~bit
+
+    # The mode of a capability, or KeyError if this object doesn't have it
+    def _get_capability(self, capability_name: str) -> Optional[str]:
+        bit = self.capability_bits.get(capability_name, 0)
+        if self._capabilities_mask & bit == 0:
+            raise KeyError(capability_name)
+        if self._allow_mask & bit:
+            return 'Allow'
+        if self._deny_mask & bit:
+            return 'Deny'
+        return None
+
+    # { capability_name : mode }, read from and written to the bitmasks directly. Set it to a dict to replace
+    # all of the capabilities at once
+    @property
+    def capabilities(self) -> '_CapabilitiesView':
+        return _CapabilitiesView(self)
+
+    @capabilities.setter
+    def capabilities(self, capabilities: Dict[str, Optional[str]]):
+        self._capabilities_mask = 0
+        self._allow_mask = 0
+        self._deny_mask = 0
+        for capability_name in capabilities:
+            self._store_capability(capability_name, capabilities[capability_name])
+
+    # Two Permissions objects are equal when they are for the same grantee and content type and Allow and Deny the
+    # same capabilities, which is a comparison of a few strings and ints. Unspecified capabilities don't count.
+    # Don't change an object while it is in a set or is a dict key, because its hash changes with it
+    def _equality_key(self) -> Tuple:
+        return self.obj_type, self._luid, self.content_type, self._allow_mask, self._deny_mask
+
+    def __eq__(self, other):
+        if not isinstance(other, Permissions):
+            return NotImplemented
+        return self._equality_key() == other._equality_key()
+
+    def __hash__(self):
+        return hash(self._equality_key())
+
+    # True if both Allow and Deny exactly the same capabilities, whoever they are for
+    def has_same_capabilities(self, other: 'Permissions') -> bool:
+        return self._allow_mask == other._allow_mask and self._deny_mask == other._deny_mask
+
+    # Every attribute is a string or an int, so a copy is just the attributes. The logger is shared by copies
+    def __copy__(self) -> 'Permissions':
+        new_obj = self.__class__.__new__(self.__class__)
+        new_obj.content_type = self.content_type
+        new_obj.obj_type = self.obj_type
+        new_obj._luid = self._luid
+        new_obj.logger = self.logger
+        new_obj._capabilities_mask = self._capabilities_mask
+        new_obj._allow_mask = self._allow_mask
+        new_obj._deny_mask = self._deny_mask
+        # A subclass without __slots__ of its own can have more attributes
+        if hasattr(self, '__dict__'):
+            new_obj.__dict__.update(self.__dict__)
+        return new_obj
+
+    def __deepcopy__(self, memo: Dict) -> 'Permissions':
+        return self.__copy__()
+
+    def __repr__(self) -> str:
+        return "{}('{}', '{}', {})".format(self.__class__.__name__, self.obj_type, self._luid,
+                                          dict(self.capabilities))
 
     def convert_server_permission_name_to_rest_permission(self, permission_name: str) -> str:
         if permission_name in self.server_to_rest_capability_map:
@@ -324,7 +440,7 @@ class Permissions(LoggingMethods):
 
     # Just use the direct "to_allow" and "to_deny" methods
     def set_capability(self, capability_name: str, mode: str):
-        if capability_name not in list(self.server_to_rest_capability_map.values()):
+        if capability_name not in self.capability_bits:
             # If it's the Tableau UI naming, translate it over
             if capability_name in self.server_to_rest_capability_map:
                 # InheritedProjectLeader (2.8+) is Read-Only
@@ -335,7 +451,7 @@ class Permissions(LoggingMethods):
                     capability_name = self.server_to_rest_capability_map[capability_name]
             else:
                 raise InvalidOptionException('"{}" is not a capability in REST API or Server'.format(capability_name))
-        self.capabilities[capability_name] = mode
+        self._store_capability(capability_name, mode)
 
     def set_capability_to_allow(self, capability_name: str):
         self.set_capability(capability_name=capability_name, mode="Allow")
@@ -354,20 +470,21 @@ class Permissions(LoggingMethods):
                     capability_name = self.server_to_rest_capability_map[capability_name]
             else:
                 raise InvalidOptionException('"{}" is not a capability in REST API or Server'.format(capability_name))
-        self.capabilities[capability_name] = None
+        self._store_capability(capability_name, None)
 
     # This exists specifically to allow the setting of read-only permissions
     def _set_capability_from_published_content(self, capability_name: str, mode: str):
-        if capability_name not in list(self.server_to_rest_capability_map.values()):
+        if capability_name not in self.capability_bits:
             # If it's the Tableau UI naming, translate it over
             if capability_name in self.server_to_rest_capability_map:
                 if capability_name != 'all':
                     capability_name = self.server_to_rest_capability_map[capability_name]
             else:
                 raise InvalidOptionException('"{}" is not a capability in REST API or Server'.format(capability_name))
-        self.capabilities[capability_name] = mode
+        self._store_capability(capability_name, mode)
 
-    def get_capabilities_dict(self) -> Dict:
+    # Changes made through the returned mapping change this object
+    def get_capabilities_dict(self) -> MutableMapping:
         return self.capabilities
 
     def get_content_type(self) -> str:
@@ -375,23 +492,19 @@ class Permissions(LoggingMethods):
         return self.content_type
 
     def set_all_to_deny(self):
-        for cap in self.capabilities:
-            if cap != 'all':
-                self.capabilities[cap] = 'Deny'
+        mask = self._capabilities_mask & ~self.capability_bits['all']
+        self._deny_mask |= mask
+        self._allow_mask &= ~mask
 
     def set_all_to_allow(self):
-        for cap in self.capabilities:
-            if cap == 'InheritedProjectLeader':
-                continue
-            if cap != 'all':
-                self.capabilities[cap] = 'Allow'
+        mask = self._capabilities_mask & ~(self.capability_bits['all'] | self.capability_bits['InheritedProjectLeader'])
+        self._allow_mask |= mask
+        self._deny_mask &= ~mask
 
     def set_all_to_unspecified(self):
-        for cap in self.capabilities:
-            if cap == 'InheritedProjectLeader':
-                continue
-            if cap != 'all':
-                self.capabilities[cap] = None
+        mask = self._capabilities_mask & ~(self.capability_bits['all'] | self.capability_bits['InheritedProjectLeader'])
+        self._allow_mask &= ~mask
+        self._deny_mask &= ~mask
 
     def set_capabilities_to_match_role(self, role: str):
         if role not in self.role_set:
@@ -418,98 +531,139 @@ class Permissions(LoggingMethods):
             elif role_capabilities[cap] is None:
                 self.set_capability_to_unspecified(cap)
 
+
+# The bit of each capability: the REST API names in the map from the Server UI names, then any others in the
+# capability tables, in the order first seen. Capabilities iterate in this order
+for _capability_name in list(Permissions.server_to_rest_capability_map.values()) + \
+        [c for version in Permissions.available_capabilities.values() for caps in version.values() for c in caps]:
+    if _capability_name not in Permissions.capability_bits:
+        Permissions.capability_bits[_capability_name] = 1 << len(Permissions.capability_bits)
+del _capability_name
+
+
+# The capabilities of a Permissions object as a { capability_name : mode } mapping, backed by its bitmasks
+class _CapabilitiesView(MutableMapping):
+    __slots__ = ('_permissions', )
+
+    def __init__(self, permissions: Permissions):
+        self._permissions = permissions
+
+    def __getitem__(self, capability_name: str) -> Optional[str]:
+        return self._permissions._get_capability(capability_name)
+
+    def __setitem__(self, capability_name: str, mode: Optional[str]):
+        self._permissions._store_capability(capability_name, mode)
+
+    def __delitem__(self, capability_name: str):
+        self._permissions._remove_capability(capability_name)
+
+    def __contains__(self, capability_name) -> bool:
+        return self._permissions._capabilities_mask & self._permissions.capability_bits.get(capability_name, 0) != 0
+
+    # The names are read before the first is returned, so capabilities can be changed while looping over them
+    def __iter__(self) -> Iterator[str]:
+        mask = self._permissions._capabilities_mask
+        return iter([name for name, bit in Permissions.capability_bits.items() if mask & bit])
+
+    def __len__(self) -> int:
+        return bin(self._permissions._capabilities_mask).count('1')
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
 class WorkbookPermissions(Permissions):
+    __slots__ = ()
+    role_set = {
+                "Viewer": {
+                    'all': None,
+                    'View': 'Allow',
+                    'Export Image': 'Allow',
+                    'View Summary Data': 'Allow',
+                    'View Comments': 'Allow',
+                    'Add Comment': 'Allow'
+                },
+                "Interactor": {
+                    'all': 'Allow',
+                    'Download': None,
+                    'Move': None,
+                    'Delete': None,
+                    'Set Permissions': None,
+                    'Save': None
+                },
+                "Editor": {
+                    'all': 'Allow'
+                }
+            }
+
     def __init__(self, group_or_user, group_or_user_luid):
         Permissions.__init__(self, group_or_user, group_or_user_luid, u'workbook')
-        for cap in self.available_capabilities['3.2']['workbook']:
-            if cap != 'all':
-                self.capabilities[cap] = None
-        self.role_set = {
-                    "Viewer": {
-                        'all': None,
-                        'View': 'Allow',
-                        'Export Image': 'Allow',
-                        'View Summary Data': 'Allow',
-                        'View Comments': 'Allow',
-                        'Add Comment': 'Allow'
-                    },
-                    "Interactor": {
-                        'all': 'Allow',
-                        'Download': None,
-                        'Move': None,
-                        'Delete': None,
-                        'Set Permissions': None,
-                        'Save': None
-                    },
-                    "Editor": {
-                        'all': 'Allow'
-                    }
-                }
+        self._capabilities_mask = self._mask_for(self.available_capabilities['3.2']['workbook'])
 
 class ProjectPermissions(Permissions):
+    __slots__ = ()
+    role_set = {
+        "Viewer": {
+            'all': None,
+            "View": "Allow"
+        },
+        "Publisher": {
+            'all': None,
+            "View": "Allow",
+            "Save": "Allow"
+        },
+        "Project Leader": {
+            'all': None,
+            "Project Leader": "Allow"
+        }
+    }
+
     def __init__(self, group_or_user, group_or_user_luid):
         Permissions.__init__(self, group_or_user, group_or_user_luid, u'project')
-        for cap in self.available_capabilities['3.2']['project']:
-            if cap != 'all':
-                self.capabilities[cap] = None
-        self.role_set = {
-            "Viewer": {
-                'all': None,
-                "View": "Allow"
-            },
-            "Publisher": {
-                'all': None,
-                "View": "Allow",
-                "Save": "Allow"
-            },
-            "Project Leader": {
-                'all': None,
-                "Project Leader": "Allow"
-            }
-        }
+        self._capabilities_mask = self._mask_for(self.available_capabilities['3.2']['project'])
 
 
 class DatasourcePermissions(Permissions):
+    __slots__ = ()
+    role_set = {
+        "Connector": {
+            'all': None,
+            'View': 'Allow',
+            'Connect': 'Allow'
+        },
+        "Editor": {
+            'all': 'Allow'
+        }
+    }
+
     def __init__(self, group_or_user, group_or_user_luid):
         Permissions.__init__(self, group_or_user, group_or_user_luid, u'datasource')
-        for cap in self.available_capabilities['3.2']['datasource']:
-            if cap != 'all':
-                self.capabilities[cap] = None
-        self.role_set = {
-            "Connector": {
-                'all': None,
-                'View': 'Allow',
-                'Connect': 'Allow'
-            },
-            "Editor": {
-                'all': 'Allow'
-            }
-        }
+        self._capabilities_mask = self._mask_for(self.available_capabilities['3.2']['datasource'])
 
 
 class FlowPermissions33(Permissions):
+    __slots__ = ()
+    # Unclear that there are any defined roles for Prep Conductor flows
+    role_set = {}
+
     def __init__(self, group_or_user: str, group_or_user_luid: str):
         Permissions.__init__(self, group_or_user, group_or_user_luid, 'flow')
-        for cap in self.available_capabilities['3.3']['flow']:
-            if cap != 'all':
-                self.capabilities[cap] = None
-        # Unclear that there are any defined roles for Prep Conductor flows
-        self.role_set = {}
+        self._capabilities_mask = self._mask_for(self.available_capabilities['3.3']['flow'])
 
 class DatabasePermissions35(Permissions):
+    __slots__ = ()
+    # No idea what roles might exist for 'databases' or 'tables'
+    role_set = {}
+
     def __init__(self, group_or_user: str, group_or_user_luid: str):
         Permissions.__init__(self, group_or_user, group_or_user_luid, 'database')
-        for cap in self.available_capabilities['3.5']['database']:
-            if cap != 'all':
-                self.capabilities[cap] = None
-        # No idea what roles might exist for 'databases' or 'tables'
-        self.role_set = {}
+        self._capabilities_mask = self._mask_for(self.available_capabilities['3.5']['database'])
 
 class TablePermissions35(Permissions):
+    __slots__ = ()
+    # No idea what roles might exist for 'databases' or 'tables'
+    role_set = {}
+
     def __init__(self, group_or_user: str, group_or_user_luid: str):
         Permissions.__init__(self, group_or_user, group_or_user_luid, 'table')
-        for cap in self.available_capabilities['3.5']['table']:
-            if cap != 'all':
-                self.capabilities[cap] = None
-        # No idea what roles might exist for 'databases' or 'tables'
-        self.role_set = {}
\ No newline at end of file
+        self._capabilities_mask = self._mask_for(self.available_capabilities['3.5']['table'])
@@ -1,7 +1,7 @@
 
 from .permissions import *
 import copy
-from typing import Union, Any, Optional, List, Dict, TYPE_CHECKING
+from typing import Union, Any, Optional, List, Dict, Tuple, Set, Mapping, TYPE_CHECKING
 
 from ..tableau_rest_xml import TableauRestXml
 
@@ -98,7 +98,7 @@ class PublishedContent(LoggingMethods):
                 luid = self.t_rest_api.query_user_luid(name_or_luid)
             else:
                 raise InvalidOptionException('Must send group or user only')
-        new_perms_obj = copy.deepcopy(perms_obj)
+        new_perms_obj = copy.copy(perms_obj)
         new_perms_obj.luid = luid
         self.end_log_block()
         return new_perms_obj
@@ -115,127 +115,84 @@ class PublishedContent(LoggingMethods):
             raise InvalidOptionException('Must pass one of group_name_or_luid or username_or_luid')
 
 
-    # Runs through the gcap object list, and tries to do a conversion all principals to matching LUIDs on current site
-    # Use case is replicating settings from one site to another
-    # Orig_site must be TableauRestApiConnection
-    # Not Finished
-    def convert_permissions_obj_list_from_orig_site_to_current_site(self, permissions_obj_list: List['Permissions'],
-                                                                    orig_site: Union['TableauRestApiConnection', 'TableauServerRest']) -> List['Permissions']:
+    # Every ('user' or 'group', luid) with permissions on this content. Project adds its default permissions
+    def get_grantees(self) -> Set[Tuple[str, str]]:
+        return set((p.group_or_user, p.luid) for p in self.current_perms_obj_list)
+
+    # The translation table (see TableauServerRest.query_grantee_translation_table()) to use for replicating from
+    # orig_site, if one wasn't passed in
+    def _get_translation_table(self, orig_site: 'TableauServerRest',
+                               translation_table: Optional[Dict[Tuple[str, str], Optional[str]]] = None,
+                               username_map: Optional[Dict[str, str]] = None) -> Dict[Tuple[str, str], Optional[str]]:
+        if translation_table is None:
+            translation_table = self.t_rest_api.query_grantee_translation_table(orig_site, username_map=username_map)
+        return translation_table
+
+    @staticmethod
+    def _is_same_site(site_a: 'TableauServerRest', site_b: 'TableauServerRest') -> bool:
+        return site_a.site_content_url == site_b.site_content_url and site_a.server == site_b.server
+
+    # Converts the permissions from orig_site to the matching users and groups on the current site. Use case is
+    # replicating settings from one site to another. Each grantee is translated through the translation_table, which
+    # is looked up from both sites if not given. Pass in the same one (e.g. from plan_permissions_replication())
+    # when converting many lists. Grantees with no match on the current site are left out
+    def convert_permissions_obj_list_from_orig_site_to_current_site(
+            self, permissions_obj_list: List['Permissions'], orig_site: 'TableauServerRest',
+            translation_table: Optional[Dict[Tuple[str, str], Optional[str]]] = None) -> List['Permissions']:
         # If the site is the same, skip the whole thing and just return the original
-        if self.t_rest_api.site_content_url == orig_site.site_content_url \
-                and self.t_rest_api.server == orig_site.server:
+        if self._is_same_site(self.t_rest_api, orig_site):
             return permissions_obj_list
+        translation_table = self._get_translation_table(orig_site, translation_table)
 
-        new_perms_obj_list = copy.deepcopy(permissions_obj_list)
         final_perms_obj_list = []
-        # Make this more efficient -- should only look up those users it needs to. Question on algorithm for speed
-
-        for perms_obj in new_perms_obj_list:
-            orig_luid = perms_obj.luid
-            if perms_obj.group_or_user == 'group':
-                # Find the name that matches the LUID
-                try:
-                    orig_name = orig_site.query_group_name(orig_luid)
-                    self.log('Found orig luid {} for name {}'.format(orig_luid, orig_name ))
-                    n_luid = self.t_rest_api.query_group_luid(orig_name)
-                    self.log('Found new luid {} for name {}'.format(n_luid, orig_name ))
-                except StopIteration:
-                    self.log("No matching name for luid {} found on the original site, dropping from list".format(
-                        orig_luid))
-
-            elif perms_obj.group_or_user == 'user':
-                # Find the name that matches the LUID
-                try:
-                    # Individual searches here. Efficient in versions with lookup
-                    orig_user = orig_site.query_user(orig_luid)
-                    orig_username = orig_user.get('name')
-                    n_luid = self.t_rest_api.query_user_luid(orig_username)
-                except NoMatchFoundException:
-                    self.log("No matching name for luid {} found on the original site, dropping from list".format(
-                        orig_luid))
-            perms_obj.luid = n_luid
-            final_perms_obj_list.append(copy.deepcopy(perms_obj))
+        for perms_obj in permissions_obj_list:
+            n_luid = translation_table.get((perms_obj.group_or_user, perms_obj.luid))
+            if n_luid is None:
+                self.log("No matching {} for luid {} found on this site, dropping from list".format(
+                    perms_obj.group_or_user, perms_obj.luid))
+                continue
+            # Permissions objects are a few strings and ints, so a shallow copy is a complete one
+            new_perms_obj = copy.copy(perms_obj)
+            new_perms_obj.luid = n_luid
+            final_perms_obj_list.append(new_perms_obj)
         return final_perms_obj_list
 
-    # Runs through the gcap object list, and tries to do a conversion all principals to matching LUIDs on current site
-    # Use case is replicating settings from one site to another
-    # Orig_site must be TableauRestApiConnection
-    # Not Finished
-    def convert_permissions_xml_object_from_orig_site_to_current_site(self, permissions_xml_request, orig_site,
-                                                                      username_map=None):
-        """
-        :type permissions_xml_request: ET.Element
-        :type orig_site: TableauRestApiConnection
-        :type username_map: dict[unicode, unicode]
-        :rtype: ET.Element
-        """
+    # Same as above, but rewrites the user and group LUIDs in a permissions request (from
+    # build_request_from_response()) in place. Grantees with no match on the current site are removed.
+    # username_map { orig_username : username on this site } is only used if translation_table isn't given
+    def convert_permissions_xml_object_from_orig_site_to_current_site(
+            self, permissions_xml_request: ET.Element, orig_site: 'TableauServerRest',
+            username_map: Optional[Dict[str, str]] = None,
+            translation_table: Optional[Dict[Tuple[str, str], Optional[str]]] = None) -> ET.Element:
         # If the site is the same, skip the whole thing and just return the original
-        if self.t_rest_api.site_content_url == orig_site.site_content_url \
-                and self.t_rest_api.server == orig_site.server:
+        if self._is_same_site(self.t_rest_api, orig_site):
             return permissions_xml_request
-
-        # new_perms_obj_list = permissions_xml_request
-        final_perms_obj_list = []
-        # Make this more efficient -- should only look up those users it needs to. Question on algorithm for speed
+        translation_table = self._get_translation_table(orig_site, translation_table, username_map=username_map)
 
         # Must loop two levels deep
         for permissions_element in permissions_xml_request:
-            for grantee_capabilities in permissions_element:
-                # Handle groups first
-                for group in grantee_capabilities.iter('group'):
-
-                    orig_luid = group.get('id')
-                    # Find the name that matches the LUID
-                    try:
-                        orig_name = orig_site.query_group_name(orig_luid)
-                        self.log('Found orig luid {} for name {}'.format(orig_luid, orig_name ))
-                        n_luid = self.t_rest_api.query_group_luid(orig_name)
-                        self.log('Found new luid {} for name {}'.format(n_luid, orig_name ))
-                        # Update the attribute for the new site
-                        group.set('id', n_luid)
-                    except StopIteration:
-                        self.log("No matching name for luid {} found on the original site, dropping from list".format(
-                            orig_luid))
-                        # Here, do we remove a group that doesn't exist on the new site? Or just raise that exception?
-                        # Going with remove for now, to make things more smooth
-                        permissions_element.remove(grantee_capabilities)
-
-                # This works if you anticipate that users will have the same name. Should add an optional dictionary for
-                # translating
-                for user in grantee_capabilities.iter('user'):
-                    orig_luid = user.get('id')
-                    # Find the name that matches the LUID
-                    try:
-                        # Individual searches here. Efficient in versions with lookup
-                        orig_user = orig_site.query_user(orig_luid)
-                        orig_username = orig_user.get('name')
-                        final_username = orig_username
-                        if username_map is not None:
-                            if orig_username in username_map:
-                                final_username = username_map[orig_username]
-                            else:
-                                self.log("No matching name in the username_map found for original_name '{}' found , dropping from list".format(
-                                        orig_username))
-                                permissions_element.remove(grantee_capabilities)
-                        else:
-                            final_username = orig_username
-                        n_luid = self.t_rest_api.query_user_luid(final_username)
-                        user.set('id', n_luid)
-                    except NoMatchFoundException:
-                        self.log("No matching name for luid {} found on the original site, dropping from list".format(
-                            orig_luid))
+            for grantee_capabilities in list(permissions_element):
+                for grantee in grantee_capabilities:
+                    if grantee.tag not in ['group', 'user']:
+                        continue
+                    n_luid = translation_table.get((grantee.tag, grantee.get('id')))
+                    if n_luid is None:
+                        self.log("No matching {} for luid {} found on this site, dropping from list".format(
+                            grantee.tag, grantee.get('id')))
                         permissions_element.remove(grantee_capabilities)
+                    else:
+                        grantee.set('id', n_luid)
         return permissions_xml_request
 
-
-    def replicate_permissions(self, orig_content):
+    def replicate_permissions(self, orig_content: 'PublishedContent',
+                              translation_table: Optional[Dict[Tuple[str, str], Optional[str]]] = None):
         self.start_log_block()
         self.clear_all_permissions()
 
         # Self Permissions
         o_perms_obj_list = orig_content.current_perms_obj_list
-        n_perms_obj_list = self.convert_permissions_obj_list_from_orig_site_to_current_site(o_perms_obj_list,
-                                                                                            orig_content.t_rest_api)
+        n_perms_obj_list = self.convert_permissions_obj_list_from_orig_site_to_current_site(
+            o_perms_obj_list, orig_content.t_rest_api, translation_table=translation_table)
         self.set_permissions_by_permissions_obj_list(n_perms_obj_list)
         self.end_log_block()
 
@@ -253,12 +210,9 @@ class PublishedContent(LoggingMethods):
                 p.remove(proj_element)
         return tsr
 
-    def replicate_permissions_direct_xml(self, orig_content, username_map=None):
-        """
-        :type orig_content: PublishedContent
-        :type username_map: dict[unicode, unicode]
-        :return:
-        """
+    def replicate_permissions_direct_xml(self, orig_content: 'PublishedContent',
+                                         username_map: Optional[Dict[str, str]] = None,
+                                         translation_table: Optional[Dict[Tuple[str, str], Optional[str]]] = None):
         self.start_log_block()
 
         self.clear_all_permissions()
@@ -271,62 +225,28 @@ class PublishedContent(LoggingMethods):
 
         # Now convert over all groups and users
         self.convert_permissions_xml_object_from_orig_site_to_current_site(perms_tsr, orig_content.t_rest_api,
-                                                                           username_map=username_map)
+                                                                           username_map=username_map,
+                                                                           translation_table=translation_table)
         self.set_permissions_by_permissions_direct_xml(perms_tsr)
         self.end_log_block()
 
-    # Polyfill for removed cmp in Python3  https://portingguide.readthedocs.io/en/latest/comparisons.html
+    # Determine if capabilities are already set identically (or identically enough) to skip. Each object is compared
+    # by its grantee and its capability bitmasks, rather than capability by capability
     @staticmethod
-    def _cmp(x, y):
-        """
-        Replacement for built-in function cmp that was removed in Python 3
-
-        Compare the two objects x and y and return an integer according to
-        the outcome. The return value is negative if x < y, zero if x == y
-        and strictly positive if x > y.
-        """
-
-        return (x > y) - (x < y)
-
-    # Determine if capabilities are already set identically (or identically enough) to skip
-    def are_capabilities_obj_lists_identical(self, new_obj_list: List['Permissions'],
+    def are_capabilities_obj_lists_identical(new_obj_list: List['Permissions'],
                                              dest_obj_list: List['Permissions']) -> bool:
-        # Grab the LUIDs of each, determine if they match in the first place
-
-        # Create a dict with the LUID as the keys for sorting and comparison
-        new_obj_dict = {}
-        for obj in new_obj_list:
-            new_obj_dict[obj.luid] = obj
-
-        dest_obj_dict = {}
-        for obj in dest_obj_list:
-            dest_obj_dict[obj.luid] = obj
-            # If lengths don't match, they must differ
-            if len(new_obj_dict) != len(dest_obj_dict):
+        if len(new_obj_list) != len(dest_obj_list):
+            return False
+        dest_obj_dict = {(obj.group_or_user, obj.luid): obj for obj in dest_obj_list}
+        for new_obj in new_obj_list:
+            dest_obj = dest_obj_dict.get((new_obj.group_or_user, new_obj.luid))
+            if dest_obj is None or not new_obj.has_same_capabilities(dest_obj):
                 return False
-            else:
-                # If LUIDs don't match, they must differ
-                new_obj_luids = list(new_obj_dict.keys())
-                dest_obj_luids = list(dest_obj_dict.keys())
-                new_obj_luids.sort()
-                dest_obj_luids.sort()
-                if self._cmp(new_obj_luids, dest_obj_luids) != 0:
-                    return False
-                for luid in new_obj_luids:
-                    new_obj = new_obj_dict.get(luid)
-                    dest_obj = dest_obj_dict.get(luid)
-                    return self.are_capabilities_obj_dicts_identical(new_obj.get_capabilities_dict(),
-                                                                     dest_obj.get_capabilities_dict())
+        return True
 
     @staticmethod
-    def are_capabilities_obj_dicts_identical(new_obj_dict: Dict, dest_obj_dict: Dict) -> bool:
-        if new_obj_dict.keys() == dest_obj_dict.keys():
-            for k in new_obj_dict:
-                if new_obj_dict[k] != dest_obj_dict[k]:
-                    return False
-            return True
-        else:
-            return False
+    def are_capabilities_obj_dicts_identical(new_obj_dict: Mapping, dest_obj_dict: Mapping) -> bool:
+        return dict(new_obj_dict) == dict(dest_obj_dict)
 
     # Dict { capability_name : mode } into XML with checks for validity. Set type to 'workbook' or 'datasource'
     def build_capabilities_xml_from_dict(self, capabilities_dict: Dict, obj_type: str) -> ET.Element:
@@ -421,104 +341,155 @@ class PublishedContent(LoggingMethods):
 
     # Shorter, cleaner code. Use in the future
     def set_permissions(self, permissions: Optional[List['Permissions']] = None,
-                        direct_xml_request: Optional[ET.Element] = None):
+                        direct_xml_request: Optional[ET.Element] = None, max_concurrent_requests: int = 4):
         if permissions is not None and direct_xml_request is not None:
             raise InvalidOptionException('Please only send one of the two arguments at a time')
         if permissions is not None:
-            self.set_permissions_by_permissions_obj_list(new_permissions_obj_list=permissions)
+            self.set_permissions_by_permissions_obj_list(new_permissions_obj_list=permissions,
+                                                         max_concurrent_requests=max_concurrent_requests)
         elif direct_xml_request is not None:
             self.set_permissions_by_permissions_direct_xml(direct_xml_request=direct_xml_request)
         else:
             raise InvalidOptionException('Please send in at least one argument')
 
-    def set_permissions_by_permissions_obj_list(self, new_permissions_obj_list):
-        """
-        :type new_permissions_obj_list: list[Permissions]
-        """
+    # Capabilities that are never sent, because they are read-only or not a real capability
+    _unsendable_capabilities = ('all', 'InheritedProjectLeader')
+
+    # { (group_or_user, luid, capability) : mode } for every capability that is set to Allow or Deny
+    def _index_capabilities(self, permissions_obj_list: List['Permissions']) -> Dict[Tuple[str, str, str], str]:
+        index = {}
+        for permissions_obj in permissions_obj_list:
+            caps = permissions_obj.get_capabilities_dict()
+            for cap in caps:
+                if caps[cap] is not None and cap not in self._unsendable_capabilities:
+                    index[(permissions_obj.group_or_user, permissions_obj.luid, cap)] = caps[cap]
+        return index
+
+    # Compares the new permissions with the current ones, grantee by grantee and capability by capability. Each
+    # grantee in the new list ends up with exactly the capabilities given for it; grantees not in the list are left
+    # alone. Returns the (group_or_user, luid, capability, mode) of each existing capability that has to be deleted
+    # first, and { (group_or_user, luid) : { capability : mode } } of the capabilities to add
+    def _diff_permissions(self, new_permissions_obj_list: List['Permissions']
+                          ) -> Tuple[List[Tuple[str, str, str, str]], Dict[Tuple[str, str], Dict[str, str]]]:
+        # Grantees that already have exactly these capabilities are skipped with one comparison of their bitmasks
+        current_by_grantee = {(p.group_or_user, p.luid): p for p in self.current_perms_obj_list}
+        changed_obj_list = []
+        for new_permissions_obj in new_permissions_obj_list:
+            current_obj = current_by_grantee.get((new_permissions_obj.group_or_user, new_permissions_obj.luid))
+            if current_obj is None or not current_obj.has_same_capabilities(new_permissions_obj):
+                changed_obj_list.append(new_permissions_obj)
+        grantees = set((p.group_or_user, p.luid) for p in changed_obj_list)
+        current = self._index_capabilities([p for p in self.current_perms_obj_list
+                                            if (p.group_or_user, p.luid) in grantees])
+        desired = self._index_capabilities(changed_obj_list)
+
+        deletes = []
+        for key in current:
+            if (key[0], key[1]) in grantees and desired.get(key) != current[key]:
+                deletes.append((key[0], key[1], key[2], current[key]))
+        adds = {}
+        for key in desired:
+            if current.get(key) != desired[key]:
+                adds.setdefault((key[0], key[1]), {})[key[2]] = desired[key]
+        return deletes, adds
+
+    def _build_add_permissions_request_for_grantees(self, adds: Dict[Tuple[str, str], Dict[str, str]]) -> ET.Element:
+        tsr = ET.Element('tsRequest')
+        p = ET.Element('permissions')
+        for group_or_user, luid in adds:
+            c = self.build_capabilities_xml_from_dict(adds[(group_or_user, luid)], self.obj_type)
+            gcap = ET.Element('granteeCapabilities')
+            t = ET.Element(group_or_user)
+            t.set('id', luid)
+            gcap.append(t)
+            gcap.append(c)
+            p.append(gcap)
+        tsr.append(p)
+        return tsr
+
+    def _permissions_url(self) -> str:
+        if self.default is True:
+            return self.t_rest_api.build_api_url("projects/{}/default-permissions/{}s".format(self.luid,
+                                                                                            self.obj_type))
+        return self.t_rest_api.build_api_url("{}s/{}/permissions".format(self.obj_type, self.luid))
+
+    # Sends a DELETE for each (group_or_user, luid, capability, mode), max_concurrent_requests at a time. A capability
+    # that is already gone (404) counts as deleted. Every delete is tried, then returns the (capability, exception)
+    # of each one that failed
+    def _send_permission_deletes(self, deletes: List[Tuple[str, str, str, str]],
+                                 max_concurrent_requests: int = 4) -> List[Tuple[Tuple[str, str, str, str], Exception]]:
+        def delete(capability: Tuple[str, str, str, str]) -> Optional[Tuple[Tuple[str, str, str, str], Exception]]:
+            group_or_user, luid, cap, mode = capability
+            url = self._permissions_url() + "/{}s/{}/{}/{}".format(group_or_user, luid, cap, mode)
+            try:
+                self.t_rest_api.send_delete_request(url, raise_exceptions=True)
+            except RecoverableHTTPException as e:
+                if e.http_code == 404:
+                    return None
+                self.log('Deleting {} {} from {} {} failed: {}'.format(mode, cap, group_or_user, luid, e))
+                return capability, e
+            except Exception as e:
+                self.log('Deleting {} {} from {} {} failed: {}'.format(mode, cap, group_or_user, luid, e))
+                return capability, e
+            return None
+
+        results = self.t_rest_api._run_in_parallel(delete, deletes, max_concurrent_requests=max_concurrent_requests)
+        return [failure for failure in results if failure is not None]
+
+    @staticmethod
+    def _raise_delete_failures(failures: List[Tuple[Tuple[str, str, str, str], Exception]], total: int):
+        if len(failures) > 0:
+            raise PermissionsChangeFailedException('{} of {} permission deletes failed'.format(len(failures), total),
+                                                   failures)
+
+    # Only the capabilities that differ are changed: the ones that need to go are deleted (max_concurrent_requests at
+    # a time), then everything that needs adding is sent in one request for all of the grantees. Raises
+    # PermissionsChangeFailedException if any of the deletes fail
+    def set_permissions_by_permissions_obj_list(self, new_permissions_obj_list: List['Permissions'],
+                                                max_concurrent_requests: int = 4):
         self.start_log_block()
 
         self.log("Permissions object list has {} items:".format(len(new_permissions_obj_list)))
-        for new_permissions_obj in new_permissions_obj_list:
-            for cur_obj in self.current_perms_obj_list:
-                # Check if there are any existing capabilities on the object
-                if cur_obj.luid == new_permissions_obj.luid:
-                    # Find if anything is set already, add to deletion queue
-                    are_identical = self.are_capabilities_obj_dicts_identical(
-                        cur_obj.get_capabilities_dict(), new_permissions_obj.get_capabilities_dict()
-                    )
-                    self.log("Existing permissions found for luid {}. Are they the same? {}".format(cur_obj.luid,
-                                                                                                         str(are_identical)))
-                    # Delete all existing permissions
-                    if are_identical is False:
-                        self.log("Removing existing permissions for luid {}".format(cur_obj.luid))
-                        self.delete_permissions_by_permissions_obj_list([cur_obj, ])
-
-                    if are_identical is True:
-                        self.log('No changes necessary, skipping update for quicker performance')
-                        # self.end_log_block()
-                        continue
-            # Check if all capabilities are set to Unspecified, and ignore
-            specified_cap_count = 0
-            caps = new_permissions_obj.get_capabilities_dict()
-            self.log("New permissions to be set:")
-            self.log(str(caps))
-            for cap in caps:
-                if caps[cap] is not None:
-                    specified_cap_count += 1
-            if specified_cap_count > 0:
-                self.log("Adding permissions")
-                tsr = self._build_add_permissions_request(new_permissions_obj)
-                url = None
-                if self.default is False:
-                    url = self.t_rest_api.build_api_url("{}s/{}/permissions".format(self.obj_type, self.luid))
-                if self.default is True:
-                    url = self.t_rest_api.build_api_url(
-                        "projects/{}/default-permissions/{}s".format(self.luid, self.obj_type))
-                new_perms_xml = self.t_rest_api.send_update_request(url, tsr)
-
-                # Update the internal representation from the newly returned permissions XML
-                self.get_permissions_from_server(new_perms_xml)
-            else:
-                self.get_permissions_from_server()
-        self.end_log_block()
+        deletes, adds = self._diff_permissions(new_permissions_obj_list)
+        if len(deletes) == 0 and len(adds) == 0:
+            self.log('No changes necessary, skipping update for quicker performance')
+            self.end_log_block()
+            return
+        self.log('Deleting {} capabilities and adding {} for {} grantees'.format(
+            len(deletes), sum(len(caps) for caps in adds.values()), len(adds)))
+        failures = self._send_permission_deletes(deletes, max_concurrent_requests=max_concurrent_requests)
+        # If any deletes failed, the adds aren't sent. Either way the permissions are read back from the server
+        # afterward, so current_perms_obj_list is what the server actually has, not what was asked for
+        try:
+            self._raise_delete_failures(failures, len(deletes))
+            if len(adds) > 0:
+                tsr = self._build_add_permissions_request_for_grantees(adds)
+                self.t_rest_api.send_update_request(self._permissions_url(), tsr)
+        finally:
+            self.get_permissions_from_server()
+            self.end_log_block()
 
     # Cleaner code for the future
-    def delete_permissions(self, permissions: List['Permissions']):
-        self.delete_permissions_by_permissions_obj_list(permissions_obj_list=permissions)
+    def delete_permissions(self, permissions: List['Permissions'], max_concurrent_requests: int = 4):
+        self.delete_permissions_by_permissions_obj_list(permissions_obj_list=permissions,
+                                                        max_concurrent_requests=max_concurrent_requests)
 
     # Legacy longer way to call
-    def delete_permissions_by_permissions_obj_list(self, permissions_obj_list: List['Permissions']):
+    def delete_permissions_by_permissions_obj_list(self, permissions_obj_list: List['Permissions'],
+                                                   max_concurrent_requests: int = 4):
         self.start_log_block()
         for permissions_obj in permissions_obj_list:
-            obj_luid = permissions_obj.luid
-            group_or_user = permissions_obj.group_or_user
             # Only work if permissions object matches the ContentType
             if permissions_obj.get_content_type() != self.obj_type:
                 raise InvalidOptionException("Trying to set permission for a {} using a {} Permissions object".format(
                     self.obj_type, permissions_obj.get_content_type()
                 ))
-            self.log('Deleting for object LUID {}'.format(self.luid))
-            permissions_dict = permissions_obj.get_capabilities_dict()
-            for cap in permissions_dict:
-                if self.default is True:
-                    api_url_start = "projects/{}/default-permissions/{}s/{}s/{}/{}/".format(self.luid, self.obj_type,
-                                                                                             group_or_user,
-                                                                                             obj_luid, cap)
-                else:
-                    api_url_start = "{}s/{}/permissions/{}s/{}/{}/".format(self.obj_type, self.luid, group_or_user,
-                                                                            obj_luid, cap)
-
-                if permissions_dict.get(cap) == 'Allow':
-                    # Delete Allow
-                    url = self.t_rest_api.build_api_url(api_url_start + 'Allow')
-                    self.t_rest_api.send_delete_request(url)
-                elif permissions_dict.get(cap) == 'Deny':
-                    # Delete Deny
-                    url = self.t_rest_api.build_api_url(api_url_start + 'Deny')
-                    self.t_rest_api.send_delete_request(url)
-                else:
-                    self.log('{} set to none, no action'.format(cap))
+        self.log('Deleting for object LUID {}'.format(self.luid))
+        deletes = [(key[0], key[1], key[2], mode) for key, mode in
+                   self._index_capabilities(permissions_obj_list).items()]
+        failures = self._send_permission_deletes(deletes, max_concurrent_requests=max_concurrent_requests)
         self.end_log_block()
+        self._raise_delete_failures(failures, len(deletes))
 
     def clear_all_permissions(self):
         self.start_log_block()
@@ -801,35 +772,50 @@ class Project(PublishedContent):
             #self.end_log_block()
             return obj_list
 
-    def replicate_permissions(self, orig_content: 'Project'):
+    def get_grantees(self) -> Set[Tuple[str, str]]:
+        grantees = PublishedContent.get_grantees(self)
+        grantees.update(self.workbook_defaults.get_grantees())
+        grantees.update(self.datasource_defaults.get_grantees())
+        return grantees
+
+    def replicate_permissions(self, orig_content: 'Project',
+                              translation_table: Optional[Dict[Tuple[str, str], Optional[str]]] = None):
         self.start_log_block()
 
         self.clear_all_permissions()
+        # One translation table for the project and both sets of defaults
+        if not self._is_same_site(self.t_rest_api, orig_content.t_rest_api):
+            translation_table = self._get_translation_table(orig_content.t_rest_api, translation_table)
 
         # Self Permissions
         o_perms_obj_list = orig_content.current_perms_obj_list
-        n_perms_obj_list = self.convert_permissions_obj_list_from_orig_site_to_current_site(o_perms_obj_list,
-                                                                                            orig_content.t_rest_api)
+        n_perms_obj_list = self.convert_permissions_obj_list_from_orig_site_to_current_site(
+            o_perms_obj_list, orig_content.t_rest_api, translation_table=translation_table)
         self.set_permissions_by_permissions_obj_list(n_perms_obj_list)
 
         # Workbook Defaults
         o_perms_obj_list = orig_content.workbook_defaults.current_perms_obj_list
         n_perms_obj_list = self.workbook_defaults.convert_permissions_obj_list_from_orig_site_to_current_site(
-            o_perms_obj_list, orig_content.t_rest_api)
+            o_perms_obj_list, orig_content.t_rest_api, translation_table=translation_table)
         self.workbook_defaults.set_permissions_by_permissions_obj_list(n_perms_obj_list)
 
         # Datasource Defaults
         o_perms_obj_list = orig_content.datasource_defaults.current_perms_obj_list
         n_perms_obj_list = self.datasource_defaults.convert_permissions_obj_list_from_orig_site_to_current_site(
-            o_perms_obj_list, orig_content.t_rest_api)
+            o_perms_obj_list, orig_content.t_rest_api, translation_table=translation_table)
         self.datasource_defaults.set_permissions_by_permissions_obj_list(n_perms_obj_list)
 
         self.end_log_block()
 
-    def replicate_permissions_direct_xml(self, orig_content: 'Project', username_map: Optional[Dict] = None):
+    def replicate_permissions_direct_xml(self, orig_content: 'Project', username_map: Optional[Dict] = None,
+                                         translation_table: Optional[Dict[Tuple[str, str], Optional[str]]] = None):
         self.start_log_block()
 
         self.clear_all_permissions()
+        # One translation table for the project and both sets of defaults
+        if not self._is_same_site(self.t_rest_api, orig_content.t_rest_api):
+            translation_table = self._get_translation_table(orig_content.t_rest_api, translation_table,
+                                                            username_map=username_map)
 
         # This is for the project Permissions. Handle defaults down below
 
@@ -839,7 +825,7 @@ class Project(PublishedContent):
 
         # Now convert over all groups and users
         self.convert_permissions_xml_object_from_orig_site_to_current_site(perms_tsr, orig_content.t_rest_api,
-                                                                           username_map=username_map)
+                                                                           translation_table=translation_table)
         self.set_permissions_by_permissions_direct_xml(perms_tsr)
 
         # Workbook Defaults
@@ -849,7 +835,7 @@ class Project(PublishedContent):
 
         # Now convert over all groups and users
         self.convert_permissions_xml_object_from_orig_site_to_current_site(perms_tsr, orig_content.t_rest_api,
-                                                                           username_map=username_map)
+                                                                           translation_table=translation_table)
         self.workbook_defaults.set_permissions_by_permissions_direct_xml(perms_tsr)
 
         # Datasource Defaults
@@ -859,7 +845,7 @@ class Project(PublishedContent):
 
         # Now convert over all groups and users
         self.convert_permissions_xml_object_from_orig_site_to_current_site(perms_tsr, orig_content.t_rest_api,
-                                                                           username_map=username_map)
+                                                                           translation_table=translation_table)
         self.datasource_defaults.set_permissions_by_permissions_direct_xml(perms_tsr)
 
         self.end_log_block()
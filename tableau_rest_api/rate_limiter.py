@@ -0,0 +1,99 @@
+import time
+import threading
+from typing import Optional
+
+import requests
+
+from ..tableau_exceptions import *
+
+
+# Client-side throttle for the requests sent to a Tableau Server. Used by RestXmlRequest and RestJsonRequest for
+# every request they send, including each retry. Attach the same RateLimiter to several connections (with
+# set_rate_limiter()) and all of them, on any number of threads, share the one limit.
+#
+# requests_per_second is a token bucket: tokens are added at that rate, up to burst of them, and each request takes
+# one, waiting until one is available. max_concurrent_requests limits how many requests can be in flight at once.
+# A streamed response (a download) counts as in flight until it is closed. Either limit can be None for no limit.
+#
+# The limit only applies within one Python process. Separate scripts need a share of the server's limit each
+class RateLimiter:
+    def __init__(self, requests_per_second: Optional[float] = None, burst: Optional[int] = None,
+                 max_concurrent_requests: Optional[int] = None):
+        if requests_per_second is not None and requests_per_second <= 0:
+            raise InvalidOptionException('requests_per_second must be greater than 0')
+        if burst is not None and burst < 1:
+            raise InvalidOptionException('burst must be 1 or greater')
+        if max_concurrent_requests is not None and max_concurrent_requests < 1:
+            raise InvalidOptionException('max_concurrent_requests must be 1 or greater')
+        self.requests_per_second = requests_per_second
+        # Defaults to one second's worth of requests
+        if burst is None:
+            burst = 1 if requests_per_second is None else max(1, int(requests_per_second))
+        self.burst = burst
+        self.max_concurrent_requests = max_concurrent_requests
+
+        self._condition = threading.Condition()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+        self.requests_sent = 0
+        self.seconds_waited = 0.0
+
+    def _refill(self, now: float):
+        if self.requests_per_second is not None:
+            self._tokens = min(float(self.burst),
+                               self._tokens + (now - self._last_refill) * self.requests_per_second)
+        self._last_refill = now
+
+    # Blocks until a request can be sent. Every acquire() must be followed by a release()
+    def acquire(self):
+        start_time = time.monotonic()
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.max_concurrent_requests is not None and self._in_flight >= self.max_concurrent_requests:
+                    # Woken up by release()
+                    wait = None
+                elif self.requests_per_second is not None and self._tokens < 1:
+                    wait = (1 - self._tokens) / self.requests_per_second
+                else:
+                    if self.requests_per_second is not None:
+                        self._tokens -= 1
+                    self._in_flight += 1
+                    self.requests_sent += 1
+                    self.seconds_waited += now - start_time
+                    return
+                self._condition.wait(wait)
+
+    def release(self):
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._condition.notify_all()
+
+    # A streamed response keeps its connection busy until it has been read, so the request stays in flight until
+    # the response is closed
+    def release_on_close(self, response: requests.Response):
+        close = response.close
+        released = []
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if not released:
+                    released.append(True)
+                    self.release()
+        response.close = close_and_release
+
+    @property
+    def in_flight(self) -> int:
+        with self._condition:
+            return self._in_flight
+
+    def __enter__(self) -> 'RateLimiter':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -4,15 +4,16 @@ import xml.etree.ElementTree as ET
 from io import BytesIO
 import re
 import math
-import copy
 import requests
 import sys
 import json
-from typing import Union, Any, Optional, List, Dict
+from typing import Union, Any, Optional, List, Dict, Tuple
 
 from tableau_tools.logging_methods import LoggingMethods
 from tableau_tools.logger import Logger
 from tableau_tools.tableau_exceptions import *
+from tableau_tools.tableau_rest_api.retry_policy import RetryPolicy
+from tableau_tools.tableau_rest_api.rate_limiter import RateLimiter
 
 # NOTE
 # JSON Requests are not implemented for anything besides GET requests at the moment
@@ -22,12 +23,16 @@ from tableau_tools.tableau_exceptions import *
 class RestJsonRequest(LoggingMethods):
     def __init__(self, url: Optional[str] = None, token: Optional[str] = None, logger: Optional[Logger] = None,
                  ns_map_url: str='http://tableau.com/api',
-                 verify_ssl_cert: bool = True):
+                 verify_ssl_cert: bool = True, session: Optional[requests.Session] = None,
+                 retry_policy: Optional[RetryPolicy] = None, rate_limiter: Optional[RateLimiter] = None,
+                 timeout: Optional[Union[float, Tuple[Optional[float], Optional[float]]]] = None):
         super(self.__class__, self).__init__()
 
-        # requests Session created to minimize connections
-        self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json', 'Accept': 'application/json'})
+        # requests Session created to minimize connections. Can be shared with other request objects, so the
+        # JSON and auth headers are sent with each request rather than set on the Session
+        if session is None:
+            session = requests.Session()
+        self.session = session
 
         self.__defined_response_types = ('xml', 'png', 'binary', 'json')
         self.__defined_http_verbs = ('post', 'get', 'put', 'delete')
@@ -52,6 +57,15 @@ class RestJsonRequest(LoggingMethods):
         self.__luid_pattern = r"[0-9a-fA-F]*-[0-9a-fA-F]*-[0-9a-fA-F]*-[0-9a-fA-F]*-[0-9a-fA-F]*"
         self.__verify_ssl_cert = verify_ssl_cert
 
+        # Decides which failed requests are sent again. None never retries
+        self.retry_policy: Optional[RetryPolicy] = retry_policy
+        # Throttles requests, possibly shared with other connections. None sends them straight away
+        self.rate_limiter: Optional[RateLimiter] = rate_limiter
+        # requests timeout, either seconds or (connect, read). None waits forever
+        self.timeout = timeout
+        # Size and timing of the last response, when the HttpTransport has collect_metrics=True
+        self.last_response_metrics: Optional[Dict] = None
+
         try:
             self.http_verb = 'get'
             self.set_response_type('json')
@@ -65,9 +79,6 @@ class RestJsonRequest(LoggingMethods):
     @token.setter
     def token(self, token):
         self._token = token
-        # Requests documentation says setting a dict value to None will remove it.
-        self.session.headers.update({'X-tableau-auth': token, 'Content-Type': 'application/json',
-                                     'Accept': 'application/json'})
 
     @property
     def json_request(self):
@@ -121,11 +132,49 @@ class RestJsonRequest(LoggingMethods):
 
     def get_response(self) -> Union[Dict, bytes]:
         if self.__response_type == 'json' and self.__json_object is not None:
-            self.log_debug("JSON Object Response: {}".format(json.dumps(self.__json_object)))
+            if self._debug_logging_enabled():
+                self.log_debug("JSON Object Response: {}".format(json.dumps(self.__json_object)))
             return self.__json_object
         else:
             return self.__raw_response
 
+    # Every request goes through here, so the retry policy and rate limiter apply to all of them. A request body that
+    # is read as it is sent (like a MultipartBody) is rewound before it is sent again. Each retry waits for the rate
+    # limiter like any other request
+    def _send(self, http_verb: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+
+        def send() -> requests.Response:
+            if self.rate_limiter is None:
+                return self.session.request(http_verb.upper(), url, verify=self.__verify_ssl_cert, **kwargs)
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.request(http_verb.upper(), url, verify=self.__verify_ssl_cert, **kwargs)
+            except Exception:
+                self.rate_limiter.release()
+                raise
+            if kwargs.get('stream') is True and response.status_code < 400:
+                self.rate_limiter.release_on_close(response)
+            else:
+                self.rate_limiter.release()
+            return response
+
+        if self.retry_policy is None:
+            response = send()
+        else:
+            rewind = None
+            if hasattr(kwargs.get('data'), 'seek'):
+                rewind = lambda: kwargs['data'].seek(0)
+            response = self.retry_policy.send(send, http_verb, url, log=self.log, rewind=rewind)
+
+        # Only there when the HttpTransport is collecting metrics
+        self.last_response_metrics = getattr(response, 'metrics', None)
+        if self.last_response_metrics is not None and self._debug_logging_enabled():
+            m = self.last_response_metrics
+            self.log_debug('Response: {} bytes over the network ({}), {} bytes decompressed in {:.4f} seconds'.format(
+                m['compressed_bytes'], m['content_encoding'], m['decompressed_bytes'], m['decode_seconds']))
+        return response
+
     # Larger requests require pagination (starting at 1), thus page_number argument can be called.
     def __make_request(self, page_number=1):
         url = self.url
@@ -138,7 +187,9 @@ class RestJsonRequest(LoggingMethods):
 
         self.__last_url_request = url
 
-        request_headers = {}
+        request_headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        if self._token is not None:
+            request_headers['X-tableau-auth'] = self._token
 
         if self.__publish is True:
             request_headers['Content-Type'] = 'multipart/mixed; boundary={}'.format(self.__boundary_string)
@@ -158,16 +209,10 @@ class RestJsonRequest(LoggingMethods):
         if self.__publish_content is not None:
             encoded_request = self.__publish_content
         try:
-            if self.http_verb == 'get':
-                response = self.session.get(url, headers=request_headers, verify=self.__verify_ssl_cert)
-            elif self.http_verb == 'delete':
-                response = self.session.delete(url, headers=request_headers, verify=self.__verify_ssl_cert)
-            elif self.http_verb == 'post':
-                response = self.session.post(url, data=encoded_request, headers=request_headers,
-                                             verify=self.__verify_ssl_cert)
-            elif self.http_verb == 'put':
-                response = self.session.put(url, data=encoded_request, headers=request_headers,
-                                            verify=self.__verify_ssl_cert)
+            if self.http_verb in ['get', 'delete']:
+                response = self._send(self.http_verb, url, headers=request_headers)
+            elif self.http_verb in ['post', 'put']:
+                response = self._send(self.http_verb, url, data=encoded_request, headers=request_headers)
             else:
                 raise InvalidOptionException('Must use one of the http verbs: get, post, put or delete')
             # To match previous exception handling pattern with urllib2
@@ -247,8 +292,9 @@ class RestJsonRequest(LoggingMethods):
             self.__make_request(page_number)
             full_json_obj = json.loads(self.__raw_response)
             self.__json_object = full_json_obj
-            self.log_debug("Logging the JSON object for page {}".format(page_number))
-            self.log_debug(json.dumps(self.__json_object))
+            if self._debug_logging_enabled():
+                self.log_debug("Logging the JSON object for page {}".format(page_number))
+                self.log_debug(json.dumps(self.__json_object))
             self.log("Request succeeded")
             return True
         else:
@@ -260,35 +306,50 @@ class RestJsonRequest(LoggingMethods):
                 full_json_obj = json.loads(self.__raw_response)
 
                 total_pages = 1
-                for level_1 in full_json_obj:
+                total_available = 0
+                if 'pagination' in full_json_obj:
+                    # page_number = int(pagination.get('pageNumber'))
+                    page_size = int(full_json_obj['pagination']['pageSize'])
+                    total_available = int(full_json_obj['pagination']['totalAvailable'])
+                    total_pages = int(math.ceil(float(total_available) / float(page_size)))
+                    self.log_debug('{} pages of content found'.format(total_pages))
 
+                for level_1 in full_json_obj:
                     if level_1 == 'pagination':
-
-                        # page_number = int(pagination.get('pageNumber'))
-                        page_size = int(full_json_obj['pagination']['pageSize'])
-                        total_available = int(full_json_obj['pagination']['totalAvailable'])
-                        total_pages = int(math.ceil(float(total_available) / float(page_size)))
-                        self.log_debug('{} pages of content found'.format(total_pages))
-                    else:
-                        combined_json_obj = copy.deepcopy(full_json_obj[level_1])
-                        if total_pages > 1:
-                            self.log_debug('Working on the pages')
-                            for i in range(2, total_pages + 1):
-                                self.log_debug('Starting on page {}'.format(i))
-                                self.__make_request(i)  # Get next page
-
-                                full_json_obj = json.loads(self.__raw_response)
-                                for l1 in full_json_obj:
-                                    if l1 != 'pagination':
-                                        for main_element in full_json_obj[l1]:
-                                            # One level in to get to the list
-                                            for list_element in full_json_obj[l1][main_element]:
-                                                for e in combined_json_obj:
-                                                    combined_json_obj[e].append(copy.deepcopy(list_element))
-
-                        self.__json_object = combined_json_obj
-                    self.log_debug("Logging the combined JSON object")
-                    self.log_debug(json.dumps(self.__json_object))
+                        continue
+                    # The first page's objects are used as they are. Each list (e.g. {'user': [...]}) is given room
+                    # for every item up front, and the items of later pages are moved into their slots, not copied
+                    combined_json_obj = full_json_obj[level_1]
+                    if total_pages > 1:
+                        self.log_debug('Working on the pages')
+                        filled = {}
+                        for main_element, first_page_list in combined_json_obj.items():
+                            merged_list = [None] * max(total_available, len(first_page_list))
+                            merged_list[:len(first_page_list)] = first_page_list
+                            combined_json_obj[main_element] = merged_list
+                            filled[main_element] = len(first_page_list)
+                        for i in range(2, total_pages + 1):
+                            self.log_debug('Starting on page {}'.format(i))
+                            self.__make_request(i)  # Get next page
+
+                            page_json_obj = json.loads(self.__raw_response)
+                            for l1 in page_json_obj:
+                                if l1 == 'pagination':
+                                    continue
+                                # One level in to get to the list
+                                for main_element, page_list in page_json_obj[l1].items():
+                                    merged_list = combined_json_obj.setdefault(main_element, [])
+                                    start = filled.get(main_element, len(merged_list))
+                                    merged_list[start:start + len(page_list)] = page_list
+                                    filled[main_element] = start + len(page_list)
+                        # Items may have been added or removed on the server while paging
+                        for main_element, count in filled.items():
+                            del combined_json_obj[main_element][count:]
+
+                    self.__json_object = combined_json_obj
+                    if self._debug_logging_enabled():
+                        self.log_debug("Logging the combined JSON object")
+                        self.log_debug(json.dumps(self.__json_object))
                     self.log("Request succeeded")
                 return True
             elif self.__response_type in ['binary', 'png', 'csv']:
@@ -4,25 +4,36 @@ import xml.etree.ElementTree as ET
 from io import BytesIO
 import re
 import math
-import copy
 import requests
 import sys
 import json
-from typing import Union, Any, Optional, List, Dict, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Any, Optional, List, Dict, Tuple, Iterator
 
 from ..logging_methods import LoggingMethods
 from ..tableau_exceptions import *
 from ..logger import Logger
+from .retry_policy import RetryPolicy
+from .rate_limiter import RateLimiter
+from .xml_response_parser import XmlResponseParser
 
 # Handles all of the actual HTTP calling
 class RestXmlRequest(LoggingMethods):
     def __init__(self, url: Optional[str] = None, token: Optional[str] = None, logger: Optional[Logger] = None,
                  ns_map_url: str ='http://tableau.com/api',
-                 verify_ssl_cert: bool = True):
+                 verify_ssl_cert: bool = True, concurrent_paging: bool = False,
+                 max_concurrent_page_requests: int = 4, session: Optional[requests.Session] = None,
+                 retry_policy: Optional[RetryPolicy] = None, rate_limiter: Optional[RateLimiter] = None,
+                 timeout: Optional[Union[float, Tuple[Optional[float], Optional[float]]]] = None,
+                 xml_parser: Optional[XmlResponseParser] = None):
         super(self.__class__, self).__init__()
 
-        # requests Session created to minimize connections
-        self.session = requests.Session()
+        # requests Session created to minimize connections. Passing in a Session lets many RestXmlRequest objects
+        # share one pool of connections; nothing specific to this object is stored on the Session itself
+        if session is None:
+            session = requests.Session()
+        self.session = session
 
         self.__defined_response_types = ('xml', 'png', 'binary', 'pdf')
         self.__defined_http_verbs = ('post', 'get', 'put', 'delete')
@@ -50,6 +61,24 @@ class RestXmlRequest(LoggingMethods):
         self.__last_response_content_type = None
         self.__verify_ssl_cert = verify_ssl_cert
 
+        # Pages 2..N of a paginated response can be requested in parallel, in a bounded pool of workers
+        self.concurrent_paging: bool = concurrent_paging
+        self.max_concurrent_page_requests: int = max_concurrent_page_requests
+
+        # Decides which failed requests are sent again. None never retries
+        self.retry_policy: Optional[RetryPolicy] = retry_policy
+        # Throttles requests, possibly shared with other connections. None sends them straight away
+        self.rate_limiter: Optional[RateLimiter] = rate_limiter
+        # requests timeout, either seconds or (connect, read). None waits forever
+        self.timeout = timeout
+        # Size and timing of the last response, when the HttpTransport has collect_metrics=True
+        self.last_response_metrics: Optional[Dict] = None
+        # Parses the XML responses
+        if xml_parser is None:
+            xml_parser = XmlResponseParser()
+        self.xml_parser: XmlResponseParser = xml_parser
+        self.__pagination_tag = '{' + ns_map_url + '}pagination'
+
         try:
             self.http_verb = 'get'
             self.set_response_type('xml')
@@ -62,9 +91,14 @@ class RestXmlRequest(LoggingMethods):
 
     @token.setter
     def token(self, token: str):
+        # Sent as a header on each request rather than set on the Session, which may be shared
         self._token = token
-        # Requests documentation says setting a dict value to None will remove it.
-        self.session.headers.update({'X-tableau-auth': token})
+
+    def __build_request_headers(self) -> Dict[str, str]:
+        request_headers = {}
+        if self._token is not None:
+            request_headers['X-tableau-auth'] = self._token
+        return request_headers
 
     @property
     def xml_request(self) -> ET.Element:
@@ -116,24 +150,68 @@ class RestXmlRequest(LoggingMethods):
 
     def get_response(self) -> Union[ET.Element, bytes]:
         if self.__response_type == 'xml' and self.__xml_object is not None:
-            self.log_debug("XML Object Response: {}".format(ET.tostring(self.__xml_object, encoding='utf-8').decode('utf-8')))
+            if self._debug_logging_enabled():
+                self.log_debug("XML Object Response: {}".format(ET.tostring(self.__xml_object,
+                                                                            encoding='utf-8').decode('utf-8')))
             return self.__xml_object
         else:
             return self.__raw_response
 
-    # Larger requests require pagination (starting at 1), thus page_number argument can be called.
-    def __make_request(self, page_number:int = 1):
-        url = self.url
+    def __build_page_url(self, page_number: int, url: Optional[str] = None) -> str:
+        if url is None:
+            url = self.url
         if page_number > 0:
             param_separator = '?'
             # If already a parameter, just append
             if '?' in url:
                 param_separator = '&'
             url += "{}pageNumber={}".format(param_separator, str(page_number))
+        return url
+
+    # Every request goes through here, so the retry policy and rate limiter apply to all of them. A request body that
+    # is read as it is sent (like a MultipartBody) is rewound before it is sent again. Each retry waits for the rate
+    # limiter like any other request
+    def _send(self, http_verb: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+
+        def send() -> requests.Response:
+            if self.rate_limiter is None:
+                return self.session.request(http_verb.upper(), url, verify=self.__verify_ssl_cert, **kwargs)
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.request(http_verb.upper(), url, verify=self.__verify_ssl_cert, **kwargs)
+            except Exception:
+                self.rate_limiter.release()
+                raise
+            if kwargs.get('stream') is True and response.status_code < 400:
+                self.rate_limiter.release_on_close(response)
+            else:
+                self.rate_limiter.release()
+            return response
+
+        if self.retry_policy is None:
+            response = send()
+        else:
+            rewind = None
+            if hasattr(kwargs.get('data'), 'seek'):
+                rewind = lambda: kwargs['data'].seek(0)
+            response = self.retry_policy.send(send, http_verb, url, log=self.log, rewind=rewind)
+
+        # Only there when the HttpTransport is collecting metrics
+        self.last_response_metrics = getattr(response, 'metrics', None)
+        if self.last_response_metrics is not None and self._debug_logging_enabled():
+            m = self.last_response_metrics
+            self.log_debug('Response: {} bytes over the network ({}), {} bytes decompressed in {:.4f} seconds'.format(
+                m['compressed_bytes'], m['content_encoding'], m['decompressed_bytes'], m['decode_seconds']))
+        return response
+
+    # Larger requests require pagination (starting at 1), thus page_number argument can be called.
+    def __make_request(self, page_number:int = 1):
+        url = self.__build_page_url(page_number)
 
         self.__last_url_request = url
 
-        request_headers = {}
+        request_headers = self.__build_request_headers()
 
         if self.__publish is True:
             request_headers['Content-Type'] = 'multipart/mixed; boundary={}'.format(self.__boundary_string)
@@ -151,16 +229,10 @@ class RestXmlRequest(LoggingMethods):
         if self.__publish_content is not None:
             encoded_request = self.__publish_content
         try:
-            if self.http_verb == 'get':
-                response = self.session.get(url, headers=request_headers, verify=self.__verify_ssl_cert)
-            elif self.http_verb == 'delete':
-                response = self.session.delete(url, headers=request_headers, verify=self.__verify_ssl_cert)
-            elif self.http_verb == 'post':
-                response = self.session.post(url, data=encoded_request, headers=request_headers,
-                                             verify=self.__verify_ssl_cert)
-            elif self.http_verb == 'put':
-                response = self.session.put(url, data=encoded_request, headers=request_headers,
-                                            verify=self.__verify_ssl_cert)
+            if self.http_verb in ['get', 'delete']:
+                response = self._send(self.http_verb, url, headers=request_headers)
+            elif self.http_verb in ['post', 'put']:
+                response = self._send(self.http_verb, url, data=encoded_request, headers=request_headers)
             else:
                 raise InvalidOptionException('Must use one of the http verbs: get, post, put or delete')
             # To match previous exception handling pattern with urllib2
@@ -193,6 +265,81 @@ class RestXmlRequest(LoggingMethods):
         except requests.exceptions.HTTPError as e:
             self._handle_http_error(e.response, e)
 
+    # Streaming GET for large binary content (workbook and datasource downloads). Returns the open requests Response
+    # so the body can be written out with iter_content() rather than read into memory; the caller must close() it.
+    # byte_offset asks for the remainder of a partial download with a Range header. The server only honored it if
+    # the status is 206 (Partial Content)
+    # With if_range (an ETag from an earlier response), the server only sends the range if the file hasn't changed
+    # since, otherwise it sends the whole file with a 200
+    def stream_from_api(self, byte_offset: int = 0, if_range: Optional[str] = None) -> requests.Response:
+        url = self.url
+        self.__last_url_request = url
+        request_headers = self.__build_request_headers()
+        if byte_offset > 0:
+            request_headers['Range'] = 'bytes={}-'.format(byte_offset)
+            if if_range is not None:
+                request_headers['If-Range'] = if_range
+        self.log_uri(verb='GET', uri=url)
+        try:
+            response = self._send('get', url, headers=request_headers, stream=True)
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            # Range Not Satisfiable, the partial file is no good so start again from the beginning
+            if e.response.status_code == 416 and byte_offset > 0:
+                self.log('Range request was not satisfiable, requesting the whole file')
+                return self.stream_from_api()
+            self._handle_http_error(e.response, e)
+        self.__last_response_content_type = response.headers.get('Content-Type')
+        self.log_debug("Content type from headers: {}".format(self.__last_response_content_type))
+        return response
+
+    # Only used for the pages of a paginated GET. Does not touch any of the per-response state of the object,
+    # so it can be run from multiple threads at once
+    def __request_page(self, page_number: int, url: str) -> bytes:
+        page_url = self.__build_page_url(page_number, url)
+        self.log_uri(verb='GET', uri=page_url)
+        try:
+            response = self._send('get', page_url, headers=self.__build_request_headers())
+            response.raise_for_status()
+            if self._response_logging_enabled():
+                self.log_xml_response(response.content.decode('utf-8'))
+            return response.content
+        except requests.exceptions.HTTPError as e:
+            self._handle_http_error(e.response, e)
+
+    # Generator of the raw responses for pages 2..total_pages, always in page order
+    def __request_remaining_pages(self, total_pages: int, url: str):
+        if self.concurrent_paging is True and self.max_concurrent_page_requests > 1 and total_pages > 2:
+            workers = min(self.max_concurrent_page_requests, total_pages - 1)
+            self.log('Requesting {} additional pages using {} concurrent requests'.format(total_pages - 1, workers))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Only a small window of pages is requested ahead of the one being consumed, so a slow consumer
+                # doesn't end up with every page of the response sitting in memory
+                pending = deque()
+                next_page = 2
+                while next_page <= total_pages or len(pending) > 0:
+                    while next_page <= total_pages and len(pending) < workers * 2:
+                        pending.append(executor.submit(self.__request_page, next_page, url))
+                        next_page += 1
+                    yield pending.popleft().result()
+        else:
+            for i in range(2, total_pages + 1):
+                yield self.__request_page(i, url)
+
+    @staticmethod
+    def __get_total_pages(pagination: ET.Element) -> int:
+        page_size = int(pagination.get('pageSize'))
+        total_available = int(pagination.get('totalAvailable'))
+        return int(math.ceil(float(total_available) / float(page_size)))
+
+    # The element holding the actual results (users, workbooks, etc.) sits alongside the pagination element
+    def __get_content_element(self, root: ET.Element) -> Optional[ET.Element]:
+        content_element = None
+        for obj in root:
+            if obj.tag != self.__pagination_tag:
+                content_element = obj
+        return content_element
+
     def _handle_http_error(self, response, e):
         status_code = response.status_code
         # No recovering from a 500 (although this can happen for other reasons, possible worth expanding)
@@ -248,11 +395,10 @@ class RestXmlRequest(LoggingMethods):
     def _set_raw_response(self, unicode_raw_response):
 
         self.__raw_response = unicode_raw_response
-        unicode_raw_response = unicode_raw_response.decode('utf-8')
 
         # Shows each individual request
-        if self.__response_type == 'xml':
-            self.log_xml_response(format(unicode_raw_response))
+        if self.__response_type == 'xml' and self._response_logging_enabled():
+            self.log_xml_response(unicode_raw_response.decode('utf-8'))
 
     # This has always brought back ALL listings from long paginated lists
     # But really should support three behaviors:
@@ -265,43 +411,59 @@ class RestXmlRequest(LoggingMethods):
         if self.__response_type == 'xml':
             if self.__raw_response == '' or self.__raw_response is None or len(self.__raw_response) == 0:
                 return True
-            utf8_parser = ET.XMLParser(encoding='UTF-8')
-            sio = BytesIO(self.__raw_response)
-            xml = ET.parse(sio, parser=utf8_parser)
+            root = self.xml_parser.parse(self.__raw_response)
             # Set the XML object to the first returned. Will be replaced if there is pagination
-            self.__xml_object = xml.getroot()
+            self.__xml_object = root
 
-            for pagination in xml.findall('.//t:pagination', namespaces=self.ns_map):
+            # pagination is always a direct child of tsResponse, so there's no need to search the whole tree
+            pagination = root.find('t:pagination', namespaces=self.ns_map)
+            if pagination is not None:
 
                 # page_number = int(pagination.get('pageNumber'))
-                page_size = int(pagination.get('pageSize'))
-                total_available = int(pagination.get('totalAvailable'))
-                total_pages = int(math.ceil(float(total_available) / float(page_size)))
+                total_pages = self.__get_total_pages(pagination)
 
-                full_xml_obj = None
-                for obj in xml.getroot():
-                    if obj.tag != 'pagination':
-                        full_xml_obj = obj
-                combined_xml_obj = copy.deepcopy(full_xml_obj)
+                # The first page's content element becomes the combined one. The elements of later pages are moved
+                # into it rather than copied; their own pages are thrown away once parsed
+                combined_xml_obj = self.__get_content_element(root)
 
                 if total_pages > 1:
-                    for i in range(2, total_pages + 1):
-
-                        self.__make_request(i)  # Get next page
-                        utf8_parser2 = ET.XMLParser(encoding='utf-8')
-                        xml = ET.parse(BytesIO(self.__raw_response), parser=utf8_parser2)
-                        for obj in xml.getroot():
-                            if obj.tag != 'pagination':
-                                full_xml_obj = obj
-                        # This is the actual element, now need to append a copy to the big one
-                        for e in full_xml_obj:
-                            combined_xml_obj.append(e)
+                    for page_response in self.__request_remaining_pages(total_pages, self.url):
+                        page_content = self.__get_content_element(self.xml_parser.parse(page_response))
+                        combined_xml_obj.extend(list(page_content))
 
                 self.__xml_object = combined_xml_obj
-                self.log_xml_response("Combined XML Response")
-                self.log_xml_response(ET.tostring(self.__xml_object, encoding='utf-8').decode('utf-8'))
+                if self._response_logging_enabled():
+                    self.log_xml_response("Combined XML Response")
+                    self.log_xml_response(ET.tostring(self.__xml_object, encoding='utf-8').decode('utf-8'))
                 # self.log("Request succeeded")
                 return True
         elif self.__response_type in ['binary', 'png', 'csv']:
             self.log('Non XML response')
-            return True
\ No newline at end of file
+            return True
+    # Streaming alternative to request_from_api() for GET requests. Rather than combining every page into one
+    # Element, yields the individual elements (each user, workbook, etc.) as each page arrives, so only one page
+    # (or a small window of pages with concurrent_paging) is held in memory at a time.
+    # The URL is captured when called, so the object can be reused for other requests while iterating
+    def iterate_from_api(self, url: Optional[str] = None) -> Iterator[ET.Element]:
+        if url is None:
+            url = self.url
+        return self.__iterate_pages(url)
+
+    def __iterate_pages(self, url: str) -> Iterator[ET.Element]:
+        first_page = self.__request_page(1, url)
+        if first_page is None or len(first_page) == 0:
+            return
+        total_pages = 1
+        for e in self.xml_parser.iter_page_elements(first_page, self.__pagination_tag):
+            if e.tag == self.__pagination_tag:
+                total_pages = self.__get_total_pages(e)
+            else:
+                yield e
+        # Release the first page before moving on
+        del first_page
+
+        if total_pages > 1:
+            for page_response in self.__request_remaining_pages(total_pages, url):
+                for e in self.xml_parser.iter_page_elements(page_response, self.__pagination_tag):
+                    if e.tag != self.__pagination_tag:
+                        yield e
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict
+
+import requests
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
+
+from ..tableau_exceptions import *
+
+
+# Appends a large file to a Tableau Server file upload session (fileUploads), for publishes above the single upload
+# limit. After each chunk is appended, the upload session and the number of chunks sent are saved to a small JSON
+# checkpoint file. If the process dies or a chunk keeps failing, running the same publish again picks up the upload
+# session from the checkpoint and carries on from the next chunk, rather than sending the whole file again.
+#
+# Appending a chunk isn't idempotent: if the server got a chunk but the response was lost, sending it again would
+# add it to the upload twice. So a chunk is only retried on its own when it can't have reached the server (the
+# connection couldn't be made), waiting backoff_seconds, then twice that and so on (up to max_backoff_seconds, with
+# some random jitter), up to max_retries times. If the server might have appended it (a read timeout, a dropped
+# connection or an HTTP 5xx), the upload session can't be trusted any more, so a new one is started and the file is
+# sent again from the beginning, up to max_retries times. The REST API appends chunks to the end of the upload in
+# the order they arrive, so they are always sent one at a time. Instead, the next read_ahead_chunks chunks are read
+# from disk in a background thread while the current one is being sent. With read_ahead_chunks=0 each chunk is
+# streamed from disk as it is sent instead.
+#
+# The checkpoint goes next to the file being uploaded, or into checkpoint_directory. It is only used again if the
+# file still has the same size and modified time, and is for the same server, site and chunk size
+class ResumableUpload:
+    def __init__(self, rest_api_base, content_filename: str, chunk_size: int, upload_filename: Optional[str] = None,
+                 checkpoint_directory: Optional[str] = None, max_retries: int = 5, backoff_seconds: float = 2.0,
+                 max_backoff_seconds: float = 60.0, read_ahead_chunks: int = 2):
+        if chunk_size < 1:
+            raise InvalidOptionException('chunk_size must be 1 or greater')
+        if max_retries < 0:
+            raise InvalidOptionException('max_retries must be 0 or greater')
+        if read_ahead_chunks < 0:
+            raise InvalidOptionException('read_ahead_chunks must be 0 or greater')
+        self.rest = rest_api_base
+        self.content_filename = content_filename
+        # The filename sent in the multipart request
+        self.upload_filename = upload_filename if upload_filename is not None else content_filename
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.read_ahead_chunks = read_ahead_chunks
+
+        self.file_size = os.path.getsize(content_filename)
+        self.total_chunks = max(1, -(-self.file_size // chunk_size))
+        if checkpoint_directory is None:
+            checkpoint_directory = os.path.dirname(os.path.abspath(content_filename))
+        self.checkpoint_filename = os.path.join(checkpoint_directory,
+                                                '{}.upload_checkpoint.json'.format(os.path.basename(content_filename)))
+        self.upload_session_id: Optional[str] = None
+        self.chunks_appended = 0
+        # The chunk being sent. If the process dies while one is, nobody knows whether it was appended
+        self.chunk_in_flight: Optional[int] = None
+
+    def _checkpoint_identity(self) -> Dict:
+        return {'server': self.rest.server, 'site_luid': self.rest.site_luid,
+                'content_filename': os.path.abspath(self.content_filename), 'file_size': self.file_size,
+                'file_mtime': os.path.getmtime(self.content_filename), 'chunk_size': self.chunk_size}
+
+    def _load_checkpoint(self) -> bool:
+        try:
+            with open(self.checkpoint_filename, 'r') as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except (IOError, ValueError):
+            return False
+        identity = self._checkpoint_identity()
+        for key in identity:
+            if checkpoint.get(key) != identity[key]:
+                self.rest.log('Upload checkpoint {} is for a different file or site, ignoring it'.format(
+                    self.checkpoint_filename))
+                return False
+        if checkpoint.get('chunk_in_flight') is not None:
+            self.rest.log('Upload checkpoint {} was saved while chunk {} was being sent, which may or may not have '
+                          'been appended. Starting a new upload'.format(self.checkpoint_filename,
+                                                                        checkpoint['chunk_in_flight'] + 1))
+            return False
+        self.upload_session_id = checkpoint['upload_session_id']
+        self.chunks_appended = checkpoint['chunks_appended']
+        return True
+
+    def _save_checkpoint(self):
+        checkpoint = self._checkpoint_identity()
+        checkpoint['upload_session_id'] = self.upload_session_id
+        checkpoint['chunks_appended'] = self.chunks_appended
+        checkpoint['chunk_in_flight'] = self.chunk_in_flight
+        checkpoint['total_chunks'] = self.total_chunks
+        temp_filename = self.checkpoint_filename + '.tmp'
+        # The upload can still go ahead if the checkpoint can't be written, it just can't be resumed
+        try:
+            with open(temp_filename, 'w') as checkpoint_file:
+                json.dump(checkpoint, checkpoint_file)
+            os.replace(temp_filename, self.checkpoint_filename)
+        except IOError as e:
+            self.rest.log('Could not write upload checkpoint {}: {}'.format(self.checkpoint_filename, e))
+
+    # Call once the publish using the upload session has succeeded, as the session can't be used again
+    def remove_checkpoint(self):
+        if os.path.exists(self.checkpoint_filename):
+            os.remove(self.checkpoint_filename)
+
+    def _read_chunk(self, chunk_number: int) -> bytes:
+        with open(self.content_filename, 'rb') as content_file:
+            content_file.seek(chunk_number * self.chunk_size)
+            return content_file.read(self.chunk_size)
+
+    def _chunk_length(self, chunk_number: int) -> int:
+        return min(self.chunk_size, self.file_size - chunk_number * self.chunk_size)
+
+    # True if the request failed before anything was sent to the server, so the chunk can safely be sent again
+    @staticmethod
+    def _is_retryable(e: Exception) -> bool:
+        if isinstance(e, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(e, requests.exceptions.ConnectionError) and len(e.args) > 0:
+            # requests wraps the urllib3 error, usually inside a MaxRetryError
+            reason = getattr(e.args[0], 'reason', e.args[0])
+            return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+        return False
+
+    # True if the request failed in a way where the server may have appended the chunk anyway
+    @staticmethod
+    def _may_have_been_appended(e: Exception) -> bool:
+        if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+            return e.response.status_code >= 500
+        if isinstance(e, RecoverableHTTPException):
+            return int(e.http_code) >= 500
+        return False
+
+    def _wait_before_retry(self, attempt: int) -> float:
+        wait = min(self.max_backoff_seconds, self.backoff_seconds * (2 ** (attempt - 1)))
+        wait = wait * random.uniform(0.5, 1.0)
+        time.sleep(wait)
+        return wait
+
+    def _start_new_upload_session(self):
+        self.upload_session_id = self.rest.initiate_file_upload()
+        self.chunks_appended = 0
+        self.chunk_in_flight = None
+        self._save_checkpoint()
+
+    def _append_chunk(self, chunk_number: int, content: Optional[bytes]):
+        self.chunk_in_flight = chunk_number
+        self._save_checkpoint()
+        attempt = 0
+        while True:
+            try:
+                if content is None:
+                    self.rest._append_file_range_to_file_upload(self.upload_session_id, self.content_filename,
+                                                                chunk_number * self.chunk_size,
+                                                                self._chunk_length(chunk_number),
+                                                                self.upload_filename)
+                else:
+                    self.rest.append_to_file_upload(self.upload_session_id, content, self.upload_filename)
+                return
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    # Nothing reached the server, so the checkpoint can still be resumed from
+                    if self._is_retryable(e):
+                        self.chunk_in_flight = None
+                        self._save_checkpoint()
+                    raise
+                attempt += 1
+                self.rest.log('Chunk {} of upload session {} could not be sent ({}), retry {} of {}'.format(
+                    chunk_number + 1, self.upload_session_id, e, attempt, self.max_retries))
+                self._wait_before_retry(attempt)
+
+    # Sends every chunk not already appended, and returns the uploadSessionId to publish with
+    def upload(self) -> str:
+        self.rest.start_log_block()
+        if self._load_checkpoint() is True:
+            self.rest.log('Resuming upload session {} from chunk {} of {}'.format(
+                self.upload_session_id, self.chunks_appended + 1, self.total_chunks))
+        else:
+            self._start_new_upload_session()
+
+        restarts = 0
+        while True:
+            try:
+                self._send_chunks()
+                break
+            except Exception as e:
+                # An upload session from a checkpoint may have expired on the server. Start again with a new one
+                if isinstance(e, RecoverableHTTPException) and e.http_code == 404 and self.chunks_appended > 0:
+                    self.rest.log('Upload session {} no longer exists, starting a new upload'.format(
+                        self.upload_session_id))
+                elif restarts < self.max_retries and not self._is_retryable(e) and self._may_have_been_appended(e):
+                    restarts += 1
+                    self.rest.log('Chunk {} of upload session {} may or may not have been appended ({}), '
+                                  'starting a new upload, {} of {}'.format(self.chunks_appended + 1,
+                                                                           self.upload_session_id, e, restarts,
+                                                                           self.max_retries))
+                    self._wait_before_retry(restarts)
+                else:
+                    self.rest.end_log_block()
+                    raise
+                self._start_new_upload_session()
+        self.rest.end_log_block()
+        return self.upload_session_id
+
+    def _send_chunks(self):
+        start_chunk = self.chunks_appended
+        start_time = time.time()
+        if self.read_ahead_chunks == 0:
+            for chunk_number in range(start_chunk, self.total_chunks):
+                self._append_chunk(chunk_number, None)
+                self._chunk_sent(chunk_number)
+        else:
+            with ThreadPoolExecutor(max_workers=1) as reader:
+                pending = deque()
+                next_chunk = start_chunk
+                for chunk_number in range(start_chunk, self.total_chunks):
+                    while next_chunk < self.total_chunks and len(pending) <= self.read_ahead_chunks:
+                        pending.append(reader.submit(self._read_chunk, next_chunk))
+                        next_chunk += 1
+                    self._append_chunk(chunk_number, pending.popleft().result())
+                    self._chunk_sent(chunk_number)
+        seconds = time.time() - start_time
+        sent_bytes = self.file_size - min(self.file_size, start_chunk * self.chunk_size)
+        if seconds > 0:
+            self.rest.log('Uploaded {} bytes in {:.2f} seconds ({:.2f} MB/s)'.format(
+                sent_bytes, seconds, sent_bytes / (1024 * 1024) / seconds))
+
+    def _chunk_sent(self, chunk_number: int):
+        self.chunks_appended = chunk_number + 1
+        self.chunk_in_flight = None
+        self._save_checkpoint()
+        self.rest.log('Appended chunk {} of {} to upload session {}'.format(self.chunks_appended, self.total_chunks,
+                                                                            self.upload_session_id))
@@ -0,0 +1,173 @@
+import re
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional, List, Tuple, Callable, Iterable
+
+import requests
+
+from ..tableau_exceptions import *
+
+
+# Decides whether a failed HTTP request is sent again, and how long to wait first. Used by RestXmlRequest and
+# RestJsonRequest for every request they send. A request is retried when it gets one of the retry_statuses back
+# (429 Too Many Requests and the 5xx errors by default) or the connection fails or times out.
+#
+# Only idempotent requests are retried by default (GET, PUT and DELETE). POST can be added to retry_methods, or
+# allowed for particular endpoints with add_endpoint_override(). Appends to a file upload session are PUTs but not
+# idempotent, so they are never retried here; ResumableUpload handles those.
+#
+# The wait doubles with each retry, starting from backoff_seconds up to max_backoff_seconds, with random jitter so
+# many clients don't all come back at once. A Retry-After header from the server is honored if it is longer,
+# up to max_retry_after_seconds.
+#
+# The retry budget stops retries from piling more load onto a server that is already failing. Each retry spends a
+# token, and each new request earns back retry_budget_ratio of one. There are never more than retry_budget_burst
+# tokens. Once they run out, failures are raised straight away until enough requests have gone through. Set
+# retry_budget_ratio to None for no budget. A RetryPolicy can be shared by any number of connections and threads,
+# and then they share the budget
+class RetryPolicy:
+    def __init__(self, max_retries: int = 3, backoff_seconds: float = 1.0, max_backoff_seconds: float = 60.0,
+                 jitter: float = 0.5, retry_statuses: Iterable[int] = (429, 500, 502, 503, 504),
+                 retry_methods: Iterable[str] = ('get', 'put', 'delete'), retry_connection_errors: bool = True,
+                 respect_retry_after: bool = True, max_retry_after_seconds: float = 300.0,
+                 retry_budget_ratio: Optional[float] = 0.2, retry_budget_burst: int = 20):
+        if max_retries < 0:
+            raise InvalidOptionException('max_retries must be 0 or greater')
+        if jitter < 0 or jitter > 1:
+            raise InvalidOptionException('jitter must be between 0 and 1')
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(m.lower() for m in retry_methods)
+        self.retry_connection_errors = retry_connection_errors
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after_seconds = max_retry_after_seconds
+        self.retry_budget_ratio = retry_budget_ratio
+        self.retry_budget_burst = retry_budget_burst
+
+        # (compiled url pattern, http verbs or None for all, policy) checked in the order they were added
+        self._endpoint_overrides: List[Tuple[re.Pattern, Optional[frozenset], 'RetryPolicy']] = []
+        self._non_idempotent_endpoints = [(re.compile(r'/fileUploads/[^/?]+'), frozenset(['put']))]
+
+        self._budget_lock = threading.Lock()
+        self._budget_tokens = float(retry_budget_burst)
+        self.requests_sent = 0
+        self.retries_sent = 0
+
+    # Uses a different policy for any URL matching url_pattern (a regular expression, searched within the URL),
+    # optionally only for some HTTP verbs. For example, to retry the POST that adds users to a group:
+    #   policy.add_endpoint_override(r'/groups/[^/]+/users$', RetryPolicy(retry_methods=['post']), ['post'])
+    def add_endpoint_override(self, url_pattern: str, policy: 'RetryPolicy',
+                              http_verbs: Optional[Iterable[str]] = None):
+        verbs = None
+        if http_verbs is not None:
+            verbs = frozenset(v.lower() for v in http_verbs)
+        self._endpoint_overrides.append((re.compile(url_pattern), verbs, policy))
+
+    def for_request(self, http_verb: str, url: str) -> 'RetryPolicy':
+        http_verb = http_verb.lower()
+        for pattern, verbs, policy in self._endpoint_overrides:
+            if (verbs is None or http_verb in verbs) and pattern.search(url):
+                return policy
+        return self
+
+    def _is_idempotent(self, http_verb: str, url: str) -> bool:
+        for pattern, verbs in self._non_idempotent_endpoints:
+            if http_verb in verbs and pattern.search(url):
+                return False
+        return True
+
+    def _spend_budget(self) -> bool:
+        if self.retry_budget_ratio is None:
+            return True
+        with self._budget_lock:
+            if self._budget_tokens < 1:
+                return False
+            self._budget_tokens -= 1
+            return True
+
+    def _record_request(self):
+        with self._budget_lock:
+            self.requests_sent += 1
+            if self.retry_budget_ratio is not None:
+                self._budget_tokens = min(float(self.retry_budget_burst),
+                                          self._budget_tokens + self.retry_budget_ratio)
+
+    def should_retry(self, http_verb: str, url: str, attempt: int, status_code: Optional[int] = None,
+                     exception: Optional[Exception] = None) -> bool:
+        http_verb = http_verb.lower()
+        if attempt >= self.max_retries:
+            return False
+        if http_verb not in self.retry_methods or not self._is_idempotent(http_verb, url):
+            return False
+        if exception is not None:
+            if self.retry_connection_errors is False or not isinstance(
+                    exception, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+                return False
+        elif status_code not in self.retry_statuses:
+            return False
+        return self._spend_budget()
+
+    @staticmethod
+    def _parse_retry_after(retry_after: Optional[str]) -> Optional[float]:
+        if retry_after is None:
+            return None
+        retry_after = retry_after.strip()
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def get_wait_seconds(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        wait = min(self.max_backoff_seconds, self.backoff_seconds * (2 ** attempt))
+        wait = wait * random.uniform(1 - self.jitter, 1)
+        if self.respect_retry_after is True and response is not None:
+            retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                wait = max(wait, min(retry_after, self.max_retry_after_seconds))
+        return wait
+
+    # Sends a request by calling send(), which must return a requests Response, trying again as the policy allows.
+    # Returns the last response even if it is an error, so the caller can handle it as usual. Connection errors
+    # are raised once there are no retries left.
+    # rewind is called before each retry, to reset a request body that is read as it is sent
+    def send(self, send: Callable[[], requests.Response], http_verb: str, url: str,
+             log: Optional[Callable[[str], None]] = None,
+             rewind: Optional[Callable[[], None]] = None) -> requests.Response:
+        policy = self.for_request(http_verb, url)
+        policy._record_request()
+        attempt = 0
+        while True:
+            try:
+                response = send()
+            except requests.exceptions.RequestException as e:
+                if not policy.should_retry(http_verb, url, attempt, exception=e):
+                    raise
+                wait = policy.get_wait_seconds(attempt)
+                reason = str(e)
+            else:
+                if response.status_code < 400 or not policy.should_retry(http_verb, url, attempt,
+                                                                         status_code=response.status_code):
+                    return response
+                wait = policy.get_wait_seconds(attempt, response)
+                reason = 'HTTP {}'.format(response.status_code)
+                response.close()
+            attempt += 1
+            with policy._budget_lock:
+                policy.retries_sent += 1
+            if log is not None:
+                log('{} {} failed ({}), retry {} of {} in {:.1f} seconds'.format(http_verb.upper(), url, reason,
+                                                                              attempt, policy.max_retries, wait))
+            time.sleep(wait)
+            if rewind is not None:
+                rewind()
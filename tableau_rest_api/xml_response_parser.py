@@ -0,0 +1,72 @@
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from typing import Iterator
+
+from ..tableau_exceptions import *
+
+# lxml is optional, and only used if the 'lxml' backend is chosen
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+
+# Turns the bytes of a REST API response into Elements. RestXmlRequest uses one for every XML response, so the
+# backend can be swapped for a whole connection with set_xml_parser(). The backends are:
+#
+#   'stdlib'    : xml.etree.ElementTree (the default)
+#   'lxml'      : lxml.etree, which parses faster on large responses. Must be installed separately. The Elements
+#                 returned are lxml Elements, which have the same find() / findall() / get() methods as the stdlib
+#   'iterparse' : stdlib, but the iter_ methods (iter_users, iter_workbooks, etc.) hand over each element as soon as
+#                 it has been parsed, and let go of it afterward, rather than building the tree for the whole page
+#                 first. Everything else is parsed the same as 'stdlib'
+class XmlResponseParser:
+    backends = ('stdlib', 'lxml', 'iterparse')
+
+    def __init__(self, backend: str = 'stdlib'):
+        if backend not in self.backends:
+            raise InvalidOptionException('backend must be one of {}'.format(', '.join(self.backends)))
+        if backend == 'lxml' and lxml_etree is None:
+            raise InvalidOptionException("The 'lxml' backend needs the lxml package to be installed")
+        self.backend = backend
+
+    # Parses a whole response and returns the root (tsResponse) element
+    def parse(self, raw_response: bytes) -> ET.Element:
+        if self.backend == 'lxml':
+            # lxml parsers can't be shared between threads, so each response gets its own
+            return lxml_etree.fromstring(raw_response, parser=lxml_etree.XMLParser(resolve_entities=False,
+                                                                                   huge_tree=True))
+        parser = ET.XMLParser(encoding='utf-8')
+        parser.feed(raw_response)
+        return parser.close()
+
+    # Yields the pagination element (with the tag pagination_tag) if there is one, and then each of the elements
+    # inside the content element (each user, workbook, etc.) of one page of a listing
+    def iter_page_elements(self, raw_response: bytes, pagination_tag: str) -> Iterator[ET.Element]:
+        if self.backend != 'iterparse':
+            root = self.parse(raw_response)
+            content_element = None
+            for child in root:
+                if child.tag == pagination_tag:
+                    yield child
+                else:
+                    content_element = child
+            if content_element is not None:
+                for element in content_element:
+                    yield element
+            return
+
+        # Elements are yielded at the 'end' event, once everything inside them has been parsed, and then removed
+        # from the partly built tree so it never holds more than one of them
+        parents = []
+        for event, element in ET.iterparse(BytesIO(raw_response), events=('start', 'end')):
+            if event == 'start':
+                parents.append(element)
+                continue
+            parents.pop()
+            depth = len(parents)
+            if depth == 1 and element.tag == pagination_tag:
+                yield element
+            elif depth == 2:
+                yield element
+                parents[-1].remove(element)
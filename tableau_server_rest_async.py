@@ -0,0 +1,129 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, AsyncIterator
+
+from .tableau_exceptions import *
+from .tableau_rest_api.methods.rest_api_base import TableauRestApiBase
+
+#
+# asyncio version of TableauServerRest. Wraps any of the TableauServerRest classes, and exposes the same methods
+# and sub-objects (workbooks, datasources, users, groups, projects, etc.) as coroutines:
+#
+#   t = TableauServerRest(server=server, username=username, password=password, site_content_url=site)
+#   at = TableauServerRestAsync(t, max_concurrent_requests=20)
+#   await at.signin()
+#   wbs = await asyncio.gather(*[at.workbooks.query_workbook(luid) for luid in wb_luids])
+#
+# The HTTP requests are still made with requests, run in a thread pool against the one wrapped connection, which
+# is safe to share between threads. A call waits for a free slot, which limits how many requests are in flight
+# against the Tableau Server at once. The connection pool of the wrapped connection's transport is grown to
+# max_concurrent_requests when the workers start, so every slot gets a kept-alive connection (with concurrent
+# paging, each of those requests can send max_concurrent_page_requests more, which the pool should allow for)
+#
+class TableauServerRestAsync:
+    def __init__(self, tableau_server_rest: TableauRestApiBase, max_concurrent_requests: int = 10):
+        if max_concurrent_requests < 1:
+            raise InvalidOptionException('max_concurrent_requests must be 1 or greater')
+        self.rest = tableau_server_rest
+        self.max_concurrent_requests = max_concurrent_requests
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        # Mirror each of the sub-objects (users, workbooks, etc.) of the wrapped connection
+        for attr, value in vars(self.rest).items():
+            if attr != 'rest_api_base' and getattr(value, 'rest', None) is self.rest:
+                setattr(self, attr, AsyncMethods(self, attr))
+
+    async def __aenter__(self) -> 'TableauServerRestAsync':
+        await self.signin()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.signout()
+
+    async def signin(self, *args, **kwargs):
+        await asyncio.get_running_loop().run_in_executor(None, functools.partial(self.rest.signin, *args, **kwargs))
+        self._start_workers()
+
+    async def signout(self):
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.rest.signout)
+        finally:
+            self.close()
+
+    # Shuts down the worker threads without signing out, for when the session token is managed elsewhere
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+        self._slots = None
+
+    def _start_workers(self):
+        if self.rest.token == "":
+            raise NotSignedInException('Must use .signin() to create REST API session first')
+        self.close()
+        self.rest.transport.ensure_pool_maxsize(self.max_concurrent_requests)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_requests)
+        self._slots = asyncio.Semaphore(self.max_concurrent_requests)
+
+    def _get_method(self, sub_object: Optional[str], method_name: str):
+        # Allows wrapping a connection that was already signed in
+        if self._executor is None:
+            self._start_workers()
+        target = self.rest if sub_object is None else getattr(self.rest, sub_object)
+        return getattr(target, method_name)
+
+    async def _call(self, sub_object: Optional[str], method_name: str, *args, **kwargs) -> Any:
+        method = self._get_method(sub_object, method_name)
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor,
+                                                                    functools.partial(method, *args, **kwargs))
+
+    # The iter_ methods become async generators. A slot is only held while the next element is fetched, never while
+    # the caller has it, so a slow consumer or an iteration that is abandoned part way doesn't keep a slot
+    async def _iterate(self, sub_object: Optional[str], method_name: str, *args, **kwargs) -> AsyncIterator[Any]:
+        method = self._get_method(sub_object, method_name)
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            iterator = await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+        finished = object()
+        try:
+            while True:
+                async with self._slots:
+                    element = await loop.run_in_executor(self._executor, next, iterator, finished)
+                if element is finished:
+                    break
+                yield element
+        finally:
+            # Stops the paging of the wrapped iterator when the iteration ends early
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+    # Any method of the wrapped connection (query_user_luid, query_resource, etc.) is available as a coroutine
+    def __getattr__(self, name: str):
+        if name.startswith('_') or name == 'rest':
+            raise AttributeError(name)
+        attr = getattr(self.rest, name)
+        if not callable(attr):
+            return attr
+        if name.startswith('iter_'):
+            return functools.partial(self._iterate, None, name)
+        return functools.partial(self._call, None, name)
+
+
+# Stands in for one of the sub-objects of TableauServerRest (workbooks, users, etc.), turning each of its
+# methods into a coroutine
+class AsyncMethods:
+    def __init__(self, async_rest: TableauServerRestAsync, sub_object: str):
+        self._async_rest = async_rest
+        self._sub_object = sub_object
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        # Check that the method exists now, rather than when the coroutine runs
+        getattr(getattr(self._async_rest.rest, self._sub_object), name)
+        if name.startswith('iter_'):
+            return functools.partial(self._async_rest._iterate, self._sub_object, name)
+        return functools.partial(self._async_rest._call, self._sub_object, name)